@@ -2,14 +2,19 @@
 Agente de Contrataciones Públicas del Perú
 API REST con Flask - Versión 4.0 con procesamiento de PDFs
 """
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_from_directory, g, Response, stream_with_context, url_for
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
+import json
+import logging
+import math
 import os
-import tempfile
+import time
 
 from config import Config
-from engine.conversation import ConversationEngine
+# Los módulos especializados son Python puro (importarlos cuesta milisegundos);
+# ConversationEngine y el procesador de PDFs (Gemini, LangChain, PyMuPDF)
+# se importan recién dentro de sus fábricas
 from engine.calculator import ProcurementCalculator
 from engine.opiniones import OpinionesOECE, get_opiniones_info
 from engine.tribunal import TribunalContrataciones, get_tribunal_info
@@ -24,8 +29,29 @@ from engine.jprd_arbitraje import JPRDArbitraje, get_jprd_info, get_arbitraje_in
 from engine.observaciones import ObservacionesGenerator, get_observaciones_info
 from engine.apelaciones import ApelacionesGenerator, get_apelaciones_info
 from engine.evaluador_propuestas import EvaluadorPropuestas, get_evaluador_info
-# Procesador de PDFs
-from engine.pdf_processor import PDFProcessor, DocumentAnalyzer, get_pdf_processor_info
+# Despachador de módulos deterministas
+from engine.dispatcher import DeterministicDispatcher
+# Métricas de latencia por capa
+from engine.metrics import metrics
+# Registro de motores con carga perezosa
+from engine.registry import EngineRegistry
+# Cliente Gemini compartido (su circuit breaker se reporta en /api/health)
+from engine.llm_client import get_llm_client
+# Chat por lote (QA masivo)
+from engine.batch import BatchProcessor
+# Respuestas rápidas recargables en caliente
+from engine.respuestas_rapidas import recargar_respuestas, get_estado_respuestas, buscar_respuesta_rapida
+# PDFs subidos en memoria (o en disco si son grandes)
+from engine.uploads import FuentePDF
+# Análisis de PDFs en segundo plano
+from engine.trabajos import GestorTrabajos, validar_callback_url
+from engine.texto import patron_palabras
+
+logging.basicConfig(
+    level=Config.LOG_LEVEL,
+    format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+)
+logger = logging.getLogger(__name__)
 
 # Inicializar Flask
 app = Flask(__name__, static_folder='static')
@@ -33,39 +59,169 @@ CORS(app)
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max upload
 ALLOWED_EXTENSIONS = {'pdf'}
 
-# Inicializar motores
-conversation_engine = None
-calculator = ProcurementCalculator()
-opiniones = OpinionesOECE()
-tribunal = TribunalContrataciones()
-penalties_calc = PenaltiesCalculator()
-adicionales_calc = AdicionalesCalculator()
-plazos_calc = PlazosCalculator()
-impedimentos_verifier = ImpedimentosVerifier()
-nulidad_analyzer = NulidadAnalyzer()
-ampliaciones_module = AmpliacionesResolucion()
-jprd_module = JPRDArbitraje()
+# ============================================
+# REGISTRO DE MOTORES (construcción perezosa)
+# ============================================
+
+def _crear_conversation_engine():
+    """Motor conversacional: RAG + Gemini (el más costoso de construir)"""
+    Config.validate()
+    from engine.conversation import ConversationEngine
+    return ConversationEngine()
+
+def _crear_document_analyzer():
+    """Analizador de PDFs: importa PyMuPDF y configura Gemini"""
+    from engine.pdf_processor import DocumentAnalyzer
+    return DocumentAnalyzer()
+
+def _analizar_pdf_trabajo(fuente, progreso):
+    """Etapas de un trabajo de /api/pdf/upload; el resultado es la respuesta del endpoint síncrono anterior"""
+    resultado = document_analyzer.analizar_bases_completo(fuente, progreso)
+    if 'error' in resultado:
+        return resultado
+    return {
+        'resultado': resultado,
+        'respuesta_chat': document_analyzer.formatear_resultado_analisis(resultado)
+    }
+
+def _crear_trabajos_pdf():
+    """Pool de análisis de PDFs en segundo plano"""
+    return GestorTrabajos(_analizar_pdf_trabajo, Config.PDF_TRABAJOS_WORKERS,
+                          Config.PDF_TRABAJOS_TTL, Config.PDF_TRABAJOS_MAX)
+
+def _crear_local_dispatcher():
+    """
+    Tabla de despacho antes de Gemini: solo módulos que calculan algo
+    
+    Con solo_calculo=True cada módulo responde únicamente si tiene los datos
+    para calcular (monto, fecha, parentesco...); las preguntas conceptuales
+    pasan a las respuestas rápidas, el RAG y Gemini.
+    """
+    return DeterministicDispatcher([
+        ('calculation', calculator.detect_and_calculate),
+        ('penalidades', lambda m: penalties_calc.detect_and_calculate(m, solo_calculo=True)),
+        ('adicionales', lambda m: adicionales_calc.detect_and_calculate(m, solo_calculo=True)),
+        ('impedimentos', lambda m: impedimentos_verifier.detect_and_verify(m, solo_calculo=True)),
+        ('plazos', lambda m: plazos_calc.detect_and_calculate(m, solo_calculo=True)),
+    ])
+
+def _crear_fichas_dispatcher():
+    """
+    Fichas informativas de los módulos locales, en orden de prioridad
+    Solo se usan sin motor conversacional (modo limitado)
+    Los detectores más específicos van primero; observaciones es el más amplio
+    """
+    return DeterministicDispatcher([
+        ('calculation', calculator.detect_and_calculate),
+        ('penalidades', penalties_calc.detect_and_calculate),
+        ('adicionales', adicionales_calc.detect_and_calculate),
+        ('impedimentos', impedimentos_verifier.detect_and_verify),
+        ('nulidad', nulidad_analyzer.detect_and_analyze),
+        ('jprd_arbitraje', jprd_module.detect_and_process),
+        ('ampliaciones', ampliaciones_module.detect_and_process),
+        ('plazos', plazos_calc.detect_and_calculate),
+        ('apelaciones', apelaciones_gen.detect_and_process),
+        ('evaluador', evaluador.detect_and_process),
+        ('observaciones', observaciones_gen.detect_and_analyze),
+    ])
+
+engines = EngineRegistry()
+engines.register('calculator', ProcurementCalculator)
+engines.register('opiniones', OpinionesOECE)
+engines.register('tribunal', TribunalContrataciones)
+engines.register('penalties', PenaltiesCalculator)
+engines.register('adicionales', AdicionalesCalculator)
+engines.register('plazos', PlazosCalculator)
+engines.register('impedimentos', ImpedimentosVerifier)
+engines.register('nulidad', NulidadAnalyzer)
+engines.register('ampliaciones', AmpliacionesResolucion)
+engines.register('jprd', JPRDArbitraje)
+engines.register('observaciones', ObservacionesGenerator)
+engines.register('apelaciones', ApelacionesGenerator)
+engines.register('evaluador', EvaluadorPropuestas)
+engines.register('document_analyzer', _crear_document_analyzer)
+engines.register('local_dispatcher', _crear_local_dispatcher)
+engines.register('fichas_dispatcher', _crear_fichas_dispatcher)
+engines.register('trabajos_pdf', _crear_trabajos_pdf)
+engines.register('conversation', _crear_conversation_engine)
+
+# Proxies: cada motor se construye en el primer acceso a uno de sus atributos
+calculator = engines.lazy('calculator')
+opiniones = engines.lazy('opiniones')
+tribunal = engines.lazy('tribunal')
+penalties_calc = engines.lazy('penalties')
+adicionales_calc = engines.lazy('adicionales')
+plazos_calc = engines.lazy('plazos')
+impedimentos_verifier = engines.lazy('impedimentos')
+nulidad_analyzer = engines.lazy('nulidad')
+ampliaciones_module = engines.lazy('ampliaciones')
+jprd_module = engines.lazy('jprd')
 # Instancias de módulos avanzados
-observaciones_gen = ObservacionesGenerator()
-apelaciones_gen = ApelacionesGenerator()
-evaluador = EvaluadorPropuestas()
+observaciones_gen = engines.lazy('observaciones')
+apelaciones_gen = engines.lazy('apelaciones')
+evaluador = engines.lazy('evaluador')
 # Instancia del procesador de PDFs
-document_analyzer = DocumentAnalyzer()
+document_analyzer = engines.lazy('document_analyzer')
+local_dispatcher = engines.lazy('local_dispatcher')
+fichas_dispatcher = engines.lazy('fichas_dispatcher')
+trabajos_pdf = engines.lazy('trabajos_pdf')
 
 def allowed_file(filename):
     """Verifica si el archivo tiene extensión permitida"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def init_engines():
-    """Inicializa los motores del agente"""
-    global conversation_engine
-    try:
-        Config.validate()
-        conversation_engine = ConversationEngine()
-        print("✅ Motores inicializados correctamente")
-    except Exception as e:
-        print(f"⚠️ Error inicializando motores: {e}")
-        print("El agente funcionará en modo limitado (solo calculadora)")
+def recibir_pdf():
+    """
+    Valida el PDF enviado en el campo 'file' y lo lee una sola vez
+    
+    Hasta PDF_MAX_MEMORIA_MB queda en memoria; más grande, en un archivo
+    temporal. Usar la fuente con `with` para liberar ese archivo.
+    
+    Returns:
+        (FuentePDF, None) o (None, respuesta de error)
+    """
+    if 'file' not in request.files:
+        return None, (jsonify({'error': 'No se envió archivo'}), 400)
+    
+    file = request.files['file']
+    
+    if file.filename == '':
+        return None, (jsonify({'error': 'Nombre de archivo vacío'}), 400)
+    
+    if not allowed_file(file.filename):
+        return None, (jsonify({'error': 'Solo se permiten archivos PDF'}), 400)
+    
+    max_memoria = int(Config.PDF_MAX_MEMORIA_MB * 1024 * 1024)
+    return FuentePDF.desde_stream(file.stream, secure_filename(file.filename), max_memoria), None
+
+def get_conversation_engine():
+    """Motor conversacional, o None si no pudo inicializarse (modo limitado)"""
+    return engines.get_or_none('conversation')
+
+def init_engines(background=False):
+    """
+    Pre-calienta los motores del agente
+    Si falla el motor conversacional, el agente funciona en modo limitado
+    """
+    return engines.prewarm(background=background)
+
+# Pre-calentamiento opcional en segundo plano (no bloquea el arranque)
+if Config.PREWARM_ENGINES:
+    init_engines(background=True)
+
+@app.before_request
+def start_request_timer():
+    """Asocia el endpoint al hilo actual para etiquetar las métricas"""
+    metrics.set_endpoint(request.endpoint)
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    """Registra la latencia total de la petición"""
+    inicio = g.pop('request_start', None)
+    if inicio is not None:
+        metrics.observe('total', time.perf_counter() - inicio)
+    return response
 
 # ============================================
 # RUTAS API - PRINCIPAL
@@ -83,7 +239,9 @@ def health():
         'status': 'ok',
         'agent': 'Agente de Contrataciones Públicas - Experto',
         'version': '2.0.0',
-        'ai_ready': conversation_engine is not None,
+        'ai_ready': engines.is_loaded('conversation'),
+        'engines': engines.status(),
+        'gemini_circuit': get_llm_client().breaker.status(),
         'modules': [
             'calculator', 'opiniones', 'tribunal', 'chat',
             'penalties', 'adicionales', 'plazos', 
@@ -92,6 +250,53 @@ def health():
         ]
     })
 
+_CLAVES_OPINIONES = patron_palabras(['opinión', 'opinion', 'opiniones', 'dtn'])
+_CLAVES_TRIBUNAL = patron_palabras(['tribunal', 'tce', 'sanción', 'sancion', 'sanciones',
+                                    'inhabilitación', 'inhabilitacion'])
+
+def route_message(message):
+    """
+    Enrutamiento determinista: opiniones, tribunal y módulos locales
+    
+    Las preguntas abiertas ("¿Cuáles son las competencias del Tribunal?")
+    no se responden con una lista de opiniones o resoluciones: las atiende
+    el motor conversacional.
+    
+    Returns:
+        Tupla (tipo, respuesta) o None si debe atenderlo el motor conversacional
+    """
+    pregunta_abierta = '?' in message and len(message.split()) > 4
+    
+    # Detectar consultas específicas sobre opiniones
+    if _CLAVES_OPINIONES.search(message) and not pregunta_abierta:
+        resultados = opiniones.buscar_opinion(message)
+        if resultados:
+            return 'opiniones', opiniones.formatear_lista_opiniones(resultados)
+    
+    # Detectar consultas sobre tribunal
+    if _CLAVES_TRIBUNAL.search(message) and not pregunta_abierta:
+        resultados = tribunal.buscar_resoluciones(message)
+        if resultados:
+            return 'tribunal', tribunal.formatear_lista_resoluciones(resultados)
+    
+    # Módulos deterministas que calculan (cálculo, penalidades, plazos, etc.)
+    return local_dispatcher.dispatch(message)
+
+def responder_sin_motor(message):
+    """
+    Respuesta en modo limitado (sin motor conversacional)
+    
+    Returns:
+        Tupla (tipo, respuesta): respuesta rápida, ficha informativa o aviso
+    """
+    respuesta = buscar_respuesta_rapida(message)
+    if respuesta:
+        return 'respuesta_rapida', respuesta
+    ficha = fichas_dispatcher.dispatch(message)
+    if ficha:
+        return ficha
+    return 'error', '⚠️ El motor de IA no está configurado. Por favor configura tu OPENAI_API_KEY en el archivo .env'
+
 @app.route('/api/chat', methods=['POST'])
 def chat():
     """Endpoint principal del chat"""
@@ -103,60 +308,90 @@ def chat():
         if not message:
             return jsonify({'error': 'Mensaje vacío'}), 400
         
-        message_lower = message.lower()
-        
-        # Detectar consultas específicas sobre opiniones
-        if any(word in message_lower for word in ['opinión', 'opinion', 'opiniones', 'dtn']) and not ('?' in message and len(message.split()) > 4):
-            resultados = opiniones.buscar_opinion(message)
-            if resultados:
-                response = opiniones.formatear_lista_opiniones(resultados)
-                return jsonify({
-                    'response': response,
-                    'type': 'opiniones',
-                    'session_id': session_id
-                })
-        
-        # Detectar consultas sobre tribunal
-        if any(word in message_lower for word in ['tribunal', 'sanción', 'sancion', 'inhabilitación', 'inhabilitacion', 'resolución tce', 'resolucion tce']):
-            resultados = tribunal.buscar_resoluciones(message)
-            if resultados:
-                response = tribunal.formatear_lista_resoluciones(resultados)
-                return jsonify({
-                    'response': response,
-                    'type': 'tribunal',
-                    'session_id': session_id
-                })
-        
-        # Verificar si es una consulta de cálculo
-        calc_result = calculator.detect_and_calculate(message)
-        if calc_result:
+        with metrics.timer('routing'):
+            local_result = route_message(message)
+        if local_result:
+            handler, response = local_result
             return jsonify({
-                'response': calc_result,
-                'type': 'calculation',
+                'response': response,
+                'type': handler,
                 'session_id': session_id
             })
         
         # Usar motor conversacional si está disponible
+        conversation_engine = get_conversation_engine()
         if conversation_engine:
             response = conversation_engine.process(message, session_id)
             return jsonify({
                 'response': response,
                 'type': 'conversation',
-                'session_id': session_id
+                'session_id': session_id,
+                'tokens': conversation_engine.get_last_usage()
             })
         else:
+            handler, response = responder_sin_motor(message)
             return jsonify({
-                'response': '⚠️ El motor de IA no está configurado. Por favor configura tu OPENAI_API_KEY en el archivo .env',
-                'type': 'error',
+                'response': response,
+                'type': handler,
                 'session_id': session_id
             })
             
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/chat/batch', methods=['POST'])
+def chat_batch():
+    """
+    Procesa una lista de preguntas y transmite un resultado JSONL por pregunta
+    
+    Body: {"preguntas": [...], "max_workers": 4}
+    Cada línea: indice, pregunta, capa, respuesta, latencia_ms
+    """
+    data = request.get_json(silent=True) or {}
+    preguntas = data.get('preguntas')
+    
+    if not isinstance(preguntas, list) or not preguntas:
+        return jsonify({'error': 'Se requiere una lista de preguntas'}), 400
+    if len(preguntas) > Config.BATCH_MAX_QUESTIONS:
+        return jsonify({'error': f'Máximo {Config.BATCH_MAX_QUESTIONS} preguntas por lote'}), 400
+    
+    try:
+        max_workers = min(int(data.get('max_workers', Config.BATCH_MAX_WORKERS)), Config.BATCH_MAX_WORKERS)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'max_workers debe ser un entero'}), 400
+    
+    procesador = BatchProcessor(route_message, get_conversation_engine, sin_motor=responder_sin_motor,
+                                max_workers=max_workers,
+                                embedding_batch_size=Config.BATCH_EMBEDDING_SIZE)
+    
+    def generar():
+        for resultado in procesador.run([str(p) for p in preguntas], endpoint='chat_batch'):
+            yield json.dumps(resultado, ensure_ascii=False) + '\n'
+    
+    return Response(stream_with_context(generar()), mimetype='application/x-ndjson')
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Latencias por endpoint y etapa en formato Prometheus (?format=json para JSON)"""
+    if request.args.get('format') == 'json':
+        return jsonify({
+            'latencias': metrics.snapshot(),
+            'contadores': metrics.counters_snapshot()
+        })
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/dispatcher/stats', methods=['GET'])
+def dispatcher_stats():
+    """Estadísticas de aciertos y latencia de los módulos deterministas"""
+    return jsonify({
+        'calculos': local_dispatcher.get_stats(),
+        'fichas': fichas_dispatcher.get_stats()
+    })
+
 @app.route('/api/rag/ingest', methods=['POST'])
 def rag_ingest():
     """Forzar ingestión de documentos para RAG"""
+    conversation_engine = get_conversation_engine()
     if not conversation_engine or not conversation_engine.rag_engine:
         return jsonify({'error': 'Motor RAG no inicializado'}), 503
         
@@ -169,6 +404,22 @@ def rag_ingest():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/respuestas-rapidas', methods=['GET'])
+def respuestas_rapidas_estado():
+    """Archivo de origen y tamaño del índice de respuestas rápidas"""
+    return jsonify(get_estado_respuestas())
+
+@app.route('/api/respuestas-rapidas/recargar', methods=['POST'])
+def respuestas_rapidas_recargar():
+    """Recarga data/respuestas_rapidas.json sin reiniciar el worker"""
+    try:
+        return jsonify({
+            'status': 'success',
+            'estado': recargar_respuestas()
+        })
+    except (OSError, ValueError) as e:
+        return jsonify({'error': f'No se pudo recargar: {e}'}), 400
+
 # ============================================
 # RUTAS API - CALCULADORA
 # ============================================
@@ -212,19 +463,29 @@ def get_opiniones():
 
 @app.route('/api/opiniones/buscar', methods=['POST'])
 def buscar_opiniones():
-    """Busca opiniones por tema"""
+    """Busca opiniones por número, tema o palabras clave (paginado, por relevancia)"""
     try:
         data = request.get_json()
         consulta = data.get('consulta', '')
+        pagina = int(data.get('pagina', 1))
+        por_pagina = int(data.get('por_pagina', 5))
         
-        resultados = opiniones.buscar_opinion(consulta)
-        return jsonify({
-            'resultados': resultados,
-            'total': len(resultados)
-        })
+        return jsonify(opiniones.buscar(consulta, pagina, por_pagina))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/opiniones/autocompletar', methods=['GET'])
+def autocompletar_opiniones():
+    """Sugerencias de números de opinión para lo escrito hasta ahora (?q=D0008)"""
+    try:
+        limite = max(1, min(int(request.args.get('limite', 10)), 50))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'limite debe ser un entero'}), 400
+    sugerencias = opiniones.autocompletar_numero(request.args.get('q', ''), limite)
+    return jsonify({
+        'sugerencias': [{'numero': op['numero'], 'tema': op.get('tema', '')} for op in sugerencias]
+    })
+
 @app.route('/api/opiniones/<numero>', methods=['GET'])
 def get_opinion(numero):
     """Obtiene una opinión específica por número"""
@@ -250,21 +511,19 @@ def get_tribunal():
 def get_resoluciones():
     """Obtiene resoluciones recientes del Tribunal"""
     return jsonify({
-        'resoluciones': tribunal.RESOLUCIONES_RELEVANTES
+        'resoluciones': tribunal.listar_resoluciones()
     })
 
 @app.route('/api/tribunal/buscar', methods=['POST'])
 def buscar_resoluciones():
-    """Busca resoluciones por materia"""
+    """Busca resoluciones por número, materia o resumen (paginado, por relevancia)"""
     try:
         data = request.get_json()
         consulta = data.get('consulta', '')
+        pagina = int(data.get('pagina', 1))
+        por_pagina = int(data.get('por_pagina', 5))
         
-        resultados = tribunal.buscar_resoluciones(consulta)
-        return jsonify({
-            'resultados': resultados,
-            'total': len(resultados)
-        })
+        return jsonify(tribunal.buscar(consulta, pagina, por_pagina))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -557,22 +816,13 @@ def analizar_hibrido():
     Combina detección de Gemini con validación de reglas legales para máxima precisión
     """
     try:
-        if 'file' not in request.files:
-            return jsonify({'error': 'No se envió archivo PDF'}), 400
-        
-        file = request.files['file']
-        
-        if not allowed_file(file.filename):
-            return jsonify({'error': 'Solo se permiten archivos PDF'}), 400
+        fuente, error = recibir_pdf()
+        if error:
+            return error
         
-        filename = secure_filename(file.filename)
-        temp_dir = tempfile.mkdtemp()
-        temp_path = os.path.join(temp_dir, filename)
-        file.save(temp_path)
-        
-        try:
-            # 1. Extraer texto del PDF
-            extraccion = document_analyzer.pdf_processor.extraer_texto_pdf(temp_path)
+        with fuente:
+            # 1. Extraer texto del PDF (o reutilizar el de un archivo idéntico)
+            extraccion = document_analyzer.extraer(fuente)
             
             if 'error' in extraccion:
                 return jsonify({'error': extraccion['error']}), 500
@@ -580,7 +830,7 @@ def analizar_hibrido():
             texto = extraccion['texto_completo']
             
             # 2. Análisis con Gemini (IA)
-            analisis_ia = document_analyzer.pdf_processor.analizar_documento_gemini_sync(texto, "bases")
+            analisis_ia = document_analyzer.analizar_ia(extraccion, "bases")
             
             # 3. Extraer valor referencial si está disponible
             datos_basicos = document_analyzer.pdf_processor.extraer_datos_bases(texto)
@@ -588,7 +838,8 @@ def analizar_hibrido():
             
             # 4. Análisis híbrido (IA + Reglas)
             resultado_hibrido = observaciones_gen.analizar_vicios_hibrido(
-                texto, analisis_ia, valor_referencial
+                texto, analisis_ia, valor_referencial,
+                paginas=[p["texto"] for p in extraccion["texto_por_pagina"]]
             )
             
             # 5. Formatear respuesta para chat
@@ -600,14 +851,9 @@ def analizar_hibrido():
                 'valor_referencial': valor_referencial,
                 'analisis_hibrido': resultado_hibrido,
                 'respuesta_chat': respuesta_chat,
-                'motor': 'Híbrido: Gemini AI + Reglas Ley 32069 + Jurisprudencia TCE'
+                'motor': 'Híbrido: Gemini AI + Reglas Ley 32069 + Jurisprudencia TCE',
+                'cache': extraccion.get('cache', {})
             })
-            
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            if os.path.exists(temp_dir):
-                os.rmdir(temp_dir)
                 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -780,75 +1026,67 @@ def generar_informe_evaluacion():
 @app.route('/api/pdf', methods=['GET'])
 def get_pdf_info_route():
     """Información sobre procesamiento de PDFs"""
+    from engine.pdf_processor import get_pdf_processor_info
     return jsonify({'info': get_pdf_processor_info()})
 
 @app.route('/api/pdf/upload', methods=['POST'])
 def upload_and_analyze_pdf():
-    """Sube y analiza un PDF automáticamente"""
+    """
+    Sube un PDF y encola su análisis completo
+    
+    Responde 202 con el id del trabajo; el estado, el progreso y los
+    resultados parciales se consultan en /api/pdf/trabajos/<id>. Con
+    'callback_url' (campo del formulario) se envía además un POST con el
+    estado final a esa URL: solo a hosts de PDF_CALLBACK_HOSTS o, sin esa
+    lista, a direcciones públicas (400 si apunta a la red interna).
+    """
     try:
-        if 'file' not in request.files:
-            return jsonify({'error': 'No se envió archivo'}), 400
-        
-        file = request.files['file']
-        
-        if file.filename == '':
-            return jsonify({'error': 'Nombre de archivo vacío'}), 400
-        
-        if not allowed_file(file.filename):
-            return jsonify({'error': 'Solo se permiten archivos PDF'}), 400
+        callback_url = request.form.get('callback_url') or None
+        if callback_url:
+            try:
+                validar_callback_url(callback_url, Config.PDF_CALLBACK_HOSTS)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
         
-        # Guardar temporalmente
-        filename = secure_filename(file.filename)
-        temp_dir = tempfile.mkdtemp()
-        temp_path = os.path.join(temp_dir, filename)
-        file.save(temp_path)
+        fuente, error = recibir_pdf()
+        if error:
+            return error
         
         try:
-            # Analizar documento
-            resultado = document_analyzer.analizar_bases_completo(temp_path)
-            
-            # Formatear respuesta
-            respuesta_formateada = document_analyzer.formatear_resultado_analisis(resultado)
-            
-            return jsonify({
-                'resultado': resultado,
-                'respuesta_chat': respuesta_formateada
-            })
-        finally:
-            # Limpiar archivo temporal
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            if os.path.exists(temp_dir):
-                os.rmdir(temp_dir)
+            trabajo = trabajos_pdf.crear(fuente, callback_url)
+        except RuntimeError as e:
+            return jsonify({'error': str(e)}), 503
+        
+        url = url_for('estado_trabajo_pdf', trabajo_id=trabajo['id'])
+        return jsonify({
+            'trabajo_id': trabajo['id'],
+            'estado': trabajo['estado'],
+            'progreso': trabajo['progreso'],
+            'url': url
+        }), 202, {'Location': url}
                 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/pdf/trabajos/<trabajo_id>', methods=['GET'])
+def estado_trabajo_pdf(trabajo_id):
+    """Estado de un análisis encolado: etapa, progreso, resultados parciales y final"""
+    trabajo = trabajos_pdf.obtener(trabajo_id)
+    if trabajo is None:
+        return jsonify({'error': 'Trabajo no encontrado o expirado'}), 404
+    return jsonify(trabajo)
+
 @app.route('/api/pdf/analizar-bases', methods=['POST'])
 def analizar_bases_pdf():
     """Analiza bases de un procedimiento para detectar vicios"""
     try:
-        if 'file' not in request.files:
-            return jsonify({'error': 'No se envió archivo'}), 400
-        
-        file = request.files['file']
-        
-        if not allowed_file(file.filename):
-            return jsonify({'error': 'Solo se permiten archivos PDF'}), 400
+        fuente, error = recibir_pdf()
+        if error:
+            return error
         
-        filename = secure_filename(file.filename)
-        temp_dir = tempfile.mkdtemp()
-        temp_path = os.path.join(temp_dir, filename)
-        file.save(temp_path)
-        
-        try:
-            resultado = document_analyzer.detectar_vicios_bases(temp_path)
+        with fuente:
+            resultado = document_analyzer.detectar_vicios_bases(fuente)
             return jsonify(resultado)
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            if os.path.exists(temp_dir):
-                os.rmdir(temp_dir)
                 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -857,22 +1095,13 @@ def analizar_bases_pdf():
 def verificar_evaluacion_pdf():
     """Verifica un cuadro de evaluación desde PDF"""
     try:
-        if 'file' not in request.files:
-            return jsonify({'error': 'No se envió archivo'}), 400
+        fuente, error = recibir_pdf()
+        if error:
+            return error
         
-        file = request.files['file']
-        
-        if not allowed_file(file.filename):
-            return jsonify({'error': 'Solo se permiten archivos PDF'}), 400
-        
-        filename = secure_filename(file.filename)
-        temp_dir = tempfile.mkdtemp()
-        temp_path = os.path.join(temp_dir, filename)
-        file.save(temp_path)
-        
-        try:
+        with fuente:
             # Extraer datos de evaluación
-            resultado_extraccion = document_analyzer.analizar_evaluacion(temp_path)
+            resultado_extraccion = document_analyzer.analizar_evaluacion(fuente)
             
             # Si se extrajeron propuestas, verificar los cálculos
             if resultado_extraccion.get('propuestas'):
@@ -887,11 +1116,6 @@ def verificar_evaluacion_pdf():
                 resultado_extraccion['verificacion'] = verificacion
             
             return jsonify(resultado_extraccion)
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            if os.path.exists(temp_dir):
-                os.rmdir(temp_dir)
                 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -900,54 +1124,25 @@ def verificar_evaluacion_pdf():
 def chat_con_documento():
     """Chat inteligente sobre un documento subido"""
     try:
-        if 'file' not in request.files:
-            return jsonify({'error': 'No se envió archivo'}), 400
-        
-        file = request.files['file']
         pregunta = request.form.get('pregunta', 'Analiza este documento')
+        fuente, error = recibir_pdf()
+        if error:
+            return error
         
-        if not allowed_file(file.filename):
-            return jsonify({'error': 'Solo se permiten archivos PDF'}), 400
-        
-        filename = secure_filename(file.filename)
-        temp_dir = tempfile.mkdtemp()
-        temp_path = os.path.join(temp_dir, filename)
-        file.save(temp_path)
-        
-        try:
-            # Extraer texto
-            extraccion = document_analyzer.pdf_processor.extraer_texto_pdf(temp_path)
-            
-            if 'error' in extraccion:
-                return jsonify({'error': extraccion['error']}), 500
+        with fuente:
+            resultado = document_analyzer.responder_pregunta(fuente, pregunta)
             
-            texto = extraccion['texto_completo']
-            
-            # Usar Gemini para responder la pregunta
-            prompt = f"""Eres INKABOT, experto en contrataciones públicas de Perú (Ley 32069).
-            
-El usuario ha subido un documento y pregunta: {pregunta}
-
-DOCUMENTO:
-{texto[:15000]}
-
-Responde de manera clara y profesional, citando los artículos relevantes de la Ley 32069 o su Reglamento."""
-            
-            import google.generativeai as genai
-            genai.configure(api_key=Config.GEMINI_API_KEY)
-            model = genai.GenerativeModel('gemini-2.0-flash')
-            response = model.generate_content(prompt)
+            if 'degradado' in resultado:
+                # Gemini no disponible: el cliente puede reintentar cuando se cierre el circuito
+                reintento = get_llm_client().breaker.status().get('reintento_en_s') or Config.GEMINI_RESET_TIMEOUT
+                respuesta = jsonify({'error': 'El asistente de IA no está disponible en este momento, '
+                                              'intente nuevamente en unos segundos',
+                                     'reintentar_en_s': reintento})
+                return respuesta, 503, {'Retry-After': str(max(1, math.ceil(reintento)))}
+            if 'error' in resultado:
+                return jsonify({'error': resultado['error']}), 500
             
-            return jsonify({
-                'archivo': extraccion['archivo'],
-                'paginas': extraccion['paginas'],
-                'respuesta': response.text
-            })
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            if os.path.exists(temp_dir):
-                os.rmdir(temp_dir)
+            return jsonify(resultado)
                 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -957,7 +1152,7 @@ Responde de manera clara y profesional, citando los artículos relevantes de la
 # ============================================
 
 if __name__ == '__main__':
-    init_engines()
+    init_engines(background=True)
     print(f"""
 ╔══════════════════════════════════════════════════════════════╗
 ║     🏛️  AGENTE DE CONTRATACIONES PÚBLICAS - PERÚ  🏛️        ║
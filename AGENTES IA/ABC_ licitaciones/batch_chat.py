@@ -0,0 +1,116 @@
+"""
+Evaluación de Preguntas por Lote (CLI)
+
+Pasa una lista de preguntas por el bot y escribe un resultado JSONL por
+pregunta (índice, capa que respondió, respuesta y latencia). Por defecto
+procesa en este mismo proceso; con --url usa /api/chat/batch de un servidor.
+
+Fuentes de preguntas:
+    .md     líneas numeradas ("1. ¿...?"), como PREGUNTAS_ENTRENAMIENTO.md
+    .jsonl  un objeto por línea con "pregunta" (o "message")
+    otro    una pregunta por línea
+
+Uso:
+    python batch_chat.py [PREGUNTAS_ENTRENAMIENTO.md] [--output resultados.jsonl]
+                         [--max-workers 4] [--limit 50] [--url http://localhost:5000]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+from typing import Dict, Iterator, List
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def cargar_preguntas(path: str) -> List[str]:
+    """Lee las preguntas según la extensión del archivo"""
+    with open(path, encoding="utf-8") as f:
+        contenido = f.read()
+
+    if path.endswith(".md"):
+        return [m.group(1).strip() for m in re.finditer(r"^\s*\d+\.\s+(.+)$", contenido, re.MULTILINE)]
+
+    if path.endswith(".jsonl"):
+        preguntas = []
+        for linea in contenido.splitlines():
+            if linea.strip():
+                item = json.loads(linea)
+                preguntas.append(item.get("pregunta") or item.get("message", ""))
+        return preguntas
+
+    return [linea.strip() for linea in contenido.splitlines() if linea.strip()]
+
+
+def procesar_local(preguntas: List[str], max_workers: int) -> Iterator[Dict]:
+    """Procesa el lote en este proceso con los mismos motores que la API"""
+    sys.path.insert(0, BASE_DIR)
+    import app
+    from config import Config
+    from engine.batch import BatchProcessor
+
+    procesador = BatchProcessor(app.route_message, app.get_conversation_engine,
+                                max_workers=max_workers, sin_motor=app.responder_sin_motor,
+                                embedding_batch_size=Config.BATCH_EMBEDDING_SIZE)
+    return procesador.run(preguntas, endpoint="chat_batch_cli")
+
+
+def procesar_remoto(preguntas: List[str], max_workers: int, url: str) -> Iterator[Dict]:
+    """Envía el lote a /api/chat/batch y lee la respuesta JSONL a medida que llega"""
+    import requests
+
+    respuesta = requests.post(url.rstrip("/") + "/api/chat/batch",
+                              json={"preguntas": preguntas, "max_workers": max_workers},
+                              stream=True, timeout=None)
+    if respuesta.status_code != 200:
+        raise SystemExit(f"❌ Error {respuesta.status_code}: {respuesta.text}")
+    for linea in respuesta.iter_lines(decode_unicode=True):
+        if linea:
+            yield json.loads(linea)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evalúa una lista de preguntas contra el bot")
+    parser.add_argument("archivo", nargs="?", default=os.path.join(BASE_DIR, "PREGUNTAS_ENTRENAMIENTO.md"))
+    parser.add_argument("--output", "-o", default=None, help="Archivo JSONL de salida (por defecto, stdout)")
+    parser.add_argument("--max-workers", type=int, default=4, help="Llamadas paralelas a Gemini")
+    parser.add_argument("--limit", type=int, default=None, help="Procesar solo las primeras N preguntas")
+    parser.add_argument("--url", default=None, help="Servidor con /api/chat/batch (por defecto, local)")
+    args = parser.parse_args()
+
+    preguntas = cargar_preguntas(args.archivo)[:args.limit]
+    if not preguntas:
+        raise SystemExit(f"❌ No se encontraron preguntas en {args.archivo}")
+
+    salida = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    capas = Counter()
+    latencias = []
+    inicio = time.perf_counter()
+    try:
+        if args.url:
+            resultados = procesar_remoto(preguntas, args.max_workers, args.url)
+        else:
+            resultados = procesar_local(preguntas, args.max_workers)
+        for resultado in resultados:
+            salida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+            salida.flush()
+            capas[resultado["capa"]] += 1
+            latencias.append(resultado["latencia_ms"])
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+
+    latencias.sort()
+    duracion = time.perf_counter() - inicio
+    print(f"\n📊 {len(latencias)} preguntas en {duracion:.1f}s "
+          f"(p50 {latencias[len(latencias) // 2]:.0f}ms, "
+          f"p95 {latencias[min(len(latencias) - 1, int(0.95 * len(latencias)))]:.0f}ms)", file=sys.stderr)
+    for capa, total in capas.most_common():
+        print(f"   {capa:<20} {total}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
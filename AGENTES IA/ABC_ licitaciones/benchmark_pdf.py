@@ -0,0 +1,91 @@
+"""
+Benchmark de Extracción de PDFs (serial vs. paralela por páginas)
+
+Genera bases sintéticas de 50, 200 y 500 páginas (texto corrido y cuadros
+de varias líneas por página), las extrae en serie y repartiendo las páginas
+entre procesos, y verifica que ambos modos den el mismo resultado. Sirve
+para elegir PDF_WORKERS y PDF_PARALELO_MIN_PAGINAS en cada servidor.
+
+Uso:
+    python benchmark_pdf.py [--paginas 50 200 500] [--workers 2 4] [--repeticiones 3]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+from engine.pdf_paginas import cerrar_pool, extraer_paginas
+
+
+PARRAFO = ("El postor debe acreditar una experiencia en la especialidad por un monto facturado "
+           "acumulado equivalente a {n} veces el valor estimado, por la contratación de servicios "
+           "iguales o similares al objeto de la convocatoria, durante los ocho años anteriores.")
+
+
+def crear_pdf(path: str, paginas: int):
+    doc = fitz.open()
+    for i in range(1, paginas + 1):
+        pagina = doc.new_page()
+        y = 60
+        pagina.insert_text((60, y), f"CAPÍTULO {i // 20 + 1} - SECCIÓN {i}", fontsize=12)
+        for j in range(6):
+            y += 70
+            pagina.insert_textbox(fitz.Rect(60, y, 540, y + 65), PARRAFO.format(n=j + 1), fontsize=9)
+        # Cuadro de varias líneas (tabla candidata)
+        filas = "\n".join(f"POSTOR {k}: EMPRESA {i}-{k} SAC   PRECIO: S/ {95000 + k * 1250:,.2f}" for k in range(5))
+        pagina.insert_text((60, y + 90), filas, fontsize=9)
+    doc.save(path)
+    doc.close()
+
+
+def medir(path: str, workers: int, repeticiones: int):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        with fitz.open(path) as doc:
+            paginas, modo = extraer_paginas(doc, path, workers, min_paginas=1)
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos), paginas, modo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de extracción de PDFs por páginas")
+    parser.add_argument("--paginas", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"CPUs disponibles: {os.cpu_count()}\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        documentos = []
+        for total in args.paginas:
+            path = os.path.join(tmp, f"bases_{total}.pdf")
+            crear_pdf(path, total)
+            serial, referencia, _ = medir(path, 1, args.repeticiones)
+            documentos.append((total, path, serial, referencia))
+
+        filas = {total: [("serial", serial)] for total, _, serial, _ in documentos}
+        calentamiento = os.path.join(tmp, "calentamiento.pdf")
+        crear_pdf(calentamiento, 4)
+        for workers in args.workers:
+            # Arranca el pool antes de medir (en la app se reutiliza entre peticiones)
+            medir(calentamiento, workers, 1)
+            for total, path, _, referencia in documentos:
+                duracion, paginas, modo = medir(path, workers, args.repeticiones)
+                assert paginas == referencia, "la extracción paralela difiere de la serial"
+                filas[total].append((f"{modo}x{workers}", duracion))
+            cerrar_pool()
+
+    print(f"{'páginas':>8} {'modo':>12} {'mediana':>10} {'pág/s':>8} {'vs serial':>10}")
+    for total, mediciones in filas.items():
+        serial = mediciones[0][1]
+        for etiqueta, duracion in mediciones:
+            print(f"{total:>8} {etiqueta:>12} {duracion * 1000:>8.0f}ms {total / duracion:>8.0f} "
+                  f"{serial / duracion:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
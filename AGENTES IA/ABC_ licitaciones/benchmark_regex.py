@@ -0,0 +1,127 @@
+"""
+Benchmark del Banco de Expresiones Regulares (engine/patrones.py)
+
+Mide, patrón por patrón, los patrones anteriores (texto inline con `.*?`
+sin límite) y los del banco compilado sobre bases sintéticas de 50, 200 y
+500 páginas. Las bases incluyen los casos que vuelven cuadráticos a los
+anteriores: etiquetas sin valor cercano ("EXPERIENCIA DEL POSTOR",
+"POSTOR:", "plazo", "penalidad") repetidas en todo el documento y títulos
+largos en mayúsculas después de "FACTOR".
+
+Uso:
+    python benchmark_regex.py [--paginas 50 200 500] [--repeticiones 3] [--limite 30]
+
+--limite: segundos por patrón anterior; si una medición lo supera, ese
+patrón no se mide en los tamaños siguientes ("omitido").
+"""
+import argparse
+import math
+import re
+import statistics
+import time
+
+from engine.patrones import PATRONES, postores_con_precio, seccion_requisitos
+
+_I = re.IGNORECASE
+_ID = re.IGNORECASE | re.DOTALL
+
+# Patrones tal como estaban en pdf_processor.py y observaciones.py
+ANTERIORES = {
+    "numero_proceso": (r'(?:LP|PA|CD|AS|SIE)\s*N[°º]?\s*([\d\-]+\s*-\s*\d{4})', _I),
+    "valor_referencial": (r'VALOR\s+REFERENCIAL[:\s]+S/?\.?\s*([\d,]+(?:\.\d{2})?)', _I),
+    "plazo_ejecucion": (r'PLAZO\s+(?:DE\s+)?EJECUCI[ÓO]N[:\s]+(\d+)\s*(?:D[ÍI]AS)', _I),
+    "seccion_requisitos": (r'REQUISITOS\s+DE\s+CALIFICACI[ÓO]N(.*?)(?:FACTORES|CAP[ÍI]TULO|$)', _ID),
+    "experiencia_postor": (r'EXPERIENCIA\s+DEL\s+POSTOR.*?(?:S/?\.?\s*([\d,]+)|(\d+)\s*(?:contratos|servicios))', _ID),
+    "experiencia_personal": (r'PERSONAL\s+(?:CLAVE|T[ÉE]CNICO).*?(\d+)\s*(?:a[ñn]os|meses)', _ID),
+    "factor_puntaje": (r'(?:FACTOR|CRITERIO)\s+(?:DE\s+)?([A-Z\s]+)[:\s]+(?:HASTA\s+)?(\d+)\s*(?:PUNTOS|PTS)', _I),
+    "postor_precio": (r'(?:POSTOR|EMPRESA|CONSORCIO)[:\s]+([A-Z\s\.]+).*?(?:PRECIO|MONTO)[:\s]+S/?\.?\s*'
+                      r'([\d,]+(?:\.\d{2})?)', _ID),
+    "ganador": (r'(?:BUENA\s+PRO|ADJUDICADO|GANADOR)[:\s]+([A-Z\s\.]+)', _I),
+    "experiencia_minima": (r'experiencia\s+m[íi]nima.*?(\d+(?:,\d{3})*(?:\.\d{2})?)', 0),
+    "plazo_dias": (r'plazo.*?(\d+)\s*d[íi]as', 0),
+    "penalidad_porcentaje": (r'penalidad.*?(\d+(?:\.\d+)?)\s*%', 0),
+}
+
+# Operación que usa el código con cada patrón (y si corre sobre el texto en minúsculas)
+BUSQUEDAS = {"numero_proceso", "valor_referencial", "plazo_ejecucion", "seccion_requisitos",
+             "experiencia_postor", "experiencia_personal", "ganador"}
+MINUSCULAS = {"experiencia_minima", "plazo_dias", "penalidad_porcentaje"}
+
+PAGINA = """CAPÍTULO {n} DISPOSICIONES DE LA SECCIÓN {n}
+El plazo para la presentación de consultas se computa conforme al calendario del procedimiento y
+la penalidad aplicable se calcula según el reglamento vigente sin exceder el monto máximo.
+EXPERIENCIA DEL POSTOR EN LA ESPECIALIDAD: se acredita con copia simple de contratos y conformidades
+PERSONAL CLAVE requerido para la ejecución de la prestación según los términos de referencia
+POSTOR: EMPRESA CONSTRUCTORA DEL SUR SOCIEDAD ANONIMA CERRADA CON DOMICILIO EN LIMA
+FACTOR DE EVALUACION DE LA EXPERIENCIA DEL POSTOR EN LA ESPECIALIDAD Y SOSTENIBILIDAD AMBIENTAL
+La experiencia mínima exigida se verifica con los documentos de la oferta presentada por el postor.
+""" + "Texto descriptivo de las especificaciones técnicas y de las obligaciones del contratista. " * 20 + "\n"
+
+
+def crear_bases(paginas: int) -> str:
+    cabecera = ("BASES INTEGRADAS\nLP N° 001-2026-MPL\nVALOR REFERENCIAL: S/ 5,000,000.00\n"
+                "PLAZO DE EJECUCIÓN: 180 DÍAS\nREQUISITOS DE CALIFICACIÓN\n")
+    return cabecera + "".join(PAGINA.format(n=i) for i in range(paginas))
+
+
+# Búsquedas del banco que combinan varios patrones
+COMPUESTAS = {"seccion_requisitos": seccion_requisitos, "postor_precio": postores_con_precio}
+
+
+def _ejecutar(patron, nombre: str, texto: str):
+    if patron is None:
+        return COMPUESTAS[nombre](texto)
+    if nombre in BUSQUEDAS:
+        return patron.search(texto)
+    return patron.findall(texto)
+
+
+def medir(patron, nombre: str, texto: str, repeticiones: int, limite: float = math.inf) -> float:
+    """Mediana de las repeticiones (una sola si la primera ya supera `limite`)"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        _ejecutar(patron, nombre, texto)
+        tiempos.append(time.perf_counter() - inicio)
+        if tiempos[0] > limite:
+            break
+    return statistics.median(tiempos)
+
+
+def _ms(segundos: float) -> str:
+    return f"{'omitido':>10}" if math.isnan(segundos) else f"{segundos * 1000:>8.1f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de expresiones regulares por patrón")
+    parser.add_argument("--paginas", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--limite", type=float, default=30.0)
+    args = parser.parse_args()
+
+    documentos = {total: crear_bases(total) for total in args.paginas}
+    print(f"{'patrón':<22}" + "".join(f"{f'{total} pág. antes':>16}{'banco':>10}" for total in args.paginas))
+    totales = {total: [0.0, 0.0] for total in args.paginas}
+    for nombre, (fuente, flags) in ANTERIORES.items():
+        anterior = re.compile(fuente, flags)
+        fila = f"{nombre:<22}"
+        omitir = False
+        for total, texto in documentos.items():
+            texto = texto.lower() if nombre in MINUSCULAS else texto
+            if omitir:
+                antes = math.nan
+            else:
+                antes = medir(anterior, nombre, texto, args.repeticiones, args.limite)
+                omitir = antes > args.limite
+            banco = medir(None if nombre in COMPUESTAS else PATRONES[nombre], nombre, texto, args.repeticiones)
+            totales[total][0] += antes
+            totales[total][1] += banco
+            fila += f"{_ms(antes):>16}{_ms(banco)}"
+        print(fila)
+    print(f"{'TOTAL':<22}" + "".join(f"{_ms(antes):>16}{_ms(banco)}" for antes, banco in totales.values()))
+    print("\nTamaños: " + ", ".join(f"{total} pág. = {len(texto) / 1e6:.1f} MB"
+                                     for total, texto in documentos.items()))
+
+
+if __name__ == "__main__":
+    main()
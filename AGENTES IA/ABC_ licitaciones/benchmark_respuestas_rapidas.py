@@ -0,0 +1,158 @@
+"""
+Benchmark de Respuestas Rápidas (latencia y precisión)
+
+Compara el buscador TF-IDF de engine/respuestas_rapidas.py con la regla
+anterior (primera plantilla con 70% de palabras en común) sobre casos
+etiquetados: los de audit_ambiguities.py, paráfrasis de preguntas
+frecuentes y preguntas que deben pasar a RAG/Gemini.
+
+Uso:
+    python benchmark_respuestas_rapidas.py [--calibrar] [--repeticiones 200]
+"""
+import argparse
+import time
+
+from engine.respuestas_rapidas import RESPUESTAS_RAPIDAS, UMBRAL_RESPUESTA_RAPIDA, buscar_coincidencia
+
+# (pregunta, clave esperada o None si debe pasar a RAG/Gemini)
+CASOS = [
+    # audit_ambiguities.py
+    ("Cual es la vigencia del poder del representante legal", None),
+    ("La ley 32069 se aplica en el 2026", "vigencia_ley"),
+    ("No quiero hacer una licitación pública", None),
+    ("diferencia entre licitación pública y la abreviada", None),
+    ("El avance de obra está al 100%", None),
+
+    # Paráfrasis de preguntas frecuentes
+    ("¿Cuándo entró en vigor la Ley 32069?", "vigencia_ley"),
+    ("desde cuando rige la ley 32069", "vigencia_ley"),
+    ("¿Qué ley derogó la Ley 32069?", "ley_derogada"),
+    ("¿Cuántos principios tiene la nueva ley 32069?", "cantidad_principios"),
+    ("dime cuáles son los principios", "lista_principios"),
+    ("¿Qué principios nuevos trae la ley?", "principios_nuevos"),
+    ("¿Cuál es el valor de la UIT 2026?", "uit_2026"),
+    ("¿Cuál es el monto mínimo de contrataciones?", "monto_minimo"),
+    ("monto para licitación pública de obras", "tope_licitacion_obras"),
+    ("¿Qué tipos de procedimientos de selección hay?", "procedimientos_seleccion"),
+    ("¿Todavía existe la adjudicación simplificada?", "adjudicacion_simplificada"),
+    ("¿Cómo apelo la buena pro?", "procedimiento_apelacion"),
+    ("¿Qué significa OECE?", "que_es_oece"),
+    ("diferencia entre el OSCE y el OECE", "diferencia_osce_oece"),
+    ("¿Qué sanciones impone el tribunal?", "tribunal_sanciones"),
+    ("¿Cuál es el porcentaje de la garantía de fiel cumplimiento?", "garantia_fiel_cumplimiento"),
+    ("¿Qué cambios trajo el DS 001-2026-EF?", "cambios_2026"),
+    ("¿Qué es el Registro Nacional de Proveedores?", "que_es_rnp"),
+    ("¿Cuál es el plazo para suscribir el contrato?", "plazo_suscripcion_contrato"),
+    ("¿Cómo me inscribo en el RNP?", "inscripcion_rnp"),
+    ("¿Qué es el SEACE?", "que_es_seace"),
+    ("¿Quiénes están impedidos de contratar con el Estado?", "quienes_impedidos"),
+    ("¿Cómo se calcula la penalidad por mora?", "penalidad_mora"),
+    ("¿Cuál es el límite de adicionales de obras?", "adicionales_obra"),
+    ("¿Cuáles son las causales de resolución del contrato?", "resolucion_contrato"),
+    ("¿Cómo solicito una ampliación de plazo?", "ampliacion_plazo"),
+    ("¿Qué es la JPRD?", "que_es_jprd"),
+
+    # Deben pasar a RAG/Gemini
+    ("¿Qué es el Tribunal de Contrataciones del Estado?", None),
+    ("¿Qué es el expediente de contratación?", None),
+    ("¿Qué es la garantía por adelantos?", None),
+    ("¿Cuánto es la tasa para apelar ante el Tribunal?", None),
+    ("¿Qué es el REDERECI y cómo afecta a los proveedores?", None),
+    ("¿Cuál es el plazo para iniciar un arbitraje después de notificada la resolución de contrato?", None),
+    ("Tengo un contrato de S/ 500,000 con plazo de 90 días. El contratista tiene 15 días de atraso. "
+     "¿Cuál es el monto exacto de la penalidad aplicable?", None),
+    ("¿Qué opina el OECE sobre la subsanación de ofertas?", None),
+    ("¿Dónde consulto el registro de árbitros habilitados por el OECE?", None),
+    ("¿Puedo participar en un proceso si mi RNP vence durante la etapa de evaluación?", None),
+    ("¿Qué sanciones puede recibir un comprador público que incumple los lineamientos de conducta?", None),
+    ("¿A partir de qué monto de obra es obligatoria la JPRD?", None),
+    ("Soy cuñado del alcalde, ¿puedo contratar con la municipalidad?", None),
+]
+
+
+def buscar_legacy(pregunta: str):
+    """Regla anterior: primera plantilla (orden del diccionario) con ≥70% de sus palabras"""
+    pregunta_clean = pregunta.lower().strip()
+    for signo in ("¿", "?", "¡", "!"):
+        pregunta_clean = pregunta_clean.replace(signo, "")
+    for clave, data in RESPUESTAS_RAPIDAS.items():
+        for pregunta_template in data["preguntas"]:
+            if pregunta_clean == pregunta_template.replace("¿", "").replace("?", ""):
+                return clave
+            palabras_template = set(pregunta_template.split())
+            if palabras_template:
+                coincidencia = len(palabras_template & set(pregunta_clean.split())) / len(palabras_template)
+                if coincidencia >= 0.7:
+                    return clave
+    return None
+
+
+def evaluar(buscador) -> dict:
+    """Precisión y exhaustividad sobre CASOS (una respuesta equivocada cuenta como falso positivo)"""
+    vp = fp = fn = 0
+    errores = []
+    for pregunta, esperada in CASOS:
+        obtenida = buscador(pregunta)
+        if obtenida is not None and obtenida == esperada:
+            vp += 1
+        elif obtenida is not None:
+            fp += 1
+            errores.append((pregunta, esperada, obtenida))
+        elif esperada is not None:
+            fn += 1
+            errores.append((pregunta, esperada, obtenida))
+    precision = vp / (vp + fp) if vp + fp else 1.0
+    exhaustividad = vp / (vp + fn) if vp + fn else 1.0
+    f1 = 2 * precision * exhaustividad / (precision + exhaustividad) if precision + exhaustividad else 0.0
+    return {"precision": precision, "exhaustividad": exhaustividad, "f1": f1, "errores": errores}
+
+
+def medir_latencia_us(buscador, repeticiones: int) -> float:
+    preguntas = [p for p, _ in CASOS]
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        for pregunta in preguntas:
+            buscador(pregunta)
+    return (time.perf_counter() - inicio) / (repeticiones * len(preguntas)) * 1e6
+
+
+def buscador_tfidf(umbral: float):
+    def buscar(pregunta: str):
+        coincidencia = buscar_coincidencia(pregunta, umbral)
+        return coincidencia.clave if coincidencia else None
+    return buscar
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia y precisión del buscador de respuestas rápidas")
+    parser.add_argument("--calibrar", action="store_true", help="Barrido de umbrales")
+    parser.add_argument("--repeticiones", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"📊 {len(CASOS)} casos etiquetados ({sum(1 for _, c in CASOS if c is None)} negativos)\n")
+    print(f"{'buscador':<22}{'precisión':>10}{'exhaust.':>10}{'F1':>8}{'µs/pregunta':>14}")
+    print("-" * 64)
+    filas = [("regla 70% (anterior)", buscar_legacy),
+             (f"TF-IDF (umbral {UMBRAL_RESPUESTA_RAPIDA:g})", buscador_tfidf(UMBRAL_RESPUESTA_RAPIDA))]
+    for nombre, buscador in filas:
+        resultado = evaluar(buscador)
+        latencia = medir_latencia_us(buscador, args.repeticiones)
+        print(f"{nombre:<22}{resultado['precision']:>10.2f}{resultado['exhaustividad']:>10.2f}"
+              f"{resultado['f1']:>8.2f}{latencia:>14.1f}")
+
+    errores = evaluar(buscador_tfidf(UMBRAL_RESPUESTA_RAPIDA))["errores"]
+    if errores:
+        print("\n❌ Errores del buscador TF-IDF:")
+        for pregunta, esperada, obtenida in errores:
+            print(f"   {pregunta[:70]!r}: esperada={esperada} obtenida={obtenida}")
+
+    if args.calibrar:
+        print(f"\n{'umbral':>8}{'precisión':>11}{'exhaust.':>10}{'F1':>8}")
+        for paso in range(30, 91, 5):
+            umbral = paso / 100
+            resultado = evaluar(buscador_tfidf(umbral))
+            print(f"{umbral:>8.2f}{resultado['precision']:>11.2f}{resultado['exhaustividad']:>10.2f}{resultado['f1']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark de arranque en frío (estilo python -X importtime)
+
+Mide cuánto tarda `import app` en un proceso nuevo, lista los módulos más
+costosos y compara contra el presupuesto de arranque. Con --engines mide
+además el costo de construir cada motor en su primer uso.
+
+Uso:
+    python benchmark_startup.py [--budget-ms 600] [--top 15] [--runs 3] [--engines]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def medir_importtime(modulo: str = "app"):
+    """
+    Ejecuta `python -X importtime -c "import <modulo>"` en un proceso limpio
+
+    Returns:
+        (total_ms, lista de (self_ms, cumulative_ms, nombre) ordenada por acumulado)
+    """
+    env = dict(os.environ, PREWARM_ENGINES="false")
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(proceso.stderr.strip().splitlines()[-1])
+
+    modulos = []
+    total_ms = 0.0
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "self [us]" in linea:
+            continue
+        partes = linea[len("import time:"):].split("|")
+        self_us, acumulado_us, nombre = int(partes[0]), int(partes[1]), partes[2].rstrip()
+        # Los módulos de nivel superior no tienen sangría
+        if not nombre.startswith("  "):
+            total_ms += acumulado_us / 1000
+        modulos.append((self_us / 1000, acumulado_us / 1000, nombre.strip()))
+
+    modulos.sort(key=lambda m: m[1], reverse=True)
+    return total_ms, modulos
+
+
+def medir_motores():
+    """Tiempo de construcción de cada motor en su primer uso"""
+    sys.path.insert(0, BASE_DIR)
+    import app
+
+    tiempos = {}
+    for nombre in app.engines.status():
+        inicio = time.perf_counter()
+        app.engines.get_or_none(nombre)
+        tiempos[nombre] = (time.perf_counter() - inicio) * 1000
+    return tiempos, app.engines.status()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de arranque en frío de app.py")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", 600)))
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--engines", action="store_true", help="Medir también la construcción de motores")
+    args = parser.parse_args()
+
+    print("⏱️  BENCHMARK DE ARRANQUE (import app)")
+    print("=" * 60)
+
+    totales = []
+    modulos = []
+    for _ in range(args.runs):
+        total_ms, modulos = medir_importtime()
+        totales.append(total_ms)
+    totales.sort()
+    mediana = totales[len(totales) // 2]
+
+    print(f"Corridas: {args.runs} | mediana: {mediana:.0f}ms | min: {totales[0]:.0f}ms | max: {totales[-1]:.0f}ms")
+    print(f"\nTop {args.top} módulos por tiempo acumulado (última corrida):")
+    print(f"{'acumulado':>11} {'propio':>9}  módulo")
+    for self_ms, acumulado_ms, nombre in modulos[:args.top]:
+        print(f"{acumulado_ms:9.1f}ms {self_ms:7.1f}ms  {nombre}")
+
+    if args.engines:
+        tiempos, estado = medir_motores()
+        print("\nConstrucción de motores en primer uso:")
+        for nombre, ms in sorted(tiempos.items(), key=lambda t: t[1], reverse=True):
+            print(f"{ms:9.1f}ms  {nombre} ({estado[nombre]['estado']})")
+
+    print("-" * 60)
+    if mediana > args.budget_ms:
+        print(f"❌ Arranque {mediana:.0f}ms excede el presupuesto de {args.budget_ms:.0f}ms")
+        sys.exit(1)
+    print(f"✅ Arranque {mediana:.0f}ms dentro del presupuesto de {args.budget_ms:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Carga de Catálogos de Opiniones OECE y Resoluciones del Tribunal (CLI)
+
+Sincroniza carpetas de archivos .jsonl, .csv y .pdf con el catálogo SQLite
+(Config.CATALOGO_DB). La carga es incremental: solo se releen los archivos
+nuevos o modificados y se eliminan los documentos de archivos borrados.
+Las listas incorporadas en engine/opiniones.py y engine/tribunal.py se
+cargan también, así el catálogo siempre las incluye.
+
+Campos por registro (JSONL/CSV):
+    opiniones     numero, fecha, tema, resumen, palabras_clave
+    resoluciones  numero, sala, fecha, tipo, materia, resumen, sancion, resolucion
+En CSV, palabras_clave se separan con ';' o '|'. Un PDF es un documento; su
+número y fecha se toman del texto o del nombre del archivo.
+
+Uso:
+    python cargar_catalogos.py [--opiniones carpeta] [--resoluciones carpeta] [--db data/catalogos.sqlite3]
+
+Reiniciar la app (o el worker) para que empiece a consultar el catálogo en disco.
+"""
+import argparse
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from config import Config
+from engine.catalogo import OPINIONES, RESOLUCIONES, CatalogoStore, cargar_carpeta, sembrar
+from engine.opiniones import OpinionesOECE
+from engine.tribunal import TribunalContrataciones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga catálogos de opiniones y resoluciones en SQLite")
+    parser.add_argument("--opiniones", help="Carpeta con opiniones OECE (.jsonl, .csv, .pdf)")
+    parser.add_argument("--resoluciones", help="Carpeta con resoluciones del Tribunal (.jsonl, .csv, .pdf)")
+    parser.add_argument("--db", default=Config.CATALOGO_DB, help="Archivo SQLite del catálogo")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    sembrar(args.db, OpinionesOECE.OPINIONES_2026 + OpinionesOECE.OPINIONES_2025, OPINIONES)
+    sembrar(args.db, TribunalContrataciones.RESOLUCIONES_RELEVANTES, RESOLUCIONES)
+
+    for coleccion, carpeta in ((OPINIONES, args.opiniones), (RESOLUCIONES, args.resoluciones)):
+        if carpeta:
+            resumen = cargar_carpeta(args.db, carpeta, coleccion)
+            print(f"📂 {coleccion}: {resumen['nuevos']} nuevos, {resumen['actualizados']} actualizados, "
+                  f"{resumen['sin_cambios']} sin cambios, {resumen['eliminados']} eliminados, "
+                  f"{resumen['errores']} con error ({resumen['documentos']} documentos cargados)")
+
+    print(f"\n✅ {args.db} en {time.perf_counter() - inicio:.1f}s")
+    for coleccion in (OPINIONES, RESOLUCIONES):
+        catalogo = CatalogoStore(args.db, coleccion)
+        print(f"   {coleccion:<14}{catalogo.contar():>8} documentos")
+        catalogo.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -17,22 +17,92 @@ class Config:
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
     GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-2.0-flash-exp')
     USE_GEMINI = os.getenv('USE_GEMINI', 'false').lower() == 'true'
+    GEMINI_PDF_MODEL = os.getenv('GEMINI_PDF_MODEL', 'gemini-2.0-flash')
+    GEMINI_TRANSPORT = os.getenv('GEMINI_TRANSPORT')  # grpc (por defecto) o rest
+    
+    # Circuit breaker de Gemini: timeout por llamada (s), fallos seguidos
+    # que abren el circuito y segundos antes de la llamada de prueba
+    GEMINI_TIMEOUT = float(os.getenv('GEMINI_TIMEOUT', 20))
+    GEMINI_FAILURE_THRESHOLD = int(os.getenv('GEMINI_FAILURE_THRESHOLD', 5))
+    GEMINI_RESET_TIMEOUT = float(os.getenv('GEMINI_RESET_TIMEOUT', 30))
     
     # Servidor
     DEBUG = os.getenv('DEBUG', 'true').lower() == 'true'
     PORT = int(os.getenv('PORT', 5000))
     HOST = os.getenv('HOST', '0.0.0.0')
     
+    # Logging (DEBUG muestra el detalle por capa; WARNING lo silencia)
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    
+    # Construir los motores en segundo plano al importar la app
+    # (por defecto se construyen en su primer uso)
+    PREWARM_ENGINES = os.getenv('PREWARM_ENGINES', 'false').lower() == 'true'
+    
     # Rutas
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
     KNOWLEDGE_DIR = os.path.join(BASE_DIR, 'knowledge')
     CHROMA_DIR = os.path.join(BASE_DIR, 'chroma_db')
+    DATA_DIR = os.path.join(BASE_DIR, 'data')
+    
+    # Respuestas rápidas: archivo editable y cada cuántos segundos se revisa
+    # si cambió para recargarlo (0 desactiva la revisión)
+    RESPUESTAS_RAPIDAS_PATH = os.getenv('RESPUESTAS_RAPIDAS_PATH', os.path.join(DATA_DIR, 'respuestas_rapidas.json'))
+    RESPUESTAS_RAPIDAS_RELOAD_SECONDS = float(os.getenv('RESPUESTAS_RAPIDAS_RELOAD_SECONDS', 5))
+    
+    # Catálogo de opiniones OECE y resoluciones del Tribunal (cargar_catalogos.py);
+    # mientras no exista se usan las listas incorporadas en el código
+    CATALOGO_DB = os.getenv('CATALOGO_DB', os.path.join(DATA_DIR, 'catalogos.sqlite3'))
     
     # RAG Settings
     CHUNK_SIZE = 1000
     CHUNK_OVERLAP = 200
     TOP_K_RESULTS = 15
     
+    # Conversación: turnos (pregunta + respuesta) que se conservan por sesión
+    MAX_HISTORY_TURNS = int(os.getenv('MAX_HISTORY_TURNS', 10))
+    
+    # Chat por lote (/api/chat/batch): preguntas por petición, llamadas
+    # paralelas a Gemini y preguntas por lote de embeddings
+    BATCH_MAX_QUESTIONS = int(os.getenv('BATCH_MAX_QUESTIONS', 500))
+    BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', 4))
+    BATCH_EMBEDDING_SIZE = int(os.getenv('BATCH_EMBEDDING_SIZE', 32))
+    
+    # Caché de análisis de PDFs por contenido (extracción y respuestas de
+    # Gemini); al superar el tamaño se eliminan las entradas menos usadas (0 la desactiva)
+    PDF_CACHE_DIR = os.getenv('PDF_CACHE_DIR', os.path.join(DATA_DIR, 'cache_pdf'))
+    PDF_CACHE_MAX_MB = float(os.getenv('PDF_CACHE_MAX_MB', 500))
+    
+    # PDFs subidos: hasta este tamaño se analizan en memoria, sin archivo temporal
+    PDF_MAX_MEMORIA_MB = float(os.getenv('PDF_MAX_MEMORIA_MB', 8))
+    
+    # Extracción de PDFs largos: páginas repartidas entre procesos desde
+    # PDF_PARALELO_MIN_PAGINAS páginas (con 1 worker siempre es en serie)
+    PDF_WORKERS = int(os.getenv('PDF_WORKERS', min(4, os.cpu_count() or 1)))
+    PDF_PARALELO_MIN_PAGINAS = int(os.getenv('PDF_PARALELO_MIN_PAGINAS', 100))
+    
+    # Tokens de documento por llamada a Gemini. Gemini 2.0 Flash admite 1M
+    # de contexto; 100k (~400k caracteres, unas 150 páginas de bases)
+    # mantiene la latencia y el costo de una llamada razonables y basta para
+    # enviar completas unas bases típicas. Los PDFs más largos envían solo
+    # las secciones relevantes (requisitos, factores, penalidades...)
+    PDF_PROMPT_MAX_TOKENS = int(os.getenv('PDF_PROMPT_MAX_TOKENS', 100000))
+    
+    # PDFs cuyas secciones relevantes no caben en un prompt: hasta
+    # PDF_MAP_MAX_BLOQUES llamadas por análisis, PDF_MAP_WORKERS a la vez,
+    # y sus resultados se combinan
+    PDF_MAP_MAX_BLOQUES = int(os.getenv('PDF_MAP_MAX_BLOQUES', 6))
+    PDF_MAP_WORKERS = int(os.getenv('PDF_MAP_WORKERS', 6))
+    
+    # Análisis de PDFs en segundo plano (/api/pdf/upload): trabajos a la vez,
+    # segundos que se conserva un trabajo terminado y trabajos guardados
+    PDF_TRABAJOS_WORKERS = int(os.getenv('PDF_TRABAJOS_WORKERS', 2))
+    PDF_TRABAJOS_TTL = float(os.getenv('PDF_TRABAJOS_TTL', 3600))
+    PDF_TRABAJOS_MAX = int(os.getenv('PDF_TRABAJOS_MAX', 200))
+    
+    # Hosts aceptados como callback_url (separados por comas). Sin lista se
+    # acepta cualquier host que no resuelva a una dirección interna
+    PDF_CALLBACK_HOSTS = tuple(h.strip().lower() for h in os.getenv('PDF_CALLBACK_HOSTS', '').split(',') if h.strip())
+    
     @classmethod
     def validate(cls):
         """Valida que las configuraciones necesarias estén presentes"""
@@ -5,6 +5,12 @@ Ley N° 32069 - Arts. 189-196 del Reglamento D.S. N° 009-2025-EF
 import re
 from typing import Dict, Optional
 
+from engine.texto import patron_palabras
+
+_CLAVES_ADICIONALES = patron_palabras(['adicional', 'adicionales', 'mayores metrados', 'deductivo', 'deductivos',
+                                       'reduccion', 'reducción', 'ampliacion de prestacion',
+                                       'ampliación de prestación'])
+
 
 class AdicionalesCalculator:
     """
@@ -221,15 +227,18 @@ class AdicionalesCalculator:
 
 📚 *Base legal: {resultado['base_legal']}*"""
     
-    def detect_and_calculate(self, message: str) -> Optional[str]:
+    def detect_and_calculate(self, message: str, solo_calculo: bool = False) -> Optional[str]:
         """
         Detecta si el mensaje es consulta de adicionales y la procesa
+        
+        Args:
+            solo_calculo: Retornar None en lugar de la ficha informativa cuando
+                no hay datos para calcular (así la consulta pasa al RAG/Gemini)
         """
         message_lower = message.lower()
         
         # Detectar si es consulta de adicionales
-        keywords = ['adicional', 'mayores metrados', 'deductivo', 'reduccion', 'ampliacion de prestacion']
-        if not any(kw in message_lower for kw in keywords):
+        if not _CLAVES_ADICIONALES.search(message):
             return None
         
         # Determinar si es obra o bienes/servicios
@@ -270,7 +279,7 @@ class AdicionalesCalculator:
                     return self.formatear_resultado_bienes_servicios(resultado)
         
         # Dar información general
-        return get_adicionales_info()
+        return None if solo_calculo else get_adicionales_info()
 
 
 def get_adicionales_info() -> str:
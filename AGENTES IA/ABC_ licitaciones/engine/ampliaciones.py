@@ -5,6 +5,13 @@ Ley N° 32069 - Arts. 171-178 del Reglamento D.S. N° 009-2025-EF
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 
+from engine.texto import patron_palabras
+
+_CLAVES_AMPLIACION = patron_palabras(['ampliación', 'ampliacion', 'ampliaciones', 'ampliar plazo',
+                                      'extender plazo'])
+_CLAVES_RESOLUCION = patron_palabras(['resolver contrato', 'resolución de contrato', 'resolucion de contrato',
+                                      'terminar contrato', 'incumplimiento'])
+
 
 class AmpliacionesResolucion:
     """
@@ -338,15 +345,12 @@ class AmpliacionesResolucion:
     
     def detect_and_process(self, message: str) -> Optional[str]:
         """Detecta si el mensaje es sobre ampliación o resolución"""
-        message_lower = message.lower()
-        
         # Detectar ampliación
-        if any(kw in message_lower for kw in ['ampliación', 'ampliacion', 'ampliar plazo', 'extender plazo']):
+        if _CLAVES_AMPLIACION.search(message):
             return get_ampliaciones_info()
         
         # Detectar resolución
-        if any(kw in message_lower for kw in ['resolver contrato', 'resolución de contrato', 'resolucion de contrato', 
-                                               'terminar contrato', 'incumplimiento']):
+        if _CLAVES_RESOLUCION.search(message):
             return get_resolucion_info()
         
         return None
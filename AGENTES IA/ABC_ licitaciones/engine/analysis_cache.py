@@ -0,0 +1,122 @@
+"""
+Caché en Disco de Análisis de PDFs
+Resultados direccionados por contenido: SHA-256 del archivo + tipo de análisis + versión
+Agente de Contrataciones Públicas - Perú
+"""
+import json
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+from engine.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisCache:
+    """
+    Caché de resultados JSON en un directorio local
+
+    Cada entrada es un archivo `<sha256[:2]>/<sha256>.<tipo>.v<version>.json`:
+    el mismo PDF subido otra vez (con cualquier nombre) reutiliza su
+    extracción y sus análisis; cambiar la versión de un prompt invalida solo
+    los análisis de ese tipo. Al superar `max_bytes` se eliminan las
+    entradas usadas hace más tiempo (la fecha de modificación se actualiza
+    en cada acierto). Con `max_bytes=0` la caché queda desactivada.
+    """
+
+    def __init__(self, directorio: str, max_bytes: int):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total: Optional[int] = None
+
+    @property
+    def activa(self) -> bool:
+        return self.max_bytes > 0
+
+    def _ruta(self, sha256: str, tipo: str, version: int) -> str:
+        tipo = "".join(c if c.isalnum() or c in "-_" else "_" for c in tipo)
+        return os.path.join(self.directorio, sha256[:2], f"{sha256}.{tipo}.v{version}.json")
+
+    def get(self, sha256: str, tipo: str, version: int = 1) -> Optional[Dict]:
+        """Resultado guardado o None"""
+        if not self.activa:
+            return None
+        ruta = self._ruta(sha256, tipo, version)
+        try:
+            with open(ruta, encoding="utf-8") as f:
+                valor = json.load(f)
+            os.utime(ruta)
+        except (OSError, ValueError):
+            metrics.incr("pdf_cache", resultado="miss", tipo=tipo)
+            return None
+        metrics.incr("pdf_cache", resultado="hit", tipo=tipo)
+        return valor
+
+    def set(self, sha256: str, tipo: str, valor: Dict, version: int = 1):
+        """Guarda un resultado (escritura atómica) y aplica el límite de tamaño"""
+        if not self.activa:
+            return
+        ruta = self._ruta(sha256, tipo, version)
+        temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(valor, f, ensure_ascii=False)
+            anterior = os.path.getsize(ruta) if os.path.exists(ruta) else 0
+            os.replace(temporal, ruta)
+            tamano = os.path.getsize(ruta)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("⚠️ No se pudo guardar en la caché de PDFs %s: %s", ruta, e)
+            # Si el reemplazo no llegó a hacerse, el temporal quedaría huérfano
+            try:
+                os.unlink(temporal)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            if self._total is None:
+                self._total = self._calcular_total()
+            else:
+                self._total += tamano - anterior
+            if self._total > self.max_bytes:
+                self._desalojar()
+
+    def _entradas(self):
+        for raiz, _, archivos in os.walk(self.directorio):
+            for nombre in archivos:
+                if nombre.endswith(".json"):
+                    ruta = os.path.join(raiz, nombre)
+                    try:
+                        estado = os.stat(ruta)
+                    except OSError:
+                        continue
+                    yield estado.st_mtime, estado.st_size, ruta
+
+    def _calcular_total(self) -> int:
+        return sum(tamano for _, tamano, _ in self._entradas())
+
+    def _desalojar(self):
+        """Elimina las entradas menos usadas hasta quedar en el 90% del límite"""
+        objetivo = int(self.max_bytes * 0.9)
+        entradas = sorted(self._entradas())
+        self._total = sum(tamano for _, tamano, _ in entradas)
+        for _, tamano, ruta in entradas:
+            if self._total <= objetivo:
+                break
+            try:
+                os.remove(ruta)
+                self._total -= tamano
+                metrics.incr("pdf_cache_evictions")
+            except OSError:
+                pass
+
+    def status(self) -> Dict:
+        with self._lock:
+            if self._total is None:
+                self._total = self._calcular_total()
+            return {"activa": self.activa, "bytes": self._total, "max_bytes": self.max_bytes}
@@ -11,6 +11,12 @@ from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import re
 
+from engine.texto import patron_palabras
+
+_CLAVES_APELACIONES = patron_palabras([
+    'apelación', 'apelacion', 'apelaciones', 'apelar', 'impugnar', 'recurso', 'recursos',
+    'buena pro', 'descalificaron', 'tasa de apelación', 'tasa de apelacion'])
+
 
 class ApelacionesGenerator:
     """
@@ -614,12 +620,7 @@ c) AGRAVIO INSTITUCIONAL: El proceder de la Entidad afecta la confianza de los
     
     def detect_and_process(self, message: str) -> Optional[str]:
         """Detecta si el mensaje es consulta sobre apelaciones"""
-        message_lower = message.lower()
-        
-        keywords = ['apelación', 'apelacion', 'apelar', 'impugnar', 'recurso',
-                    'buena pro', 'descalificaron', 'tasa de apelación']
-        
-        if not any(kw in message_lower for kw in keywords):
+        if not _CLAVES_APELACIONES.search(message):
             return None
         
         return get_apelaciones_info()
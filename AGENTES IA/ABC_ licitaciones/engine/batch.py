@@ -0,0 +1,141 @@
+"""
+Procesamiento de Preguntas por Lote
+Evalúa listas de preguntas con paralelismo acotado y embeddings compartidos
+Agente de Contrataciones Públicas - Perú
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from engine.metrics import metrics
+from engine.respuestas_rapidas import buscar_respuesta_rapida
+
+
+logger = logging.getLogger(__name__)
+
+Router = Callable[[str], Optional[Tuple[str, str]]]
+
+
+class BatchProcessor:
+    """
+    Procesa un lote de preguntas en tres fases:
+
+    1. Enrutamiento determinista y respuestas rápidas, en el hilo que llama
+       (microsegundos; sus resultados se emiten de inmediato).
+    2. Un solo lote de embeddings para todas las preguntas que llegan al RAG
+       (en grupos de `embedding_batch_size`).
+    3. Gemini con `max_workers` llamadas en paralelo como máximo.
+
+    Los resultados se emiten a medida que terminan (no en el orden de
+    entrada); cada uno lleva su índice, la capa que respondió y su latencia.
+    """
+
+    def __init__(self, router: Router, get_engine: Callable[[], object],
+                 max_workers: int = 4, embedding_batch_size: int = 32,
+                 sin_motor: Optional[Callable[[str], Tuple[str, str]]] = None):
+        """
+        Args:
+            router: Enrutador determinista (app.route_message)
+            get_engine: Retorna el ConversationEngine o None si no está disponible
+            sin_motor: (capa, respuesta) para las preguntas abiertas cuando no
+                hay motor (app.responder_sin_motor); por defecto, un error
+        """
+        self.router = router
+        self.get_engine = get_engine
+        self.sin_motor = sin_motor
+        self.max_workers = max(1, max_workers)
+        self.embedding_batch_size = max(1, embedding_batch_size)
+
+    def run(self, preguntas: List[str], endpoint: Optional[str] = None) -> Iterator[Dict]:
+        """Procesa el lote y emite un dict por pregunta"""
+        pendientes = []
+
+        # Fase 1: módulos deterministas y respuestas rápidas
+        for indice, pregunta in enumerate(preguntas):
+            inicio = time.perf_counter()
+            pregunta = (pregunta or "").strip()
+            if not pregunta:
+                yield self._resultado(indice, pregunta, "error", "Mensaje vacío", inicio)
+                continue
+
+            with metrics.timer("routing", endpoint):
+                local = self.router(pregunta)
+            if local:
+                capa, respuesta = local
+                yield self._resultado(indice, pregunta, capa, respuesta, inicio)
+                continue
+
+            with metrics.timer("quick_answer", endpoint):
+                respuesta = buscar_respuesta_rapida(pregunta)
+            if respuesta:
+                yield self._resultado(indice, pregunta, "respuesta_rapida", respuesta, inicio)
+                continue
+
+            pendientes.append((indice, pregunta))
+
+        if not pendientes:
+            return
+
+        engine = self.get_engine()
+        if engine is None:
+            for indice, pregunta in pendientes:
+                inicio = time.perf_counter()
+                capa, respuesta = "error", "⚠️ El motor de IA no está configurado"
+                if self.sin_motor:
+                    capa, respuesta = self.sin_motor(pregunta)
+                yield self._resultado(indice, pregunta, capa, respuesta, inicio)
+            return
+
+        # Fases 2 y 3: embeddings por grupo y Gemini en paralelo
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch") as pool:
+            futuros = set()
+            for desde in range(0, len(pendientes), self.embedding_batch_size):
+                grupo = pendientes[desde:desde + self.embedding_batch_size]
+                inicio = time.perf_counter()
+                fragmentos = engine.rag_engine.search_many([pregunta for _, pregunta in grupo])
+                rag_ms = (time.perf_counter() - inicio) * 1000
+                logger.debug("📦 Lote RAG de %d preguntas en %.0fms", len(grupo), rag_ms)
+
+                for (indice, pregunta), rag_results in zip(grupo, fragmentos):
+                    futuros.add(pool.submit(
+                        self._procesar, engine, indice, pregunta, rag_results, rag_ms, endpoint
+                    ))
+
+                # Emitir lo ya terminado antes de preparar el siguiente grupo
+                for futuro in [f for f in futuros if f.done()]:
+                    futuros.discard(futuro)
+                    yield futuro.result()
+
+            for futuro in as_completed(futuros):
+                yield futuro.result()
+
+    def _procesar(self, engine, indice: int, pregunta: str, rag_results: List[str],
+                  rag_ms: float, endpoint: Optional[str]) -> Dict:
+        """Fase 3 para una pregunta (en un hilo del pool)"""
+        metrics.set_endpoint(endpoint)
+        inicio = time.perf_counter()
+        # Cada pregunta del lote es independiente: sesión propia y descartada
+        session_id = f"batch-{id(self)}-{indice}"
+        try:
+            respuesta = engine.process(pregunta, session_id, rag_results=rag_results)
+            capa = engine.get_last_layer() or "conversation"
+        except Exception as e:
+            respuesta, capa = f"❌ Error: {e}", "error"
+        finally:
+            engine.clear_session(session_id)
+
+        resultado = self._resultado(indice, pregunta, capa, respuesta, inicio)
+        resultado["rag_lote_ms"] = round(rag_ms, 1)
+        resultado["tokens"] = engine.get_last_usage()
+        return resultado
+
+    @staticmethod
+    def _resultado(indice: int, pregunta: str, capa: str, respuesta: str, inicio: float) -> Dict:
+        return {
+            "indice": indice,
+            "pregunta": pregunta,
+            "capa": capa,
+            "respuesta": respuesta,
+            "latencia_ms": round((time.perf_counter() - inicio) * 1000, 1)
+        }
@@ -203,7 +203,9 @@ class ProcurementCalculator:
             'garantia', 'garantía', 'fiel cumplimiento',
             'penalidad', 'mora', 'resolucion', 'resolución',
             'puedo contratar', 'puede contratar', 'legal', 'ilegal', 'procede',
-            'plazo', 'apelacion', 'apelación'
+            'plazo', 'apelacion', 'apelación',
+            'arbitraje', 'controversia', 'conciliar', 'conciliación',
+            'adicional', 'deductivo'
         ]
         
         # Si contiene alguna palabra de exclusión, retornamos None para que lo atienda el RAG/Gemini
@@ -212,11 +214,13 @@ class ProcurementCalculator:
 
         # Patrones para detectar consultas de cálculo
         # Se añade negative lookahead (?!\s*(?:%|por ciento)) para evitar porcentajes
+        # o UIT (sin retroceder a parte del número), y en los patrones por palabra
+        # clave años sueltos ("valor de la UIT para 2026")
         patterns = [
-            r'(?:monto|valor|presupuesto|precio).*?(?:de|por|:)?\s*(?:s/?\.?\s*)?(\d[\d,\.]*)(?!\s*(?:%|por ciento))',
-            r'(?:s/?\.?\s*)(\d[\d,\.]*)(?!\s*(?:%|por ciento))',
-            r'(\d[\d,\.]*)\s*(?:soles|nuevos soles)(?!\s*(?:%|por ciento))',
-            r'(?:comprar?|contratar?|licitar?).*?(\d[\d,\.]*)(?!\s*(?:%|por ciento))',
+            r'(?:monto|valor|presupuesto|precio).*?(?:de|por|:)?\s*(?:s/?\.?\s*)?(?!(?:19|20)\d{2}\b)(?<![\d,.])(\d[\d,\.]*)(?!\d|\s*(?:%|por ciento|uit))',
+            r'\bs/\.?\s*(?<![\d,.])(\d[\d,\.]*)(?!\d|\s*(?:%|por ciento|uit))',
+            r'(?<![\d,.])(\d[\d,\.]*)\s*(?:soles|nuevos soles)(?!\s*(?:%|por ciento))',
+            r'\b(?:comprar?|contratar?|licitar?)\b.*?(?!(?:19|20)\d{2}\b)(?<![\d,.])(\d[\d,\.]*)(?!\d|\s*(?:%|por ciento|uit))',
         ]
         
         monto = None
@@ -0,0 +1,482 @@
+"""
+Catálogo en Disco de Opiniones OECE y Resoluciones del Tribunal
+Almacén SQLite con búsqueda FTS5 y carga incremental desde carpetas JSONL/CSV/PDF
+Agente de Contrataciones Públicas - Perú
+"""
+import csv
+import hashlib
+import itertools
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from engine.search_index import PESOS_CAMPOS, Resultado, SearchIndex, clave_numero, prefijo_clave, terminos
+
+
+logger = logging.getLogger(__name__)
+
+OPINIONES = "opiniones"
+RESOLUCIONES = "resoluciones"
+
+# Columnas de texto indexadas; el título es "tema" en opiniones y "materia" en resoluciones
+_COLUMNAS_FTS = ("numero", "titulo", "palabras_clave", "tipo", "resumen")
+_PESOS_FTS = (PESOS_CAMPOS["numero"], PESOS_CAMPOS["tema"], PESOS_CAMPOS["palabras_clave"],
+              PESOS_CAMPOS["tipo"], PESOS_CAMPOS["resumen"])
+
+# Versión del esquema (PRAGMA user_version); abrir_para_escritura migra los anteriores
+VERSION_ESQUEMA = 2
+
+# Una consulta con más palabras se recorta: la coincidencia mínima se arma
+# como combinaciones de términos y crece de forma combinatoria
+_MAX_TERMINOS = 8
+
+_ESQUEMA = f"""
+CREATE TABLE IF NOT EXISTS documentos (
+    id INTEGER PRIMARY KEY,
+    coleccion TEXT NOT NULL,
+    numero TEXT NOT NULL,
+    clave TEXT,
+    fecha TEXT,
+    fuente TEXT NOT NULL,
+    datos TEXT NOT NULL,
+    UNIQUE (coleccion, numero)
+);
+CREATE INDEX IF NOT EXISTS documentos_fecha ON documentos (coleccion, fecha);
+CREATE INDEX IF NOT EXISTS documentos_fuente ON documentos (fuente);
+CREATE INDEX IF NOT EXISTS documentos_clave ON documentos (coleccion, clave);
+CREATE VIRTUAL TABLE IF NOT EXISTS documentos_fts USING fts5 (
+    {", ".join(_COLUMNAS_FTS)}, tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS fuentes (
+    ruta TEXT PRIMARY KEY,
+    coleccion TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    tamano INTEGER NOT NULL,
+    documentos INTEGER NOT NULL
+);
+"""
+
+
+class CatalogoStore:
+    """
+    Catálogo de una colección (opiniones o resoluciones) en un archivo SQLite
+
+    Los documentos completos se guardan como JSON; la tabla FTS5 guarda los
+    mismos términos que usa SearchIndex (normalizados y reducidos a su raíz),
+    así los resultados coinciden con el índice en memoria. Cada hilo usa su
+    propia conexión de solo lectura: no se comparte estado entre hilos y el
+    cargador puede escribir mientras la API consulta (WAL). Las conexiones de
+    hilos que ya terminaron se cierran al abrir una nueva, y `cerrar` cierra
+    todas.
+    """
+
+    def __init__(self, path: str, coleccion: str):
+        self.path = path
+        self.coleccion = coleccion
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._conexiones: Dict[threading.Thread, sqlite3.Connection] = {}
+
+    @contextmanager
+    def _conexion(self):
+        # Abrir la conexión cuesta más que una búsqueda por número: cada hilo reutiliza la suya
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is None:
+            # check_same_thread=False solo para poder cerrarla desde otro hilo (cerrar)
+            conexion = sqlite3.connect(Path(self.path).resolve().as_uri() + "?mode=ro", uri=True,
+                                       check_same_thread=False)
+            with self._lock:
+                # El servidor con hilos crea un hilo por petición: sus conexiones no deben acumularse
+                for hilo in [h for h in self._conexiones if not h.is_alive()]:
+                    self._conexiones.pop(hilo).close()
+                self._conexiones[threading.current_thread()] = conexion
+            self._local.conexion = conexion
+        yield conexion
+
+    def cerrar(self):
+        """Cierra las conexiones de lectura de todos los hilos (la próxima consulta abre otra)"""
+        with self._lock:
+            conexiones = list(self._conexiones.values())
+            self._conexiones.clear()
+            self._local = threading.local()
+        for conexion in conexiones:
+            conexion.close()
+
+    def disponible(self) -> bool:
+        """True si el archivo existe, tiene el esquema vigente y documentos de esta colección"""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with self._conexion() as conexion:
+                version = conexion.execute("PRAGMA user_version").fetchone()[0]
+            if version < VERSION_ESQUEMA:
+                logger.warning("⚠️ %s tiene un esquema anterior; ejecute cargar_catalogos.py para migrarlo",
+                               self.path)
+                return False
+            return self.contar() > 0
+        except sqlite3.Error:
+            return False
+
+    def contar(self) -> int:
+        with self._conexion() as conexion:
+            return conexion.execute("SELECT count(*) FROM documentos WHERE coleccion = ?",
+                                    (self.coleccion,)).fetchone()[0]
+
+    def search(self, consulta: str, limite: int = 5, desde: int = 0,
+               coincidencia_minima: float = 0.5) -> Tuple[List[Resultado], int]:
+        """Misma interfaz y criterio de relevancia que SearchIndex.search (puntaje BM25 de FTS5)"""
+        unicos = list(dict.fromkeys(terminos(consulta)))[:_MAX_TERMINOS]
+        if not unicos:
+            return [], 0
+        minimo = max(1, math.ceil(coincidencia_minima * len(unicos)))
+        expresion = " OR ".join(
+            "(" + " AND ".join(f'"{t}"' for t in grupo) + ")"
+            for grupo in itertools.combinations(unicos, minimo)
+        )
+        pesos = ", ".join(str(p) for p in _PESOS_FTS)
+
+        # CROSS JOIN fija el orden: primero la búsqueda FTS y luego el documento
+        # por rowid (con JOIN, SQLite recorría la colección y evaluaba MATCH por fila)
+        with self._conexion() as conexion:
+            total = conexion.execute(
+                "SELECT count(*) FROM documentos_fts f CROSS JOIN documentos d ON d.id = f.rowid "
+                "WHERE documentos_fts MATCH ? AND d.coleccion = ?",
+                (expresion, self.coleccion)
+            ).fetchone()[0]
+            filas = conexion.execute(
+                f"SELECT d.datos, -bm25(documentos_fts, {pesos}) AS puntaje "
+                "FROM documentos_fts f CROSS JOIN documentos d ON d.id = f.rowid "
+                "WHERE documentos_fts MATCH ? AND d.coleccion = ? "
+                "ORDER BY puntaje DESC, d.id LIMIT ? OFFSET ?",
+                (expresion, self.coleccion, limite, desde)
+            ).fetchall()
+        return [Resultado(json.loads(datos), round(puntaje, 4)) for datos, puntaje in filas], total
+
+    def obtener(self, numero: str) -> Optional[Dict]:
+        """Documento por número exacto, clave canónica o solo correlativo (el más reciente)"""
+        numero = numero.strip().upper()
+        clave = clave_numero(numero)
+        correlativo = prefijo_clave(numero)
+        with self._conexion() as conexion:
+            fila = conexion.execute("SELECT datos FROM documentos WHERE coleccion = ? AND numero = ?",
+                                    (self.coleccion, numero)).fetchone()
+            if fila is None and clave:
+                fila = conexion.execute("SELECT datos FROM documentos WHERE coleccion = ? AND clave = ? LIMIT 1",
+                                        (self.coleccion, clave)).fetchone()
+            if fila is None and correlativo and "-" not in correlativo:
+                fila = conexion.execute(
+                    "SELECT datos FROM documentos WHERE coleccion = ? AND clave >= ? AND clave < ? "
+                    "ORDER BY fecha DESC LIMIT 1",
+                    (self.coleccion, correlativo + "-", correlativo + ".")
+                ).fetchone()
+        return json.loads(fila[0]) if fila else None
+
+    def autocompletar(self, prefijo: str, limite: int = 10) -> List[Dict]:
+        """Documentos cuyo número o clave canónica empieza con `prefijo` (rangos sobre índices)"""
+        prefijo = prefijo.strip().upper().replace(" ", "")
+        if not prefijo:
+            return []
+        exacto = self.obtener(prefijo)
+        resultados = [exacto] if exacto else []
+        vistos = {exacto["numero"].upper()} if exacto else set()
+        with self._conexion() as conexion:
+            for columna, inicio in (("numero", prefijo), ("clave", prefijo_clave(prefijo))):
+                if not inicio or len(resultados) >= limite:
+                    continue
+                filas = conexion.execute(
+                    f"SELECT numero, datos FROM documentos WHERE coleccion = ? AND {columna} >= ? "
+                    f"AND {columna} < ? ORDER BY {columna} LIMIT ?",
+                    (self.coleccion, inicio, inicio + "\uffff", limite)
+                ).fetchall()
+                for numero, datos in filas:
+                    if numero not in vistos and len(resultados) < limite:
+                        vistos.add(numero)
+                        resultados.append(json.loads(datos))
+        return resultados
+
+    def recientes(self, cantidad: int = 5) -> List[Dict]:
+        with self._conexion() as conexion:
+            filas = conexion.execute(
+                "SELECT datos FROM documentos WHERE coleccion = ? ORDER BY fecha DESC, id LIMIT ?",
+                (self.coleccion, cantidad)
+            ).fetchall()
+        return [json.loads(datos) for datos, in filas]
+
+
+# =============================================================================
+# CARGA INCREMENTAL
+# =============================================================================
+
+_NUMERO_OPINION = re.compile(r"\bD?\d{1,6}-\d{4}-(?:OECE|OSCE)-DTN\b", re.IGNORECASE)
+_NUMERO_RESOLUCION = re.compile(r"\b\d{1,5}-\d{4}-TCE-S\w{1,2}\b", re.IGNORECASE)
+_FECHA = re.compile(r"\b(20\d{2})-(\d{2})-(\d{2})\b|\b(\d{2})/(\d{2})/(20\d{2})\b")
+
+
+def abrir_para_escritura(path: str) -> sqlite3.Connection:
+    """Abre (o crea) el catálogo con su esquema para cargar documentos"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conexion = sqlite3.connect(path)
+    conexion.execute("PRAGMA journal_mode = WAL")
+    version = conexion.execute("PRAGMA user_version").fetchone()[0]
+    columnas = {fila[1] for fila in conexion.execute("PRAGMA table_info(documentos)")}
+    if columnas and "clave" not in columnas:
+        conexion.execute("ALTER TABLE documentos ADD COLUMN clave TEXT")
+    conexion.executescript(_ESQUEMA)
+
+    if version < VERSION_ESQUEMA:
+        # Versión 2: número en mayúsculas y clave canónica para búsquedas por número
+        with conexion:
+            filas = conexion.execute("SELECT id, numero FROM documentos").fetchall()
+            conexion.executemany("UPDATE documentos SET numero = ?, clave = ? WHERE id = ?",
+                                 [(numero.upper(), clave_numero(numero), id_) for id_, numero in filas])
+            conexion.execute(f"PRAGMA user_version = {VERSION_ESQUEMA}")
+    return conexion
+
+
+def _normalizar_documento(registro: Dict, coleccion: str) -> Optional[Dict]:
+    """Valida un registro y unifica sus campos; None si no tiene número"""
+    documento = {k: v for k, v in registro.items() if v not in (None, "")}
+    numero = str(documento.get("numero", "")).strip()
+    if not numero:
+        return None
+    documento["numero"] = numero
+    clave = documento.get("palabras_clave")
+    if isinstance(clave, str):
+        documento["palabras_clave"] = [p.strip() for p in re.split(r"[;|]", clave) if p.strip()]
+    elif coleccion == OPINIONES:
+        documento.setdefault("palabras_clave", [])
+    return documento
+
+
+def leer_jsonl(path: str) -> Iterator[Dict]:
+    with open(path, encoding="utf-8") as f:
+        for linea in f:
+            if linea.strip():
+                yield json.loads(linea)
+
+
+def leer_csv(path: str) -> Iterator[Dict]:
+    """CSV con encabezados; palabras_clave separadas por ';' o '|'"""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        yield from csv.DictReader(f)
+
+
+def leer_pdf(path: str, coleccion: str) -> Iterator[Dict]:
+    """
+    Un PDF por opinión o resolución: el número y la fecha se toman del texto
+    (o del nombre del archivo); el tema es la primera línea con contenido
+    después del número y el resumen, el inicio del texto.
+    """
+    import fitz  # PyMuPDF
+
+    with fitz.open(path) as doc:
+        texto = "\n".join(doc[i].get_text() for i in range(min(len(doc), 3)))
+
+    patron = _NUMERO_OPINION if coleccion == OPINIONES else _NUMERO_RESOLUCION
+    encontrado = patron.search(texto) or patron.search(os.path.basename(path))
+    if not encontrado:
+        logger.warning("⚠️ %s: no se encontró el número del documento", path)
+        return
+    numero = encontrado.group(0).upper()
+
+    fecha = None
+    m = _FECHA.search(texto)
+    if m:
+        fecha = f"{m.group(1)}-{m.group(2)}-{m.group(3)}" if m.group(1) else f"{m.group(6)}-{m.group(5)}-{m.group(4)}"
+
+    lineas = [l.strip() for l in texto.splitlines()
+              if len(l.strip()) > 15 and numero not in l.upper() and not _FECHA.search(l)]
+    titulo = lineas[0] if lineas else numero
+    yield {
+        "numero": numero,
+        "fecha": fecha,
+        "tema" if coleccion == OPINIONES else "materia": titulo[:200],
+        "resumen": " ".join(" ".join(lineas[1:]).split())[:600],
+    }
+
+
+def _leer_archivo(path: str, coleccion: str) -> Iterator[Dict]:
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".jsonl":
+        return leer_jsonl(path)
+    if extension == ".csv":
+        return leer_csv(path)
+    if extension == ".pdf":
+        return leer_pdf(path, coleccion)
+    raise ValueError(f"Formato no soportado: {path}")
+
+
+def _insertar(conexion: sqlite3.Connection, documento: Dict, coleccion: str, fuente: str):
+    """Inserta o reemplaza un documento por (colección, número) junto con su fila FTS"""
+    numero = documento["numero"].upper()
+    anterior = conexion.execute("SELECT id FROM documentos WHERE coleccion = ? AND numero = ?",
+                                (coleccion, numero)).fetchone()
+    if anterior:
+        conexion.execute("DELETE FROM documentos_fts WHERE rowid = ?", anterior)
+        conexion.execute("DELETE FROM documentos WHERE id = ?", anterior)
+
+    cursor = conexion.execute(
+        "INSERT INTO documentos (coleccion, numero, clave, fecha, fuente, datos) VALUES (?, ?, ?, ?, ?, ?)",
+        (coleccion, numero, clave_numero(numero), documento.get("fecha"), fuente,
+         json.dumps(documento, ensure_ascii=False))
+    )
+    campos = {
+        "numero": documento["numero"],
+        "titulo": documento.get("tema") or documento.get("materia") or "",
+        "palabras_clave": " ".join(documento.get("palabras_clave") or []),
+        "tipo": documento.get("tipo", ""),
+        "resumen": documento.get("resumen", ""),
+    }
+    conexion.execute(
+        f"INSERT INTO documentos_fts (rowid, {', '.join(_COLUMNAS_FTS)}) VALUES (?, ?, ?, ?, ?, ?)",
+        (cursor.lastrowid, *(" ".join(terminos(str(campos[c]))) for c in _COLUMNAS_FTS))
+    )
+
+
+def _borrar_fuente(conexion: sqlite3.Connection, fuente: str) -> int:
+    ids = conexion.execute("SELECT id FROM documentos WHERE fuente = ?", (fuente,)).fetchall()
+    conexion.executemany("DELETE FROM documentos_fts WHERE rowid = ?", ids)
+    conexion.execute("DELETE FROM documentos WHERE fuente = ?", (fuente,))
+    conexion.execute("DELETE FROM fuentes WHERE ruta = ?", (fuente,))
+    return len(ids)
+
+
+def cargar_documentos(conexion: sqlite3.Connection, documentos, coleccion: str, fuente: str) -> int:
+    """Reemplaza los documentos de una fuente; retorna cuántos se cargaron"""
+    _borrar_fuente(conexion, fuente)
+    cargados = 0
+    for registro in documentos:
+        documento = _normalizar_documento(registro, coleccion)
+        if documento is None:
+            logger.warning("⚠️ %s: registro sin número, se omite", fuente)
+            continue
+        _insertar(conexion, documento, coleccion, fuente)
+        cargados += 1
+    return cargados
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            digest.update(bloque)
+    return digest.hexdigest()
+
+
+def cargar_carpeta(path_db: str, carpeta: str, coleccion: str) -> Dict:
+    """
+    Sincroniza una carpeta de archivos .jsonl, .csv y .pdf con el catálogo
+
+    Solo se relee un archivo si cambió su tamaño o fecha de modificación y,
+    además, su SHA-256. Los documentos de archivos que ya no están en la
+    carpeta se eliminan (los cargados desde otras carpetas no se tocan).
+    Cada archivo se carga en su propia transacción: un archivo con errores
+    no deja el catálogo a medias.
+
+    Returns:
+        Conteo de archivos nuevos, actualizados, sin cambios, eliminados y con error
+    """
+    if coleccion not in (OPINIONES, RESOLUCIONES):
+        raise ValueError(f"Colección desconocida: {coleccion}")
+
+    resumen = {"nuevos": 0, "actualizados": 0, "sin_cambios": 0, "eliminados": 0,
+               "errores": 0, "documentos": 0}
+    carpeta = os.path.abspath(carpeta)
+    conexion = abrir_para_escritura(path_db)
+    try:
+        # Solo los archivos de esta carpeta: cargar otra no borra lo cargado desde la primera
+        registradas = {ruta: (sha, mtime, tamano) for ruta, sha, mtime, tamano in conexion.execute(
+            "SELECT ruta, sha256, mtime, tamano FROM fuentes WHERE coleccion = ?", (coleccion,))
+            if os.path.dirname(ruta) == carpeta}
+        presentes = set()
+
+        for nombre in sorted(os.listdir(carpeta)):
+            path = os.path.abspath(os.path.join(carpeta, nombre))
+            if os.path.splitext(nombre)[1].lower() not in (".jsonl", ".csv", ".pdf"):
+                continue
+            presentes.add(path)
+            estado = os.stat(path)
+            anterior = registradas.get(path)
+            if anterior and anterior[1] == estado.st_mtime and anterior[2] == estado.st_size:
+                resumen["sin_cambios"] += 1
+                continue
+            sha = _sha256(path)
+            if anterior and anterior[0] == sha:
+                with conexion:
+                    conexion.execute("UPDATE fuentes SET mtime = ?, tamano = ? WHERE ruta = ?",
+                                     (estado.st_mtime, estado.st_size, path))
+                resumen["sin_cambios"] += 1
+                continue
+
+            try:
+                with conexion:
+                    cargados = cargar_documentos(conexion, _leer_archivo(path, coleccion), coleccion, path)
+                    conexion.execute(
+                        "INSERT INTO fuentes (ruta, coleccion, sha256, mtime, tamano, documentos) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (path, coleccion, sha, estado.st_mtime, estado.st_size, cargados)
+                    )
+            except Exception as e:
+                logger.error("❌ Error cargando %s: %s", path, e)
+                resumen["errores"] += 1
+                continue
+            resumen["actualizados" if anterior else "nuevos"] += 1
+            resumen["documentos"] += cargados
+
+        for path in set(registradas) - presentes:
+            with conexion:
+                _borrar_fuente(conexion, path)
+            resumen["eliminados"] += 1
+    finally:
+        conexion.close()
+    return resumen
+
+
+def sembrar(path_db: str, documentos: List[Dict], coleccion: str) -> bool:
+    """
+    Carga en el catálogo la lista incorporada en el código (fuente "<incorporados>")
+    para que el catálogo sea un superconjunto de ella. Solo escribe si la lista cambió.
+    """
+    fuente = f"<incorporados:{coleccion}>"
+    sha = hashlib.sha256(json.dumps(documentos, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+    conexion = abrir_para_escritura(path_db)
+    try:
+        fila = conexion.execute("SELECT sha256 FROM fuentes WHERE ruta = ?", (fuente,)).fetchone()
+        if fila and fila[0] == sha:
+            return False
+        with conexion:
+            cargados = cargar_documentos(conexion, documentos, coleccion, fuente)
+            conexion.execute(
+                "INSERT INTO fuentes (ruta, coleccion, sha256, mtime, tamano, documentos) VALUES (?, ?, ?, 0, 0, ?)",
+                (fuente, coleccion, sha, cargados)
+            )
+        return True
+    finally:
+        conexion.close()
+
+
+def abrir_catalogo(path: str, coleccion: str, incorporados: List[Dict]):
+    """
+    Fuente de búsqueda de una colección
+
+    Returns:
+        CatalogoStore si el catálogo en disco ya tiene documentos de la
+        colección (ver cargar_catalogos.py); si no, un SearchIndex en memoria
+        con la lista incorporada en el código. Ambos tienen la misma interfaz
+        de búsqueda.
+    """
+    store = CatalogoStore(path, coleccion)
+    if store.disponible():
+        logger.info("📚 Catálogo de %s en disco: %d documentos", coleccion, store.contar())
+        return store
+    indice = SearchIndex()
+    indice.extend(incorporados)
+    return indice
@@ -0,0 +1,214 @@
+"""
+Circuit Breaker para Servicios Externos
+Corta las llamadas a un servicio que falla o tarda, y prueba su recuperación
+Agente de Contrataciones Públicas - Perú
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+from engine.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+CERRADO = "cerrado"
+ABIERTO = "abierto"
+SEMIABIERTO = "semiabierto"
+
+
+class CircuitOpenError(Exception):
+    """El circuito está abierto: la llamada se rechaza sin esperar al servicio"""
+
+
+class CallTimeoutError(Exception):
+    """La llamada superó el tiempo máximo permitido"""
+
+
+class CallQueueTimeoutError(CallTimeoutError):
+    """No hubo un hilo libre a tiempo: la llamada se canceló sin llegar al servicio"""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker con timeout por llamada y prueba semiabierta
+
+    - cerrado: las llamadas pasan; `failure_threshold` fallos seguidos
+      (errores o timeouts) abren el circuito.
+    - abierto: las llamadas se rechazan al instante con CircuitOpenError
+      durante `reset_timeout` segundos.
+    - semiabierto: se deja pasar una sola llamada de prueba; si responde,
+      el circuito se cierra y si falla vuelve a abrirse.
+
+    El timeout se aplica esperando la llamada en un pool de hilos: el usuario
+    deja de esperar aunque la petición al servicio siga en curso. Se cuenta
+    desde que la llamada empieza a ejecutarse; una llamada que espera un hilo
+    libre más de `call_timeout` se cancela (nunca llega al servicio) con
+    CallQueueTimeoutError y no cuenta como fallo: la saturación del pool
+    local no abre el circuito.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 call_timeout: Optional[float] = 20.0, max_workers: int = 16,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.call_timeout = call_timeout
+        self.max_workers = max_workers
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._estado = CERRADO
+        self._fallos_seguidos = 0
+        self._abierto_desde = 0.0
+        self._prueba_en_curso = False
+        self._ultimo_error: Optional[str] = None
+        self.stats = {
+            "llamadas": 0,
+            "fallos": 0,
+            "timeouts": 0,
+            "canceladas_en_cola": 0,
+            "rechazadas": 0,
+            "aperturas": 0
+        }
+
+    # =========================================================================
+    # ESTADO
+    # =========================================================================
+
+    @property
+    def estado(self) -> str:
+        with self._lock:
+            return self._estado_actual()
+
+    def _estado_actual(self) -> str:
+        """Pasa de abierto a semiabierto cuando vence el tiempo de espera (con lock)"""
+        if self._estado == ABIERTO and self._clock() - self._abierto_desde >= self.reset_timeout:
+            self._cambiar_estado(SEMIABIERTO)
+        return self._estado
+
+    def _cambiar_estado(self, nuevo: str):
+        if nuevo == self._estado:
+            return
+        logger.warning("🔌 Circuito %s: %s → %s", self.name, self._estado, nuevo)
+        self._estado = nuevo
+        metrics.incr("circuit_transitions", breaker=self.name, estado=nuevo)
+        if nuevo == ABIERTO:
+            self._abierto_desde = self._clock()
+            self.stats["aperturas"] += 1
+
+    def _admitir(self) -> bool:
+        """Decide si la llamada pasa; en semiabierto solo pasa la prueba"""
+        with self._lock:
+            estado = self._estado_actual()
+            if estado == CERRADO:
+                return True
+            if estado == SEMIABIERTO and not self._prueba_en_curso:
+                self._prueba_en_curso = True
+                return True
+            self.stats["rechazadas"] += 1
+            return False
+
+    def _registrar_exito(self):
+        with self._lock:
+            self._fallos_seguidos = 0
+            self._prueba_en_curso = False
+            self._cambiar_estado(CERRADO)
+
+    def _registrar_fallo(self, error: BaseException):
+        with self._lock:
+            self.stats["fallos"] += 1
+            self._fallos_seguidos += 1
+            self._ultimo_error = f"{type(error).__name__}: {error}"
+            if self._prueba_en_curso or self._fallos_seguidos >= self.failure_threshold:
+                self._prueba_en_curso = False
+                self._cambiar_estado(ABIERTO)
+
+    # =========================================================================
+    # LLAMADA PROTEGIDA
+    # =========================================================================
+
+    def call(self, fn: Callable[[], Any]) -> Any:
+        """
+        Ejecuta `fn` protegida por el circuito
+
+        Raises:
+            CircuitOpenError: si el circuito está abierto
+            CallTimeoutError: si la llamada supera `call_timeout`
+        """
+        if not self._admitir():
+            metrics.incr("circuit_rejected_calls", breaker=self.name)
+            raise CircuitOpenError(f"Circuito {self.name} abierto")
+
+        with self._lock:
+            self.stats["llamadas"] += 1
+
+        try:
+            resultado = self._ejecutar(fn)
+        except CallQueueTimeoutError:
+            with self._lock:
+                self._prueba_en_curso = False
+            raise
+        except BaseException as e:
+            self._registrar_fallo(e)
+            raise
+        self._registrar_exito()
+        return resultado
+
+    def _ejecutar(self, fn: Callable[[], Any]) -> Any:
+        if not self.call_timeout:
+            return fn()
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix=f"breaker-{self.name}")
+        inicio = []
+        empezo = threading.Event()
+
+        def ejecutar():
+            inicio.append(time.monotonic())
+            empezo.set()
+            return fn()
+
+        futuro = self._executor.submit(ejecutar)
+        if not empezo.wait(self.call_timeout) and futuro.cancel():
+            with self._lock:
+                self.stats["canceladas_en_cola"] += 1
+            metrics.incr("circuit_queue_timeouts", breaker=self.name)
+            raise CallQueueTimeoutError(f"{self.name}: sin hilo libre en {self.call_timeout:g}s")
+        empezo.wait()
+        try:
+            return futuro.result(timeout=max(0.0, self.call_timeout - (time.monotonic() - inicio[0])))
+        except FutureTimeoutError:
+            futuro.cancel()
+            with self._lock:
+                self.stats["timeouts"] += 1
+            raise CallTimeoutError(f"{self.name} no respondió en {self.call_timeout:g}s")
+
+    def reset(self):
+        """Cierra el circuito manualmente"""
+        with self._lock:
+            self._fallos_seguidos = 0
+            self._prueba_en_curso = False
+            self._cambiar_estado(CERRADO)
+
+    def status(self) -> Dict:
+        """Estado para /api/health"""
+        with self._lock:
+            estado = self._estado_actual()
+            resultado = {
+                "estado": estado,
+                "fallos_seguidos": self._fallos_seguidos,
+                "umbral_fallos": self.failure_threshold,
+                "timeout_s": self.call_timeout,
+                "ultimo_error": self._ultimo_error,
+                **self.stats
+            }
+            if estado == ABIERTO:
+                restante = self.reset_timeout - (self._clock() - self._abierto_desde)
+                resultado["reintento_en_s"] = round(max(0.0, restante), 1)
+            return resultado
@@ -3,18 +3,32 @@ Motor de Conversación Híbrido
 Sistema de 3 capas: Respuestas Rápidas → RAG → Gemini
 Agente de Contrataciones Públicas - Perú
 """
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+import logging
+import threading
 import time
 
 from config import Config
-import google.generativeai as genai
+from engine.llm_client import get_llm_client
 
 # Importar el sistema de respuestas rápidas
-from engine.respuestas_rapidas import buscar_respuesta_rapida
+from engine.respuestas_rapidas import buscar_respuesta_rapida, buscar_mejor_coincidencia
 
 # Importar el motor RAG
 from engine.rag_engine import RagEngine
 
+# Métricas de latencia por capa
+from engine.metrics import metrics
+
+# Circuit breaker de Gemini (respaldo sin IA cuando está abierto)
+from engine.circuit_breaker import CircuitOpenError, CallTimeoutError
+
+# Coalescencia de preguntas idénticas concurrentes
+from engine.singleflight import SingleFlight, normalizar_prompt
+
+# Estimación de tokens compartida con los prompts de PDFs
+from engine.texto import estimar_tokens
+
 # Importar módulos especializados
 from engine.penalties import PenaltiesCalculator
 from engine.adicionales import AdicionalesCalculator
@@ -24,6 +38,8 @@ from engine.nulidad import NulidadAnalyzer
 from engine.ampliaciones import AmpliacionesResolucion
 from engine.jprd_arbitraje import JPRDArbitraje
 
+logger = logging.getLogger(__name__)
+
 
 class ConversationEngine:
     """
@@ -33,12 +49,11 @@ class ConversationEngine:
     3. Gemini como fallback (2-5 segundos)
     """
     
+    # Prompt de sistema estático: se envía como system_instruction del modelo
+    # cacheado. El contexto RAG va solo en el turno actual (ver _construir_turno)
     SYSTEM_PROMPT = """Eres INKABOT, un asesor legal experto especializado en contrataciones públicas del Perú.
 Tu misión es ayudar a proveedores, contratistas y funcionarios públicos con información precisa y actualizada.
 
-CONTEXTO ADICIONAL DEL DOCUMENTO RECUPERADO:
-{rag_context}
-
 ═══════════════════════════════════════════════════════════════════════════════
                            TU BASE DE CONOCIMIENTO
 ═══════════════════════════════════════════════════════════════════════════════
@@ -116,123 +131,226 @@ CONTEXTO ADICIONAL DEL DOCUMENTO RECUPERADO:
 6. Si te piden calcular, explica el razonamiento
 7. Incluye base legal en tus respuestas"""
 
-    def __init__(self):
-        """Inicializa el motor de conversación híbrido"""
-        # Configurar Gemini
-        genai.configure(api_key=Config.GEMINI_API_KEY)
+    def __init__(self, llm=None, rag_engine: Optional[RagEngine] = None):
+        """
+        Inicializa el motor de conversación híbrido
+        
+        Args:
+            llm: Gestor del cliente Gemini (por defecto, el compartido del proceso)
+            rag_engine: Motor RAG ya construido (por defecto se crea uno)
+        """
+        # Cliente Gemini compartido (configurado una sola vez por proceso)
+        self.llm = llm or get_llm_client()
         
         # Inicializar RAG Engine
-        print("📚 Inicializando motor RAG...")
-        self.rag_engine = RagEngine()
+        logger.info("📚 Inicializando motor RAG...")
+        self.rag_engine = rag_engine or RagEngine()
+        
+        self.model = self.llm.get_model(Config.GEMINI_MODEL, system_instruction=self.SYSTEM_PROMPT)
+        self.tokens_sistema = estimar_tokens(self.SYSTEM_PROMPT)
         
-        self.model = genai.GenerativeModel(
-            model_name=Config.GEMINI_MODEL,
-            system_instruction=self.SYSTEM_PROMPT.format(rag_context="")
-        )
+        # Historial por sesión: solo preguntas y respuestas, sin contexto RAG
+        self.historiales: Dict[str, List[Dict]] = {}
         
-        # Chats por sesión
-        self.chats: Dict[str, any] = {}
+        # Primeras preguntas idénticas y concurrentes comparten una sola llamada a Gemini
+        self._gemini_flight = SingleFlight("gemini")
+        
+        # Uso de tokens de la última petición atendida por cada hilo
+        self._local = threading.local()
         
         # Estadísticas
         self.stats = {
             "respuestas_rapidas": 0,
             "respuestas_rag": 0,
-            "respuestas_gemini": 0
+            "respuestas_gemini": 0,
+            "respuestas_degradadas": 0,
+            "tokens_prompt": 0,
+            "tokens_respuesta": 0
         }
         
-        print("🔷 Motor Híbrido inicializado")
-        print("   ├── Capa 1: Respuestas Rápidas ✅")
-        print("   ├── Capa 2: RAG ✅")
-        print("   └── Capa 3: Gemini Fallback ✅")
+        logger.info("🔷 Motor Híbrido inicializado (Respuestas Rápidas → RAG → Gemini)")
     
-    def _get_chat(self, session_id: str, rag_context: str = ""):
-        """Obtiene o crea un chat para la sesión"""
-        if session_id not in self.chats:
-            # Si se pasa contexto, inyectarlo en el system prompt para esta sesión nueva
-            prompt_con_contexto = self.SYSTEM_PROMPT.format(rag_context=rag_context)
-            
-            model = genai.GenerativeModel(
-                model_name=Config.GEMINI_MODEL,
-                system_instruction=prompt_con_contexto
-            )
-            self.chats[session_id] = model.start_chat(history=[])
-        return self.chats[session_id]
+    def _construir_turno(self, message: str, rag_context: str) -> str:
+        """Turno actual: sección de contexto (si hay) + pregunta del usuario"""
+        if not rag_context:
+            return message
+        return f"""INFORMACIÓN DE REFERENCIA (USAR PARA RESPONDER):
+{rag_context}
+
+PREGUNTA DEL USUARIO:
+{message}"""
+    
+    def _llamar_gemini(self, historial: List[Dict], turno: str):
+        """Llamada a Gemini con el historial podado más el turno actual"""
+        contents = historial + [{"role": "user", "parts": [turno]}]
+        response = self.llm.generate(contents, Config.GEMINI_MODEL, self.SYSTEM_PROMPT)
+        
+        # Tokens realmente facturados (solo el líder en llamadas coalescidas:
+        # los seguidores no ejecutan esta función)
+        self._local.llamo_gemini = True
+        uso = getattr(response, "usage_metadata", None)
+        if uso is not None:
+            metrics.incr("llm_tokens", uso.prompt_token_count, tipo="prompt")
+            metrics.incr("llm_tokens", uso.candidates_token_count, tipo="respuesta")
+        return response
     
-    def process(self, message: str, session_id: str = "default") -> str:
+    def _registrar_uso(self, historial: List[Dict], message: str, rag_context: str, response) -> Dict:
+        """
+        Contabiliza los tokens de la petición por sección del prompt
+        
+        Una petición que esperó la llamada de otra idéntica (coalescida)
+        conoce su uso pero no lo suma a los totales: se facturó una sola vez.
+        """
+        uso = {
+            "sistema": self.tokens_sistema,
+            "historial": sum(estimar_tokens(p["parts"][0]) for p in historial),
+            "contexto": estimar_tokens(rag_context) if rag_context else 0,
+            "pregunta": estimar_tokens(message),
+            "respuesta": estimar_tokens(response.text),
+            "estimado": True
+        }
+        uso["prompt"] = uso["sistema"] + uso["historial"] + uso["contexto"] + uso["pregunta"]
+        
+        metadata = getattr(response, "usage_metadata", None)
+        if metadata is not None:
+            uso["prompt"] = metadata.prompt_token_count
+            uso["respuesta"] = metadata.candidates_token_count
+            uso["estimado"] = False
+        
+        uso["coalescida"] = not getattr(self._local, "llamo_gemini", False)
+        if not uso["coalescida"]:
+            self.stats["tokens_prompt"] += uso["prompt"]
+            self.stats["tokens_respuesta"] += uso["respuesta"]
+        self._local.ultimo_uso = uso
+        return uso
+    
+    def get_last_usage(self) -> Optional[Dict]:
+        """Tokens de la última petición procesada en este hilo (None si no llamó a Gemini)"""
+        return getattr(self._local, "ultimo_uso", None)
+    
+    def get_last_layer(self) -> Optional[str]:
+        """Capa que respondió la última petición de este hilo (respuesta_rapida, gemini, degradada...)"""
+        return getattr(self._local, "ultima_capa", None)
+    
+    def process(self, message: str, session_id: str = "default", rag_results: Optional[List[str]] = None) -> str:
         """
         Procesa un mensaje usando el sistema híbrido de 3 capas:
         1. Busca en respuestas precalculadas (milisegundos)
-        2. Busca en RAG (próxima implementación)
+        2. Busca en RAG
         3. Usa Gemini como fallback
+        
+        El prompt se arma como: system prompt estático (una vez, en el modelo)
+        + historial podado (sin contexto RAG) + contexto y pregunta del turno actual.
+        
+        Args:
+            rag_results: Fragmentos ya recuperados (p. ej. por un lote de embeddings);
+                         si es None se busca en el RAG
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         rag_context = ""
+        self._local.ultimo_uso = None
+        self._local.ultima_capa = None
+        self._local.llamo_gemini = False
         
         try:
             # ═══════════════════════════════════════════════════════════
             # CAPA 1: RESPUESTAS RÁPIDAS PRECALCULADAS
             # ═══════════════════════════════════════════════════════════
-            respuesta_rapida = buscar_respuesta_rapida(message)
+            with metrics.timer("quick_answer"):
+                respuesta_rapida = buscar_respuesta_rapida(message)
             
             if respuesta_rapida:
-                elapsed = (time.time() - start_time) * 1000
                 self.stats["respuestas_rapidas"] += 1
-                print(f"⚡ Respuesta rápida encontrada en {elapsed:.0f}ms")
+                self._local.ultima_capa = "respuesta_rapida"
+                logger.debug("⚡ Respuesta rápida encontrada en %.0fms", (time.perf_counter() - start_time) * 1000)
                 return respuesta_rapida
             
             # ═══════════════════════════════════════════════════════════
             # CAPA 2: RAG (Búsqueda Semántica)
             # ═══════════════════════════════════════════════════════════
-            print("🔍 Buscando en documentos RAG...")
-            rag_results = self.rag_engine.search(message)
+            if rag_results is None:
+                logger.debug("🔍 Buscando en documentos RAG...")
+                rag_results = self.rag_engine.search(message)
             
             if rag_results:
-                rag_context = "\\n\\n".join(rag_results)
-                print(f"📄 Se encontraron {len(rag_results)} fragmentos relevantes")
+                rag_context = "\n\n".join(rag_results)
+                logger.debug("📄 Se encontraron %d fragmentos relevantes", len(rag_results))
                 self.stats["respuestas_rag"] += 1
             else:
-                print("⚠️ No se encontraron documentos relevantes")
+                logger.debug("⚠️ No se encontraron documentos relevantes")
             
             # ═══════════════════════════════════════════════════════════
             # CAPA 3: GEMINI FALLBACK
             # ═══════════════════════════════════════════════════════════
+            with metrics.timer("prompt_build"):
+                historial = list(self.historiales.get(session_id, []))
+                turno = self._construir_turno(message, rag_context)
             
-            # Estrategia: Inyectar contexto en el mensaje actual
-            final_prompt = message
-            if rag_context:
-                final_prompt = f"""
-INFORMACIÓN DE REFERENCIA (USAR PARA RESPONDER):
-{rag_context}
-
-PREGUNTA DEL USUARIO:
-{message}
-"""
+            with metrics.timer("gemini"):
+                if historial:
+                    response = self._llamar_gemini(historial, turno)
+                else:
+                    # Sin historial la respuesta solo depende de la pregunta y del
+                    # contexto indexado: las peticiones idénticas concurrentes
+                    # esperan una sola llamada
+                    clave = (normalizar_prompt(message), self.rag_engine.context_version)
+                    response = self._gemini_flight.do(clave, lambda: self._llamar_gemini([], turno))
             
-            # Recuperar chat existente
-            chat = self._get_chat(session_id)
+            respuesta = response.text
             
-            # Enviar mensaje (con o sin contexto extra)
-            response = chat.send_message(final_prompt)
+            # El contexto RAG no se guarda: el historial solo lleva pregunta y respuesta
+            historial += [
+                {"role": "user", "parts": [message]},
+                {"role": "model", "parts": [respuesta]}
+            ]
+            self.historiales[session_id] = historial[-2 * Config.MAX_HISTORY_TURNS:]
             
-            elapsed = (time.time() - start_time) * 1000
+            uso = self._registrar_uso(historial[:-2], message, rag_context, response)
             self.stats["respuestas_gemini"] += 1
-            print(f"🤖 Respuesta Gemini generada en {elapsed:.0f}ms")
+            self._local.ultima_capa = "gemini_rag" if rag_context else "gemini"
+            logger.debug(
+                "🤖 Respuesta Gemini generada en %.0fms (tokens prompt=%d, respuesta=%d)",
+                (time.perf_counter() - start_time) * 1000, uso["prompt"], uso["respuesta"]
+            )
             
-            return response.text
+            return respuesta
             
+        except (CircuitOpenError, CallTimeoutError) as e:
+            logger.warning("⚠️ Gemini no disponible (%s), respondiendo sin IA", e)
+            return self._respuesta_degradada(message, rag_results, "circuito" if isinstance(e, CircuitOpenError) else "timeout")
         except Exception as e:
             error_msg = str(e)
+            self._local.ultima_capa = "error"
             if "api_key" in error_msg.lower():
                 return "❌ **Error de autenticación**: Verifica tu GEMINI_API_KEY"
             if "quota" in error_msg.lower():
-                return "❌ **Límite alcanzado**: Intenta en unos minutos"
+                return self._respuesta_degradada(message, rag_results, "cuota")
             return f"❌ Error: {error_msg}"
     
+    def _respuesta_degradada(self, message: str, rag_results: List[str], motivo: str) -> str:
+        """
+        Respaldo cuando Gemini no responde: la respuesta precalculada más
+        parecida o, si no hay, los fragmentos RAG más relevantes tal cual
+        """
+        self.stats["respuestas_degradadas"] += 1
+        self._local.ultima_capa = "degradada"
+        metrics.incr("degraded_responses", motivo=motivo)
+        aviso = "ℹ️ *El asistente de IA no está disponible en este momento; te comparto la información más cercana que tengo.*"
+        
+        coincidencia = buscar_mejor_coincidencia(message)
+        if coincidencia:
+            return f"{aviso}\n\n{coincidencia[0]}"
+        
+        if rag_results:
+            fragmentos = "\n\n".join(f"**{i}.** {texto.strip()}" for i, texto in enumerate(rag_results[:3], 1))
+            return f"{aviso}\n\n📄 **Fragmentos relevantes de la normativa:**\n\n{fragmentos}"
+        
+        return "❌ **Límite alcanzado**: El asistente de IA no está disponible. Intenta en unos minutos"
+    
     def get_stats(self) -> dict:
         """Retorna estadísticas de uso"""
         return self.stats
     
     def clear_session(self, session_id: str):
         """Limpia la memoria de una sesión"""
-        if session_id in self.chats:
-            del self.chats[session_id]
+        self.historiales.pop(session_id, None)
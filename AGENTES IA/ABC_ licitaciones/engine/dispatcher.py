@@ -0,0 +1,91 @@
+"""
+Despachador Determinista de Módulos Especializados
+Ejecuta los detectores locales (detect_and_*) antes de recurrir a Gemini
+Agente de Contrataciones Públicas - Perú
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[str], Optional[str]]
+
+
+class DeterministicDispatcher:
+    """
+    Tabla de despacho de módulos locales en orden de prioridad.
+
+    Cada entrada es (nombre, handler). El primer handler que retorna una
+    respuesta gana; si ninguno responde, la consulta pasa al motor
+    conversacional (RAG + Gemini). Se registran llamadas, aciertos y
+    latencia por handler.
+    """
+
+    def __init__(self, handlers: List[Tuple[str, Handler]]):
+        self.handlers = list(handlers)
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Dict] = {
+            nombre: {
+                "llamadas": 0,
+                "aciertos": 0,
+                "errores": 0,
+                "tiempo_total_ms": 0.0,
+                "tiempo_max_ms": 0.0
+            }
+            for nombre, _ in self.handlers
+        }
+
+    def dispatch(self, message: str) -> Optional[Tuple[str, str]]:
+        """
+        Prueba los handlers en orden de prioridad
+
+        Returns:
+            Tupla (nombre_handler, respuesta) o None si ninguno aplica
+        """
+        for nombre, handler in self.handlers:
+            inicio = time.perf_counter()
+            error = False
+            try:
+                respuesta = handler(message)
+            except Exception as e:
+                logger.warning("⚠️ Error en módulo %s: %s", nombre, e)
+                respuesta = None
+                error = True
+            elapsed = (time.perf_counter() - inicio) * 1000
+
+            self._registrar(nombre, elapsed, bool(respuesta), error)
+            if respuesta:
+                return nombre, respuesta
+
+        return None
+
+    def _registrar(self, nombre: str, elapsed_ms: float, acierto: bool, error: bool):
+        """Actualiza las estadísticas de un handler"""
+        with self._lock:
+            stats = self.stats[nombre]
+            stats["llamadas"] += 1
+            stats["tiempo_total_ms"] += elapsed_ms
+            stats["tiempo_max_ms"] = max(stats["tiempo_max_ms"], elapsed_ms)
+            if acierto:
+                stats["aciertos"] += 1
+            if error:
+                stats["errores"] += 1
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Retorna estadísticas por handler, en orden de prioridad"""
+        with self._lock:
+            resultado = {}
+            for nombre, _ in self.handlers:
+                stats = self.stats[nombre]
+                llamadas = stats["llamadas"]
+                resultado[nombre] = {
+                    "llamadas": llamadas,
+                    "aciertos": stats["aciertos"],
+                    "errores": stats["errores"],
+                    "tiempo_promedio_ms": round(stats["tiempo_total_ms"] / llamadas, 3) if llamadas else 0.0,
+                    "tiempo_max_ms": round(stats["tiempo_max_ms"], 3)
+                }
+            return resultado
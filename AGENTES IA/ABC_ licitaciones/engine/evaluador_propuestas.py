@@ -12,6 +12,13 @@ from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import re
 
+from engine.texto import patron_palabras
+
+_CLAVES_EVALUACION = patron_palabras([
+    'evaluación', 'evaluacion', 'evaluar', 'puntaje', 'puntajes', 'calificaron',
+    'calificación', 'calificacion', 'error aritmético', 'error aritmetico',
+    'propuesta técnica', 'propuesta tecnica', 'propuesta económica', 'propuesta economica'])
+
 
 class EvaluadorPropuestas:
     """
@@ -598,13 +605,7 @@ un especialista en contrataciones públicas.
     
     def detect_and_process(self, message: str) -> Optional[str]:
         """Detecta si el mensaje es consulta sobre evaluación"""
-        message_lower = message.lower()
-        
-        keywords = ['evaluación', 'evaluacion', 'evaluar', 'puntaje', 
-                    'calificaron', 'calificación', 'error aritmético',
-                    'propuesta técnica', 'propuesta económica']
-        
-        if not any(kw in message_lower for kw in keywords):
+        if not _CLAVES_EVALUACION.search(message):
             return None
         
         return get_evaluador_info()
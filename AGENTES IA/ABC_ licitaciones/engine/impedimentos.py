@@ -5,6 +5,14 @@ Ley N° 32069 - Artículo 11
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 
+from engine.texto import patron_palabras
+
+_CLAVES_IMPEDIMENTOS = patron_palabras([
+    'impedido', 'impedidos', 'impedimento', 'impedimentos', 'puede participar', 'puede contratar',
+    'cuñado', 'cuñada', 'pariente', 'parientes', 'familiar', 'hijo de', 'hija de', 'esposo de', 'esposa de'])
+_PARENTESCOS = patron_palabras(['cuñado', 'cuñada', 'suegro', 'suegra', 'yerno', 'nuera',
+                                'padre', 'madre', 'hijo', 'hija', 'hermano', 'hermana'])
+
 
 class ImpedimentosVerifier:
     """
@@ -297,27 +305,22 @@ class ImpedimentosVerifier:
 
 📚 *Base legal: Art. 11 Ley 32069*"""
     
-    def detect_and_verify(self, message: str) -> Optional[str]:
+    def detect_and_verify(self, message: str, solo_calculo: bool = False) -> Optional[str]:
         """
         Detecta si el mensaje es consulta de impedimentos
+        
+        Args:
+            solo_calculo: Retornar None en lugar de la ficha informativa cuando
+                no se menciona un parentesco (así la consulta pasa al RAG/Gemini)
         """
         message_lower = message.lower()
         
-        keywords = ['impedido', 'impedimento', 'puede participar', 'puede contratar', 
-                    'cuñado', 'pariente', 'familiar', 'hijo de', 'esposo de']
-        
-        if not any(kw in message_lower for kw in keywords):
+        if not _CLAVES_IMPEDIMENTOS.search(message):
             return None
         
         # Detectar parentesco
-        parentescos = ['cuñado', 'cuñada', 'suegro', 'suegra', 'yerno', 'nuera',
-                       'padre', 'madre', 'hijo', 'hija', 'hermano', 'hermana']
-        
-        parentesco_encontrado = None
-        for p in parentescos:
-            if p in message_lower:
-                parentesco_encontrado = p
-                break
+        match = _PARENTESCOS.search(message)
+        parentesco_encontrado = match.group(0).lower() if match else None
         
         # Detectar cargo
         cargos = ['alcalde', 'gobernador', 'regidor', 'director', 'funcionario', 
@@ -336,7 +339,7 @@ class ImpedimentosVerifier:
             )
             return self.formatear_resultado(resultado)
         
-        return get_impedimentos_info()
+        return None if solo_calculo else get_impedimentos_info()
 
 
 def get_impedimentos_info() -> str:
@@ -5,6 +5,13 @@ Ley N° 32069 - Arts. 65-71 y Arts. 224-236 del Reglamento
 """
 from typing import Dict, List, Optional
 
+from engine.texto import patron_palabras
+
+_CLAVES_JPRD = patron_palabras(['jprd', 'junta de prevención', 'junta de prevencion', 'dispute board',
+                                'junta de disputas'])
+_CLAVES_ARBITRAJE = patron_palabras(['arbitraje', 'árbitro', 'arbitro', 'árbitros', 'arbitros', 'laudo',
+                                     'laudos', 'cláusula arbitral', 'clausula arbitral'])
+
 
 class JPRDArbitraje:
     """
@@ -209,14 +216,12 @@ derivadas del presente contrato.
     
     def detect_and_process(self, message: str) -> Optional[str]:
         """Detecta consultas sobre JPRD o arbitraje"""
-        message_lower = message.lower()
-        
         # Detectar JPRD
-        if any(kw in message_lower for kw in ['jprd', 'junta de prevención', 'dispute board', 'junta de disputas']):
+        if _CLAVES_JPRD.search(message):
             return get_jprd_info()
         
         # Detectar arbitraje
-        if any(kw in message_lower for kw in ['arbitraje', 'árbitro', 'arbitro', 'laudo', 'cláusula arbitral']):
+        if _CLAVES_ARBITRAJE.search(message):
             return get_arbitraje_info()
         
         return None
@@ -0,0 +1,134 @@
+"""
+Gestor Centralizado del Cliente Gemini
+Un solo punto de configuración y reutilización de modelos para todos los motores
+Agente de Contrataciones Públicas - Perú
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import Config
+from engine.circuit_breaker import CircuitBreaker
+
+
+logger = logging.getLogger(__name__)
+
+
+class LLMClientManager:
+    """
+    Gestor compartido de acceso a Gemini
+
+    - `genai.configure` se llama una sola vez por proceso. Cada llamada a
+      `configure` descarta los clientes cacheados por la librería, por lo que
+      reconfigurar por petición abría una conexión nueva cada vez.
+    - Todos los `GenerativeModel` comparten el cliente por defecto de la
+      librería: un canal gRPC (HTTP/2, persistente y multiplexado) o, con
+      transporte REST, una sesión HTTP con pool de conexiones keep-alive.
+    - Los modelos se cachean por (modelo, system_instruction) con un LRU
+      acotado, así una sesión nueva no construye un modelo nuevo.
+    - `generate` pasa por un circuit breaker compartido: con Gemini caído o
+      saturado las llamadas fallan al instante en vez de esperar el timeout.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, transport: Optional[str] = None, max_models: int = 16):
+        self.api_key = api_key or Config.GEMINI_API_KEY
+        self.transport = transport or Config.GEMINI_TRANSPORT
+        self.max_models = max_models
+        self._lock = threading.Lock()
+        self._genai = None
+        self._models: "OrderedDict[Tuple[str, Optional[str]], Any]" = OrderedDict()
+        self.breaker = CircuitBreaker(
+            "gemini",
+            failure_threshold=Config.GEMINI_FAILURE_THRESHOLD,
+            reset_timeout=Config.GEMINI_RESET_TIMEOUT,
+            call_timeout=Config.GEMINI_TIMEOUT
+        )
+        self.stats = {
+            "modelos_creados": 0,
+            "modelos_reutilizados": 0
+        }
+
+    def _ensure_configured(self):
+        """Importa y configura google.generativeai una única vez"""
+        if self._genai is not None:
+            return self._genai
+        with self._lock:
+            if self._genai is None:
+                import google.generativeai as genai
+                opciones = {"api_key": self.api_key}
+                if self.transport:
+                    opciones["transport"] = self.transport
+                genai.configure(**opciones)
+                self._genai = genai
+                logger.debug("🔌 Cliente Gemini configurado (transporte: %s)", self.transport or "por defecto")
+        return self._genai
+
+    def get_model(self, model_name: Optional[str] = None, system_instruction: Optional[str] = None):
+        """Obtiene un GenerativeModel reutilizable"""
+        genai = self._ensure_configured()
+        model_name = model_name or Config.GEMINI_MODEL
+        clave = (model_name, system_instruction)
+
+        with self._lock:
+            model = self._models.get(clave)
+            if model is not None:
+                self._models.move_to_end(clave)
+                self.stats["modelos_reutilizados"] += 1
+                return model
+
+            if system_instruction is None:
+                model = genai.GenerativeModel(model_name=model_name)
+            else:
+                model = genai.GenerativeModel(model_name=model_name, system_instruction=system_instruction)
+
+            self._models[clave] = model
+            self.stats["modelos_creados"] += 1
+            if len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+            return model
+
+    def generate(self, contents, model_name: Optional[str] = None, system_instruction: Optional[str] = None):
+        """
+        Generación con un modelo compartido
+
+        Args:
+            contents: Prompt (str) o lista de turnos {"role", "parts"} con historial
+
+        Raises:
+            CircuitOpenError: si el circuito de Gemini está abierto
+            CallTimeoutError: si Gemini no responde dentro de GEMINI_TIMEOUT
+        """
+        model = self.get_model(model_name, system_instruction)
+        return self.breaker.call(lambda: model.generate_content(contents))
+
+    def start_chat(self, model_name: Optional[str] = None, system_instruction: Optional[str] = None,
+                   history: Optional[List] = None):
+        """Inicia un chat sobre un modelo compartido"""
+        model = self.get_model(model_name, system_instruction)
+        return model.start_chat(history=history or [])
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats, modelos_en_cache=len(self._models))
+
+
+_manager: Optional[LLMClientManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClientManager:
+    """Gestor compartido por todos los motores del proceso"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = LLMClientManager()
+    return _manager
+
+
+def set_llm_client(manager: Optional[LLMClientManager]):
+    """Reemplaza el gestor compartido (pruebas de carga con un Gemini simulado)"""
+    global _manager
+    with _manager_lock:
+        _manager = manager
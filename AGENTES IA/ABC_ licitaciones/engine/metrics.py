@@ -0,0 +1,175 @@
+"""
+Métricas de Latencia por Capa
+Histogramas (p50/p95/p99) por endpoint y etapa, exportables en formato Prometheus
+Agente de Contrataciones Públicas - Perú
+"""
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+
+# Cuantiles reportados por cada histograma
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Endpoint usado fuera de una petición HTTP (scripts, tests)
+DEFAULT_ENDPOINT = "default"
+
+
+class LatencyHistogram:
+    """
+    Histograma de latencias con ventana deslizante
+
+    Guarda conteo y suma totales, y las últimas `max_samples` observaciones
+    para estimar cuantiles sin crecer indefinidamente en memoria.
+    """
+
+    def __init__(self, max_samples: int = 1024):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=max_samples)
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.samples.append(seconds)
+
+    def quantiles(self) -> Dict[float, float]:
+        """Cuantiles sobre la ventana actual (nearest-rank)"""
+        if not self.samples:
+            return {q: 0.0 for q in QUANTILES}
+        ordenadas = sorted(self.samples)
+        n = len(ordenadas)
+        return {q: ordenadas[max(0, math.ceil(q * n) - 1)] for q in QUANTILES}
+
+
+class MetricsRegistry:
+    """
+    Registro de latencias por (endpoint, etapa) y de contadores con labels
+
+    Etapas instrumentadas: routing, quick_answer, embedding, vector_search,
+    rerank, prompt_build, gemini y total (petición completa).
+    El endpoint actual se guarda por hilo para que las capas internas
+    (ConversationEngine, RagEngine) no necesiten recibirlo como parámetro.
+    """
+
+    def __init__(self, prefix: str = "inkabot", max_samples: int = 1024):
+        self.prefix = prefix
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+
+    # =========================================================================
+    # CONTEXTO DE ENDPOINT
+    # =========================================================================
+
+    def set_endpoint(self, endpoint: Optional[str]):
+        """Define el endpoint asociado al hilo actual"""
+        self._local.endpoint = endpoint or DEFAULT_ENDPOINT
+
+    def get_endpoint(self) -> str:
+        return getattr(self._local, "endpoint", DEFAULT_ENDPOINT)
+
+    # =========================================================================
+    # REGISTRO
+    # =========================================================================
+
+    def observe(self, stage: str, seconds: float, endpoint: Optional[str] = None):
+        """Registra una observación de latencia en segundos"""
+        clave = (endpoint or self.get_endpoint(), stage)
+        with self._lock:
+            histograma = self._histograms.get(clave)
+            if histograma is None:
+                histograma = LatencyHistogram(self.max_samples)
+                self._histograms[clave] = histograma
+            histograma.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str, endpoint: Optional[str] = None):
+        """Context manager que mide la duración de un bloque"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - inicio, endpoint)
+
+    def incr(self, name: str, value: float = 1, **labels: str):
+        """Incrementa un contador (exportado como <prefix>_<name>_total)"""
+        clave = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[clave] = self._counters.get(clave, 0) + value
+
+    def get_counter(self, name: str, **labels: str) -> float:
+        with self._lock:
+            return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    # =========================================================================
+    # EXPORTACIÓN
+    # =========================================================================
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict]]:
+        """Resumen en milisegundos agrupado por endpoint y etapa"""
+        resultado: Dict[str, Dict[str, Dict]] = {}
+        with self._lock:
+            for (endpoint, stage), histograma in sorted(self._histograms.items()):
+                cuantiles = histograma.quantiles()
+                resultado.setdefault(endpoint, {})[stage] = {
+                    "count": histograma.count,
+                    "sum_ms": round(histograma.total * 1000, 3),
+                    "p50_ms": round(cuantiles[0.5] * 1000, 3),
+                    "p95_ms": round(cuantiles[0.95] * 1000, 3),
+                    "p99_ms": round(cuantiles[0.99] * 1000, 3)
+                }
+        return resultado
+
+    def counters_snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Contadores agrupados por nombre; la clave interna son los labels"""
+        resultado: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            for (name, labels), valor in sorted(self._counters.items()):
+                etiqueta = ",".join(f"{k}={v}" for k, v in labels) or "total"
+                resultado.setdefault(name, {})[etiqueta] = valor
+        return resultado
+
+    def render_prometheus(self) -> str:
+        """Exporta histogramas (summary) y contadores en formato de texto Prometheus"""
+        nombre = f"{self.prefix}_stage_latency_seconds"
+        lineas = [
+            f"# HELP {nombre} Latencia por etapa y endpoint",
+            f"# TYPE {nombre} summary"
+        ]
+        with self._lock:
+            for (endpoint, stage), histograma in sorted(self._histograms.items()):
+                labels = f'endpoint="{_escape(endpoint)}",stage="{_escape(stage)}"'
+                for q, valor in histograma.quantiles().items():
+                    lineas.append(f'{nombre}{{{labels},quantile="{q}"}} {valor:.6f}')
+                lineas.append(f"{nombre}_sum{{{labels}}} {histograma.total:.6f}")
+                lineas.append(f"{nombre}_count{{{labels}}} {histograma.count}")
+
+            declarados = set()
+            for (name, labels), valor in sorted(self._counters.items()):
+                contador = f"{self.prefix}_{name}_total"
+                if contador not in declarados:
+                    lineas.append(f"# TYPE {contador} counter")
+                    declarados.add(contador)
+                texto_labels = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels)
+                lineas.append(f"{contador}{{{texto_labels}}} {valor:g}" if texto_labels else f"{contador} {valor:g}")
+        return "\n".join(lineas) + "\n"
+
+
+def _escape(valor: str) -> str:
+    """Escapa un valor de label según el formato de texto Prometheus"""
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Registro global compartido por la API y los motores
+metrics = MetricsRegistry()
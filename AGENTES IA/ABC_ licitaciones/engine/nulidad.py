@@ -5,6 +5,12 @@ Ley N° 32069 - Artículo 72
 from typing import Dict, List, Optional
 from datetime import datetime
 
+from engine.texto import patron_palabras
+
+_CLAVES_NULIDAD = patron_palabras([
+    'nulidad', 'nulo', 'nula', 'anular', 'invalidar', 'causal de nulidad',
+    'documento falso', 'documentos falsos', 'falsedad', 'impedido', 'prescripción', 'prescripcion'])
+
 
 class NulidadAnalyzer:
     """
@@ -234,12 +240,7 @@ class NulidadAnalyzer:
     
     def detect_and_analyze(self, message: str) -> Optional[str]:
         """Detecta si el mensaje es consulta de nulidad"""
-        message_lower = message.lower()
-        
-        keywords = ['nulidad', 'nulo', 'anular', 'invalidar', 'causal de nulidad',
-                    'documento falso', 'falsedad', 'impedido', 'prescripción']
-        
-        if not any(kw in message_lower for kw in keywords):
+        if not _CLAVES_NULIDAD.search(message):
             return None
         
         # Analizar el mensaje
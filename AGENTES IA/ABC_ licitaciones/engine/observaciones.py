@@ -9,7 +9,85 @@ Este módulo permite:
 """
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
-import re
+
+from engine.patrones import PATRONES
+from engine.reglas import MotorReglas, Regla
+from engine.texto import patron_palabras
+
+
+# =========================================================================
+# REGLAS DE DETECCIÓN SOBRE EL TEXTO DE LAS BASES
+# =========================================================================
+
+def _vicio_marca(match) -> Dict:
+    return {
+        "tipo": "marca_especifica",
+        "detalle": "Se menciona marca/modelo sin 'o equivalente'",
+        "severidad": "ALTA"
+    }
+
+
+def _vicio_experiencia(match) -> Optional[Dict]:
+    try:
+        monto = float(match.group(1).replace(',', ''))
+    except ValueError:
+        return None
+    return {
+        "tipo": "experiencia_posible_excesiva",
+        "detalle": f"Experiencia mínima: S/ {monto:,.2f} - Verificar proporcionalidad",
+        "monto": monto,
+        "severidad": "MEDIA"
+    }
+
+
+def _vicio_plazo(match) -> Optional[Dict]:
+    dias = int(match.group(1))
+    if dias >= 10:
+        return None
+    return {
+        "tipo": "plazo_muy_corto",
+        "detalle": f"Plazo de {dias} días puede ser irreal",
+        "dias": dias,
+        "severidad": "ALTA"
+    }
+
+
+def _vicio_penalidad(match) -> Optional[Dict]:
+    try:
+        pct = float(match.group(1))
+    except ValueError:
+        return None
+    if pct <= 0.1:  # hasta 0.10%
+        return None
+    return {
+        "tipo": "penalidad_alta",
+        "detalle": f"Penalidad del {pct}% puede exceder límite legal",
+        "porcentaje": pct,
+        "severidad": "MEDIA"
+    }
+
+
+# Una regla nueva es una fila más: no agrega recorridos del documento
+REGLAS_TEXTO_BASES = [
+    Regla("marca_especifica", r"(?:marca|modelo|tipo)\s*:", PATRONES["marca_modelo"], _vicio_marca,
+          unica=True, salvo="equivalente"),
+    Regla("experiencia_posible_excesiva", r"experiencia\s+m[íi]nima", PATRONES["experiencia_minima"],
+          _vicio_experiencia),
+    Regla("plazo_muy_corto", r"plazo", PATRONES["plazo_dias"], _vicio_plazo),
+    Regla("penalidad_alta", r"penalidad", PATRONES["penalidad_porcentaje"], _vicio_penalidad),
+]
+
+# Palabras cuya sola presencia en el documento anula una regla (Regla.salvo)
+BANDERAS_TEXTO_BASES = {"equivalente": r"equivalente"}
+
+_MOTOR_REGLAS = MotorReglas(REGLAS_TEXTO_BASES, BANDERAS_TEXTO_BASES)
+
+# detect_and_analyze: "bases" sola no basta (preguntas conceptuales sobre bases van al RAG)
+_CLAVES_OBSERVACIONES = patron_palabras([
+    'observación', 'observacion', 'observaciones', 'observar', 'observo', 'vicio', 'vicios',
+    'experiencia excesiva', 'requisito excesivo', 'requisitos excesivos', 'penalidad alta',
+    'plazo irreal', 'marca específica', 'marca especifica'])
+_PREGUNTA_GENERAL = patron_palabras(['cómo', 'como', 'qué', 'que', 'cuándo', 'cuando'])
 
 
 class ObservacionesGenerator:
@@ -555,85 +633,22 @@ _______________________________
     # DETECCIÓN AUTOMÁTICA DE VICIOS
     # =========================================================================
     
-    def analizar_texto_bases(self, texto_bases: str) -> List[Dict]:
+    def analizar_texto_bases(self, texto_bases: str, paginas: Optional[List[str]] = None) -> List[Dict]:
         """
         Analiza el texto de las bases para detectar posibles vicios
         
+        Las reglas (REGLAS_TEXTO_BASES) se evalúan en una sola pasada sobre
+        el texto; cada vicio indica en "ubicacion" la página, la línea y el
+        texto donde se encontró.
+        
         Args:
             texto_bases: Texto extraído de las bases
+            paginas: Texto de cada página (texto_por_pagina de la extracción)
             
         Returns:
             Lista de posibles vicios identificados
         """
-        vicios_detectados = []
-        texto_lower = texto_bases.lower()
-        
-        # Detectar marcas específicas
-        patrones_marca = [
-            r'marca\s*:\s*(\w+)',
-            r'modelo\s*:\s*(\w+)',
-            r'tipo\s*:\s*(\w+\s+\w+)'
-        ]
-        
-        for patron in patrones_marca:
-            matches = re.findall(patron, texto_lower)
-            if matches and 'equivalente' not in texto_lower:
-                vicios_detectados.append({
-                    "tipo": "marca_especifica",
-                    "detalle": f"Se menciona marca/modelo sin 'o equivalente'",
-                    "severidad": "ALTA"
-                })
-                break
-        
-        # Detectar experiencia potencialmente excesiva
-        patron_experiencia = r'experiencia\s+m[íi]nima.*?(\d+(?:,\d{3})*(?:\.\d{2})?)'
-        matches = re.findall(patron_experiencia, texto_lower)
-        if matches:
-            for monto_str in matches:
-                try:
-                    monto = float(monto_str.replace(',', ''))
-                    vicios_detectados.append({
-                        "tipo": "experiencia_posible_excesiva",
-                        "detalle": f"Experiencia mínima: S/ {monto:,.2f} - Verificar proporcionalidad",
-                        "monto": monto,
-                        "severidad": "MEDIA"
-                    })
-                except:
-                    pass
-        
-        # Detectar plazos muy cortos
-        patron_plazo = r'plazo.*?(\d+)\s*d[íi]as'
-        matches = re.findall(patron_plazo, texto_lower)
-        for plazo in matches:
-            try:
-                dias = int(plazo)
-                if dias < 10:
-                    vicios_detectados.append({
-                        "tipo": "plazo_muy_corto",
-                        "detalle": f"Plazo de {dias} días puede ser irreal",
-                        "dias": dias,
-                        "severidad": "ALTA"
-                    })
-            except:
-                pass
-        
-        # Detectar penalidades potencialmente excesivas
-        patron_penalidad = r'penalidad.*?(\d+(?:\.\d+)?)\s*%'
-        matches = re.findall(patron_penalidad, texto_lower)
-        for penalidad in matches:
-            try:
-                pct = float(penalidad)
-                if pct > 0.1:  # mayor a 0.10%
-                    vicios_detectados.append({
-                        "tipo": "penalidad_alta",
-                        "detalle": f"Penalidad del {pct}% puede exceder límite legal",
-                        "porcentaje": pct,
-                        "severidad": "MEDIA"
-                    })
-            except:
-                pass
-        
-        return vicios_detectados
+        return _MOTOR_REGLAS.evaluar(texto_bases, paginas)
     
     # =========================================================================
     # ANÁLISIS HÍBRIDO IA + REGLAS
@@ -643,7 +658,9 @@ _______________________________
         self, 
         texto_bases: str, 
         analisis_gemini: Dict,
-        valor_referencial: Optional[float] = None
+        valor_referencial: Optional[float] = None,
+        paginas: Optional[List[str]] = None,
+        vicios_reglas: Optional[List[Dict]] = None
     ) -> Dict:
         """
         Combina análisis IA con validación de reglas legales para máxima precisión
@@ -652,6 +669,8 @@ _______________________________
             texto_bases: Texto extraído del PDF de bases
             analisis_gemini: Resultado del análisis de Gemini
             valor_referencial: VR del proceso (para validaciones proporcionales)
+            paginas: Texto de cada página, para ubicar los vicios por página
+            vicios_reglas: Resultado de analizar_texto_bases si ya se calculó
             
         Returns:
             Dict con vicios validados, observaciones sugeridas y métricas
@@ -662,7 +681,8 @@ _______________________________
             vicios_ia = analisis_gemini.get("vicios", [])
         
         # 2. Obtener vicios detectados por reglas
-        vicios_reglas = self.analizar_texto_bases(texto_bases)
+        if vicios_reglas is None:
+            vicios_reglas = self.analizar_texto_bases(texto_bases, paginas)
         
         # 3. Fusionar y eliminar duplicados
         vicios_fusionados = self._fusionar_vicios(vicios_ia, vicios_reglas)
@@ -722,6 +742,7 @@ _______________________________
                     "descripcion": vicio.get("detalle", vicio.get("descripcion", "")),
                     "severidad": vicio.get("severidad", "MEDIA"),
                     "fuente": "REGLAS",
+                    "ubicacion": vicio.get("ubicacion"),
                     "datos_extra": vicio
                 })
         
@@ -873,7 +894,9 @@ _______________________________
             "probabilidad_acogimiento": vicio.get("probabilidad_acogimiento"),
             "validado": vicio.get("validado_por_reglas", False),
             "pedido_concreto": f"Se solicita modificar/eliminar el requisito observado por contravenir la Ley 32069",
-            "texto_actual": vicio.get("datos_extra", {}).get("texto_actual", "[Revisar bases]"),
+            "ubicacion": vicio.get("ubicacion"),
+            "texto_actual": vicio.get("datos_extra", {}).get(
+                "texto_actual", (vicio.get("ubicacion") or {}).get("texto", "[Revisar bases]")),
             "texto_propuesto": vicio.get("datos_extra", {}).get("texto_propuesto", "[Proponer modificación según Art. 51]")
         }
     
@@ -928,11 +951,15 @@ Las bases analizadas no presentan irregularidades significativas según:
             prob = vicio.get("probabilidad_acogimiento", 0)
             emoji = "🔴" if prob >= 0.7 else ("🟡" if prob >= 0.4 else "🟢")
             validado = "✓ Validado" if vicio.get("validado_por_reglas") else "⚡ Solo IA"
+            ubicacion = vicio.get("ubicacion") or {}
+            donde = ""
+            if ubicacion.get("pagina"):
+                donde = f"\n   • Ubicación: pág. {ubicacion['pagina']}, línea {ubicacion['linea']}"
             
             respuesta += f"""**{i}. {vicio.get('tipo', 'N/A').upper()}** {emoji}
    • Probabilidad: {prob*100:.0f}%
    • Severidad: {vicio.get('severidad', 'N/A')}
-   • Estado: {validado}
+   • Estado: {validado}{donde}
    • Base legal: {vicio.get('limite_legal', 'N/A')[:80]}...
 
 """
@@ -986,17 +1013,11 @@ FORMULAR OBSERVACIÓN dentro del plazo establecido en el calendario del proceso.
     
     def detect_and_analyze(self, message: str) -> Optional[str]:
         """Detecta si el mensaje es consulta sobre observaciones"""
-        message_lower = message.lower()
-        
-        keywords = ['observación', 'observacion', 'observar', 'bases', 'vicio', 
-                    'experiencia excesiva', 'requisito excesivo', 'penalidad alta',
-                    'plazo irreal', 'marca específica']
-        
-        if not any(kw in message_lower for kw in keywords):
+        if not _CLAVES_OBSERVACIONES.search(message):
             return None
         
         # Si es consulta general, dar información
-        if any(kw in message_lower for kw in ['cómo', 'como', 'qué', 'que', 'cuándo', 'cuando']):
+        if _PREGUNTA_GENERAL.search(message):
             return get_observaciones_info()
         
         return None
@@ -4,8 +4,13 @@ Gestión y consulta de opiniones de la Dirección Técnico Normativa
 """
 import os
 import json
+import threading
 from datetime import datetime
 
+from config import Config
+from engine.catalogo import OPINIONES, CatalogoStore, abrir_catalogo
+from engine.search_index import buscar_relevantes, paginar
+
 class OpinionesOECE:
     """
     Gestiona las opiniones emitidas por la Dirección Técnico Normativa (DTN) del OECE
@@ -97,9 +102,28 @@ class OpinionesOECE:
         }
     ]
     
-    def __init__(self):
-        """Inicializa el gestor de opiniones"""
+    # Nombran la colección, no el tema: no cuentan al buscar desde el chat
+    PALABRAS_COLECCION = ("opinión", "opiniones", "opina", "dtn", "oece")
+    
+    def __init__(self, catalogo_path: str = None):
+        """
+        Inicializa el gestor de opiniones
+        
+        El catálogo (en disco o en memoria) se abre en la primera consulta.
+        """
         self.todas_opiniones = self.OPINIONES_2026 + self.OPINIONES_2025
+        self.catalogo_path = catalogo_path or Config.CATALOGO_DB
+        self._indice = None
+        self._lock = threading.Lock()
+    
+    @property
+    def indice(self):
+        """Catálogo completo en disco o índice en memoria de las opiniones incorporadas"""
+        if self._indice is None:
+            with self._lock:
+                if self._indice is None:
+                    self._indice = abrir_catalogo(self.catalogo_path, OPINIONES, self.todas_opiniones)
+        return self._indice
     
     def buscar_opinion(self, consulta: str) -> list:
         """
@@ -109,31 +133,33 @@ class OpinionesOECE:
             consulta: Texto de búsqueda
             
         Returns:
-            Lista de opiniones relevantes
+            Opiniones con al menos el 60 % (COINCIDENCIA_CHAT) de las palabras
+            de la consulta, sin contar las que nombran la colección, de la más
+            a la menos relevante
         """
-        consulta_lower = consulta.lower()
-        resultados = []
-        
-        for opinion in self.todas_opiniones:
-            # Buscar en tema, resumen y palabras clave
-            if any(palabra.lower() in consulta_lower for palabra in opinion['palabras_clave']):
-                resultados.append(opinion)
-            elif consulta_lower in opinion['tema'].lower():
-                resultados.append(opinion)
-            elif consulta_lower in opinion['resumen'].lower():
-                resultados.append(opinion)
-        
-        return resultados[:5]  # Máximo 5 resultados
+        return buscar_relevantes(self.indice, consulta, self.PALABRAS_COLECCION)
+    
+    def buscar(self, consulta: str, pagina: int = 1, por_pagina: int = 5) -> dict:
+        """Búsqueda paginada con puntaje de relevancia"""
+        return paginar(self.indice, consulta, pagina, por_pagina)
     
     def obtener_opinion_por_numero(self, numero: str) -> dict:
-        """Obtiene una opinión específica por su número"""
-        for opinion in self.todas_opiniones:
-            if numero.upper() in opinion['numero'].upper():
-                return opinion
-        return None
+        """
+        Obtiene una opinión específica por su número
+        
+        Acepta variantes del mismo número: "D000008-2026-OECE-DTN", "D008-2026",
+        "008-2026-OECE-DTN" o solo el correlativo ("8", la más reciente).
+        """
+        return self.indice.obtener(numero)
+    
+    def autocompletar_numero(self, prefijo: str, limite: int = 10) -> list:
+        """Opiniones cuyo número empieza con el texto escrito hasta ahora"""
+        return self.indice.autocompletar(prefijo, limite)
     
     def listar_opiniones_recientes(self, cantidad: int = 5) -> list:
         """Lista las opiniones más recientes"""
+        if isinstance(self.indice, CatalogoStore):
+            return self.indice.recientes(cantidad)
         return self.OPINIONES_2026[:cantidad]
     
     def formatear_opinion(self, opinion: dict) -> str:
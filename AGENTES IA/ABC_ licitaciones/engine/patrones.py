@@ -0,0 +1,91 @@
+"""
+Banco de Expresiones Regulares para Bases y Cuadros de Evaluación
+Patrones compilados una sola vez, con ventanas acotadas entre una etiqueta y su valor
+Agente de Contrataciones Públicas - Perú
+
+Un `.*?` con re.DOTALL entre una etiqueta y su valor recorre el resto del
+documento por cada aparición de la etiqueta sin valor cercano (cuadrático en
+bases largas). Aquí el valor debe aparecer dentro de una ventana fija de
+caracteres y los nombres tienen longitud máxima.
+"""
+import re
+from typing import Dict, List, Optional, Pattern, Tuple
+
+# Caracteres entre una etiqueta y su valor
+VENTANA_VALOR = 300
+# Caracteres máximos de la sección de requisitos de calificación
+VENTANA_SECCION = 20000
+
+_I = re.IGNORECASE
+_ID = re.IGNORECASE | re.DOTALL
+
+PATRONES: Dict[str, Pattern] = {
+    # PDFProcessor.extraer_datos_bases
+    "numero_proceso": re.compile(r'(?:LP|PA|CD|AS|SIE)\s*N[°º]?\s*([\d\-]+\s*-\s*\d{4})', _I),
+    "numero_proceso_nombre": re.compile(
+        r'(?:LICITACI[ÓO]N|PROCEDIMIENTO)\s+(?:P[ÚU]BLICA|ABREVIADO)\s*N[°º]?\s*([\d\-]+)', _I),
+    "valor_referencial": re.compile(r'VALOR\s+REFERENCIAL[:\s]{1,10}S/?\.?\s*([\d,]+(?:\.\d{2})?)', _I),
+    "valor_soles": re.compile(r'S/?\.?\s*([\d,]+(?:\.\d{2})?)\s*(?:SOLES|NUEVOS SOLES)', _I),
+    "plazo_ejecucion": re.compile(r'PLAZO\s+(?:DE\s+)?EJECUCI[ÓO]N[:\s]{1,10}(\d+)\s*(?:D[ÍI]AS)', _I),
+
+    # PDFProcessor._extraer_requisitos: inicio y fin de la sección, y sus datos
+    "seccion_requisitos": re.compile(r'REQUISITOS\s+DE\s+CALIFICACI[ÓO]N', _I),
+    "fin_seccion_requisitos": re.compile(r'FACTORES|CAP[ÍI]TULO', _I),
+    "experiencia_postor": re.compile(
+        r'EXPERIENCIA\s+DEL\s+POSTOR.{0,%d}?(?:S/?\.?\s*([\d,]+)|(\d+)\s*(?:contratos|servicios))' % VENTANA_VALOR, _ID),
+    "experiencia_personal": re.compile(
+        r'PERSONAL\s+(?:CLAVE|T[ÉE]CNICO).{0,%d}?(\d+)\s*(?:a[ñn]os|meses)' % VENTANA_VALOR, _ID),
+
+    # PDFProcessor._extraer_factores
+    "factor_puntaje": re.compile(
+        r'(?:FACTOR|CRITERIO)\s+(?:DE\s+)?([A-Z][A-Z\s]{0,80}?)\s*:?\s*(?:HASTA\s+)?(\d+)\s*(?:PUNTOS|PTS)', _I),
+
+    # PDFProcessor.extraer_cuadro_evaluacion (ver postores_con_precio)
+    "postor": re.compile(r'(?:POSTOR|EMPRESA|CONSORCIO)[:\s]{1,10}([A-Z][A-Z\s.]{0,80})', _I),
+    "precio": re.compile(r'(?:PRECIO|MONTO)[:\s]{1,10}S/?\.?\s*([\d,]+(?:\.\d{2})?)', _I),
+    "ganador": re.compile(r'(?:BUENA\s+PRO|ADJUDICADO|GANADOR)[:\s]{1,10}([A-Z][A-Z\s.]{0,100})', _I),
+
+    # Respuestas de Gemini: del primer "{" al último "}"
+    "json_respuesta": re.compile(r'\{.*\}', re.DOTALL),
+
+    # Reglas de ObservacionesGenerator.analizar_texto_bases (se evalúan desde su disparador)
+    "marca_modelo": re.compile(r'marca\s*:\s*(\w+)|modelo\s*:\s*(\w+)|tipo\s*:\s*(\w+\s+\w+)', _I),
+    "experiencia_minima": re.compile(
+        r'experiencia\s+m[íi]nima.{0,%d}?(\d+(?:,\d{3})*(?:\.\d{2})?)' % VENTANA_VALOR, _I),
+    "plazo_dias": re.compile(r'plazo.{0,%d}?(\d+)\s*d[íi]as' % VENTANA_VALOR, _I),
+    "penalidad_porcentaje": re.compile(r'penalidad.{0,%d}?(\d+(?:\.\d+)?)\s*%%' % VENTANA_VALOR, _I),
+}
+
+
+def seccion_requisitos(texto: str) -> Optional[str]:
+    """Texto de REQUISITOS DE CALIFICACIÓN hasta FACTORES/CAPÍTULO (como máximo VENTANA_SECCION)"""
+    match = PATRONES["seccion_requisitos"].search(texto)
+    if not match:
+        return None
+    limite = min(len(texto), match.end() + VENTANA_SECCION)
+    fin = PATRONES["fin_seccion_requisitos"].search(texto, match.end(), limite)
+    return texto[match.end():fin.start() if fin else limite]
+
+
+def postores_con_precio(texto: str) -> List[Tuple[str, str]]:
+    """
+    Pares (postor, precio) de un cuadro comparativo
+
+    Equivale a buscar "POSTOR: nombre ... PRECIO: S/ monto" en una sola
+    expresión, pero en dos búsquedas lineales: el precio se busca en la
+    ventana que sigue al nombre, y el nombre se corta donde empieza el precio.
+    """
+    postor = PATRONES["postor"]
+    precio = PATRONES["precio"]
+    pares = []
+    posicion = 0
+    while True:
+        match = postor.search(texto, posicion)
+        if not match:
+            return pares
+        match_precio = precio.search(texto, match.start(1) + 1, min(len(texto), match.end(1) + VENTANA_VALOR))
+        if not match_precio:
+            posicion = match.start() + 1
+            continue
+        pares.append((texto[match.start(1):min(match.end(1), match_precio.start())], match_precio.group(1)))
+        posicion = match_precio.end()
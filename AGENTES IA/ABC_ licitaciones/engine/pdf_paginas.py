@@ -0,0 +1,163 @@
+"""
+Extracción de Páginas de PDFs (serial o en paralelo por rangos)
+Texto, bloques y tablas candidatas por página con PyMuPDF
+Agente de Contrataciones Públicas - Perú
+
+Este módulo solo depende de PyMuPDF: los procesos del pool lo importan al
+arrancar, sin cargar la configuración ni el cliente de Gemini.
+"""
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple, Union
+
+import fitz  # PyMuPDF
+
+
+logger = logging.getLogger(__name__)
+
+# Origen que se envía a un proceso: ruta del archivo o bytes del PDF
+Origen = Union[str, bytes]
+
+# Tiempo máximo de la extracción paralela: arranque de los procesos más un
+# margen por página; pasado ese tiempo se extrae en serie
+SEGUNDOS_BASE = 30.0
+SEGUNDOS_POR_PAGINA = 0.5
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def extraer_pagina(pagina, num_pagina: int) -> Dict:
+    """
+    Texto, bloques y tablas candidatas de una página a partir de un único TextPage
+
+    Un bloque con más de dos líneas se considera tabla candidata (múltiples
+    columnas alineadas); sus spans se unen con " | ".
+    """
+    # TEXTFLAGS_TEXT: mismas opciones que get_text("text") y, para "dict",
+    # sin decodificar las imágenes de la página
+    textpage = pagina.get_textpage(flags=fitz.TEXTFLAGS_TEXT)
+    texto = pagina.get_text("text", textpage=textpage)
+    bloques = []
+    tablas = []
+    for bloque in pagina.get_text("dict", textpage=textpage)["blocks"]:
+        if "lines" not in bloque:
+            continue
+        lineas = [" | ".join(span["text"] for span in linea.get("spans", [])) for linea in bloque["lines"]]
+        lineas = [linea for linea in lineas if linea.strip()]
+        if not lineas:
+            continue
+        bloques.append({"pagina": num_pagina, "bbox": list(bloque["bbox"]), "lineas": lineas})
+        if len(bloque["lines"]) > 2:
+            tablas.append({"pagina": num_pagina, "contenido": lineas})
+    return {"pagina": num_pagina, "texto": texto, "bloques": bloques, "tablas": tablas}
+
+
+def _abrir(origen: Origen):
+    if isinstance(origen, bytes):
+        return fitz.open(stream=origen, filetype="pdf")
+    return fitz.open(origen)
+
+
+def _extraer_rango(origen: Origen, inicio: int, fin: int) -> List[Dict]:
+    """Páginas [inicio, fin) (base 0); se ejecuta en un proceso del pool con su propio documento"""
+    with _abrir(origen) as doc:
+        return [extraer_pagina(doc[i], i + 1) for i in range(inicio, fin)]
+
+
+def _rangos(total: int, partes: int) -> List[Tuple[int, int]]:
+    """Divide [0, total) en `partes` rangos contiguos de tamaño similar"""
+    partes = max(1, min(partes, total))
+    base, resto = divmod(total, partes)
+    rangos = []
+    inicio = 0
+    for i in range(partes):
+        fin = inicio + base + (1 if i < resto else 0)
+        rangos.append((inicio, fin))
+        inicio = fin
+    return rangos
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # "spawn": el servidor tiene hilos y fork podría copiar locks tomados
+            _pool = ProcessPoolExecutor(max_workers=workers,
+                                        mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+def _descartar_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def cerrar_pool():
+    """Termina los procesos del pool (al apagar la app o en scripts)"""
+    _descartar_pool()
+
+
+def extraer_paginas(doc, origen: Optional[Origen], workers: int = 1,
+                    min_paginas: int = 0) -> Tuple[List[Dict], str]:
+    """
+    Extrae todas las páginas de un documento ya abierto
+
+    Con `workers` > 1, al menos `min_paginas` páginas y un `origen` que los
+    procesos puedan abrir, el rango de páginas se reparte entre procesos
+    (dos rangos por proceso para equilibrar la carga) y los resultados se
+    unen en orden. Un PDF en memoria se escribe una vez en un archivo
+    temporal: los procesos reciben la ruta y no una copia de los bytes por
+    rango. Los documentos pequeños, un fallo del pool o una extracción que
+    supera SEGUNDOS_BASE + SEGUNDOS_POR_PAGINA por página se procesan en
+    serie con `doc`.
+
+    Returns:
+        (páginas en orden, modo usado: "serial" o "paralelo")
+    """
+    total = doc.page_count
+    if workers > 1 and origen is not None and min_paginas and total >= min_paginas:
+        temporal = None
+        try:
+            if isinstance(origen, bytes):
+                descriptor, temporal = tempfile.mkstemp(suffix=".pdf")
+                with os.fdopen(descriptor, "wb") as f:
+                    f.write(origen)
+                origen = temporal
+            pool = _get_pool(workers)
+            futuros = [pool.submit(_extraer_rango, origen, inicio, fin)
+                       for inicio, fin in _rangos(total, workers * 2)]
+            limite = time.monotonic() + SEGUNDOS_BASE + SEGUNDOS_POR_PAGINA * total
+            paginas = []
+            for futuro in futuros:
+                paginas.extend(futuro.result(timeout=max(0.0, limite - time.monotonic())))
+            return paginas, "paralelo"
+        except FutureTimeoutError:
+            logger.warning("⚠️ La extracción paralela de %d páginas superó el tiempo límite, "
+                           "se continúa en serie", total)
+            _descartar_pool()
+        except (BrokenProcessPool, OSError, RuntimeError) as e:
+            logger.warning("⚠️ Extracción paralela no disponible, se continúa en serie: %s", e)
+            _descartar_pool()
+        finally:
+            if temporal is not None:
+                try:
+                    os.unlink(temporal)
+                except OSError:
+                    pass
+
+    return [extraer_pagina(pagina, num_pagina) for num_pagina, pagina in enumerate(doc, 1)], "serial"
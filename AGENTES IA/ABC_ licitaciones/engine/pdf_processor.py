@@ -4,15 +4,84 @@ Extrae texto estructurado de bases, actas y cuadros de evaluación
 
 Usa PyMuPDF (fitz) para extracción de texto y Gemini para análisis inteligente
 """
+import logging
 import os
-import re
 import fitz  # PyMuPDF
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple, Union
 from datetime import datetime
+import hashlib
 import json
+from concurrent.futures import ThreadPoolExecutor
 
-import google.generativeai as genai
 from config import Config
+from engine.analysis_cache import AnalysisCache
+from engine.circuit_breaker import CallTimeoutError, CircuitOpenError
+from engine.llm_client import get_llm_client
+from engine.metrics import metrics
+from engine.pdf_paginas import extraer_paginas
+from engine.patrones import PATRONES, postores_con_precio, seccion_requisitos
+from engine.secciones import dividir_en_bloques, extracto_para_prompt
+from engine.singleflight import SingleFlight
+from engine.uploads import FuentePDF
+
+
+logger = logging.getLogger(__name__)
+
+# Versiones de los resultados en caché: cambiar la extracción o un prompt
+# obliga a incrementar la versión correspondiente
+VERSION_EXTRACCION = 1
+VERSION_PROMPTS = 2
+
+
+# Campos de texto que se concatenan al combinar los análisis de varios bloques
+_CAMPOS_ACUMULABLES = ("resumen", "recomendacion")
+
+
+def _identidad(elemento) -> str:
+    """Clave para no repetir un elemento de lista al combinar bloques"""
+    if isinstance(elemento, dict):
+        if elemento.get("nombre"):
+            return " ".join(str(elemento["nombre"]).lower().split())
+        return json.dumps(elemento, sort_keys=True, ensure_ascii=False).lower()
+    return " ".join(str(elemento).lower().split())
+
+
+def combinar_analisis(parciales: List[Dict]) -> Dict:
+    """
+    Une los JSON de Gemini de varios bloques de un documento en el mismo esquema
+    
+    Listas (requisitos, factores, vicios): concatenadas sin repetidos.
+    resumen/recomendacion: concatenados. Booleanos: verdadero si alguno lo
+    es. Otros campos (numero_proceso, entidad, valor_referencial...): el
+    primer valor no vacío en el orden del documento. En "bloques" queda
+    cuántos se analizaron y cuántos fallaron.
+    """
+    validos = [p for p in parciales if "error" not in p and "respuesta_texto" not in p]
+    if not validos:
+        return parciales[0]
+    
+    combinado = {}
+    vistos = {}
+    for parcial in validos:
+        for clave, valor in parcial.items():
+            if isinstance(valor, list):
+                lista = combinado.setdefault(clave, [])
+                identidades = vistos.setdefault(clave, set())
+                for elemento in valor:
+                    identidad = _identidad(elemento)
+                    if identidad not in identidades:
+                        identidades.add(identidad)
+                        lista.append(elemento)
+            elif clave in _CAMPOS_ACUMULABLES and isinstance(valor, str):
+                if valor.strip() and valor not in combinado.get(clave, ""):
+                    combinado[clave] = f"{combinado[clave]} {valor}" if combinado.get(clave) else valor
+            elif isinstance(valor, bool):
+                combinado[clave] = combinado.get(clave, False) or valor
+            elif combinado.get(clave) in (None, "", 0):
+                combinado[clave] = valor
+    
+    combinado["bloques"] = {"total": len(parciales), "con_error": len(parciales) - len(validos)}
+    return combinado
 
 
 class PDFProcessor:
@@ -22,85 +91,69 @@ class PDFProcessor:
     """
     
     def __init__(self):
-        # Configurar Gemini para análisis
-        genai.configure(api_key=Config.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
+        # Gestor Gemini compartido: las llamadas pasan por su circuit breaker
+        self.llm = get_llm_client()
     
     # =========================================================================
     # EXTRACCIÓN DE TEXTO
     # =========================================================================
     
-    def extraer_texto_pdf(self, pdf_path: str) -> Dict:
+    def extraer_documento(self, pdf: Union[str, FuentePDF]) -> Dict:
         """
-        Extrae todo el texto de un PDF
+        Extrae en una sola pasada texto, bloques y tablas candidatas de un PDF
+        
+        El archivo se abre una vez y cada página se analiza una sola vez: el
+        texto plano y los bloques salen del mismo TextPage. Los analizadores
+        reciben este resultado en vez de volver a abrir el archivo. Desde
+        PDF_PARALELO_MIN_PAGINAS páginas se reparten entre PDF_WORKERS procesos.
         
         Args:
-            pdf_path: Ruta al archivo PDF
+            pdf: Ruta al archivo PDF o FuentePDF (subida en memoria o en disco)
             
         Returns:
-            Dict con texto por página y metadatos
+            Dict con texto completo y por página, bloques, tablas y metadatos
+            (o {"error": ...})
         """
+        fuente = FuentePDF.desde_ruta(pdf) if isinstance(pdf, str) else pdf
         try:
-            doc = fitz.open(pdf_path)
-            
-            resultado = {
-                "archivo": os.path.basename(pdf_path),
-                "paginas": doc.page_count,
-                "texto_completo": "",
-                "texto_por_pagina": [],
-                "metadata": doc.metadata
-            }
-            
-            for num_pagina, pagina in enumerate(doc, 1):
-                texto = pagina.get_text("text")
-                resultado["texto_por_pagina"].append({
-                    "pagina": num_pagina,
-                    "texto": texto
-                })
-                resultado["texto_completo"] += texto + "\n\n"
-            
-            doc.close()
-            return resultado
-            
+            with fuente.abrir() as doc:
+                paginas, modo = extraer_paginas(doc, fuente.origen, Config.PDF_WORKERS,
+                                                Config.PDF_PARALELO_MIN_PAGINAS)
+                metadata = doc.metadata
         except Exception as e:
             return {"error": str(e)}
+        metrics.incr("pdf_extraccion", modo=modo)
+        
+        return {
+            "archivo": fuente.nombre,
+            "paginas": len(paginas),
+            "texto_completo": "".join(p["texto"] + "\n\n" for p in paginas),
+            "texto_por_pagina": [{"pagina": p["pagina"], "texto": p["texto"]} for p in paginas],
+            "bloques": [b for p in paginas for b in p["bloques"]],
+            "tablas": [t for p in paginas for t in p["tablas"]],
+            "metadata": metadata
+        }
+    
+    def extraer_texto_pdf(self, pdf_path: str) -> Dict:
+        """
+        Extrae todo el texto de un PDF
+        
+        Args:
+            pdf_path: Ruta al archivo PDF
+            
+        Returns:
+            Dict con texto por página y metadatos (ver extraer_documento)
+        """
+        return self.extraer_documento(pdf_path)
     
     def extraer_tablas_pdf(self, pdf_path: str) -> List[Dict]:
         """
         Extrae tablas de un PDF (para cuadros comparativos)
         """
-        try:
-            doc = fitz.open(pdf_path)
-            tablas = []
-            
-            for num_pagina, pagina in enumerate(doc, 1):
-                # Buscar tablas usando análisis de bloques
-                bloques = pagina.get_text("dict")["blocks"]
-                
-                for bloque in bloques:
-                    if "lines" in bloque:
-                        # Detectar si parece tabla (múltiples columnas alineadas)
-                        lineas = bloque["lines"]
-                        if len(lineas) > 2:
-                            tabla_texto = []
-                            for linea in lineas:
-                                fila = " | ".join([
-                                    span["text"] for span in linea.get("spans", [])
-                                ])
-                                if fila.strip():
-                                    tabla_texto.append(fila)
-                            
-                            if tabla_texto:
-                                tablas.append({
-                                    "pagina": num_pagina,
-                                    "contenido": tabla_texto
-                                })
-            
-            doc.close()
-            return tablas
-            
-        except Exception as e:
-            return [{"error": str(e)}]
+        extraccion = self.extraer_documento(pdf_path)
+        if "error" in extraccion:
+            return [extraccion]
+        return extraccion["tablas"]
     
     # =========================================================================
     # IDENTIFICACIÓN DE TIPO DE DOCUMENTO
@@ -113,7 +166,7 @@ class PDFProcessor:
         Returns:
             Dict con tipo identificado y confianza
         """
-        texto_lower = texto.lower()[:5000]  # Primeras 5000 chars
+        texto_lower = texto[:5000].lower()  # Primeras 5000 chars
         
         indicadores = {
             "bases": [
@@ -182,24 +235,16 @@ class PDFProcessor:
             "penalidades": []
         }
         
-        # Patrones de extracción
+        # Patrones de extracción (banco compilado, en orden de preferencia)
         patrones = {
-            "numero_proceso": [
-                r'(?:LP|PA|CD|AS|SIE)\s*N[°º]?\s*([\d\-]+\s*-\s*\d{4})',
-                r'(?:LICITACI[ÓO]N|PROCEDIMIENTO)\s+(?:P[ÚU]BLICA|ABREVIADO)\s*N[°º]?\s*([\d\-]+)',
-            ],
-            "valor_referencial": [
-                r'VALOR\s+REFERENCIAL[:\s]+S/?\.?\s*([\d,]+(?:\.\d{2})?)',
-                r'S/?\.?\s*([\d,]+(?:\.\d{2})?)\s*(?:SOLES|NUEVOS SOLES)',
-            ],
-            "plazo_ejecucion": [
-                r'PLAZO\s+(?:DE\s+)?EJECUCI[ÓO]N[:\s]+(\d+)\s*(?:D[ÍI]AS)',
-            ]
+            "numero_proceso": ("numero_proceso", "numero_proceso_nombre"),
+            "valor_referencial": ("valor_referencial", "valor_soles"),
+            "plazo_ejecucion": ("plazo_ejecucion",)
         }
         
-        for campo, lista_patrones in patrones.items():
-            for patron in lista_patrones:
-                match = re.search(patron, texto, re.IGNORECASE)
+        for campo, nombres in patrones.items():
+            for nombre in nombres:
+                match = PATRONES[nombre].search(texto)
                 if match:
                     valor = match.group(1)
                     if campo == "valor_referencial":
@@ -220,15 +265,11 @@ class PDFProcessor:
         requisitos = []
         
         # Buscar sección de requisitos
-        patron_seccion = r'REQUISITOS\s+DE\s+CALIFICACI[ÓO]N(.*?)(?:FACTORES|CAP[ÍI]TULO|$)'
-        match = re.search(patron_seccion, texto, re.IGNORECASE | re.DOTALL)
+        seccion = seccion_requisitos(texto)
         
-        if match:
-            seccion = match.group(1)
-            
+        if seccion is not None:
             # Buscar experiencia del postor
-            patron_exp = r'EXPERIENCIA\s+DEL\s+POSTOR.*?(?:S/?\.?\s*([\d,]+)|(\d+)\s*(?:contratos|servicios))'
-            match_exp = re.search(patron_exp, seccion, re.IGNORECASE | re.DOTALL)
+            match_exp = PATRONES["experiencia_postor"].search(seccion)
             if match_exp:
                 requisitos.append({
                     "tipo": "experiencia_postor",
@@ -237,8 +278,7 @@ class PDFProcessor:
                 })
             
             # Buscar experiencia del personal
-            patron_pers = r'PERSONAL\s+(?:CLAVE|T[ÉE]CNICO).*?(\d+)\s*(?:a[ñn]os|meses)'
-            match_pers = re.search(patron_pers, seccion, re.IGNORECASE | re.DOTALL)
+            match_pers = PATRONES["experiencia_personal"].search(seccion)
             if match_pers:
                 requisitos.append({
                     "tipo": "experiencia_personal",
@@ -252,8 +292,7 @@ class PDFProcessor:
         factores = []
         
         # Buscar patrones de factores con puntaje
-        patron = r'(?:FACTOR|CRITERIO)\s+(?:DE\s+)?([A-Z\s]+)[:\s]+(?:HASTA\s+)?(\d+)\s*(?:PUNTOS|PTS)'
-        matches = re.findall(patron, texto, re.IGNORECASE)
+        matches = PATRONES["factor_puntaje"].findall(texto)
         
         for nombre, puntaje in matches:
             factores.append({
@@ -278,8 +317,7 @@ class PDFProcessor:
         }
         
         # Buscar patrones de postores con precios
-        patron_postor = r'(?:POSTOR|EMPRESA|CONSORCIO)[:\s]+([A-Z\s\.]+).*?(?:PRECIO|MONTO)[:\s]+S/?\.?\s*([\d,]+(?:\.\d{2})?)'
-        matches = re.findall(patron_postor, texto, re.IGNORECASE | re.DOTALL)
+        matches = postores_con_precio(texto)
         
         for nombre, precio in matches:
             resultado["propuestas"].append({
@@ -292,8 +330,7 @@ class PDFProcessor:
             resultado["precio_menor"] = min(precios)
         
         # Buscar ganador
-        patron_ganador = r'(?:BUENA\s+PRO|ADJUDICADO|GANADOR)[:\s]+([A-Z\s\.]+)'
-        match = re.search(patron_ganador, texto, re.IGNORECASE)
+        match = PATRONES["ganador"].search(texto)
         if match:
             resultado["ganador"] = match.group(1).strip()
         
@@ -372,21 +409,24 @@ TEXTO:
 """
         }
         
-        prompt = prompts.get(tipo_analisis, prompts["bases"]) + texto[:15000]
+        prompt = prompts.get(tipo_analisis, prompts["bases"]) + extracto_para_prompt(
+            texto, tipo_analisis, Config.PDF_PROMPT_MAX_TOKENS)
         
         try:
-            response = self.model.generate_content(prompt)
+            response = self.llm.generate(prompt, Config.GEMINI_PDF_MODEL)
             
             # Extraer JSON de la respuesta
             texto_respuesta = response.text
             
             # Buscar JSON en la respuesta
-            match = re.search(r'\{.*\}', texto_respuesta, re.DOTALL)
+            match = PATRONES["json_respuesta"].search(texto_respuesta)
             if match:
                 return json.loads(match.group())
             
             return {"respuesta_texto": texto_respuesta}
             
+        except (CircuitOpenError, CallTimeoutError) as e:
+            return self._analisis_degradado(e)
         except Exception as e:
             return {"error": str(e)}
     
@@ -437,15 +477,16 @@ TEXTO:
 """
         }
         
-        prompt = prompts.get(tipo_analisis, prompts["bases"]) + texto[:12000]
+        prompt = prompts.get(tipo_analisis, prompts["bases"]) + extracto_para_prompt(
+            texto, tipo_analisis, Config.PDF_PROMPT_MAX_TOKENS)
         
         try:
-            response = self.model.generate_content(prompt)
+            response = self.llm.generate(prompt, Config.GEMINI_PDF_MODEL)
             texto_respuesta = response.text
             
             # Limpiar y parsear JSON
             texto_limpio = texto_respuesta.replace("```json", "").replace("```", "").strip()
-            match = re.search(r'\{.*\}', texto_limpio, re.DOTALL)
+            match = PATRONES["json_respuesta"].search(texto_limpio)
             
             if match:
                 return json.loads(match.group())
@@ -454,8 +495,22 @@ TEXTO:
             
         except json.JSONDecodeError:
             return {"error": "No se pudo parsear JSON", "respuesta_texto": texto_respuesta}
+        except (CircuitOpenError, CallTimeoutError) as e:
+            return self._analisis_degradado(e)
         except Exception as e:
             return {"error": str(e)}
+    
+    @staticmethod
+    def _analisis_degradado(error: Exception) -> Dict:
+        """
+        Respaldo cuando Gemini no responde (circuito abierto o timeout): el
+        resultado queda marcado con error y no se guarda en caché; el análisis
+        de bases se arma con lo detectado por reglas
+        """
+        motivo = "circuito" if isinstance(error, CircuitOpenError) else "timeout"
+        logger.warning("⚠️ Gemini no disponible para el PDF (%s)", error)
+        metrics.incr("degraded_responses", motivo=motivo)
+        return {"error": str(error), "degradado": motivo}
 
 
 class DocumentAnalyzer:
@@ -463,41 +518,192 @@ class DocumentAnalyzer:
     Analizador de documentos que combina extracción y análisis inteligente
     """
     
-    def __init__(self):
+    def __init__(self, cache: Optional[AnalysisCache] = None):
         self.pdf_processor = PDFProcessor()
+        self.cache = cache or AnalysisCache(Config.PDF_CACHE_DIR, int(Config.PDF_CACHE_MAX_MB * 1024 * 1024))
+        # El mismo archivo subido varias veces a la vez espera un solo análisis
+        self._ia_flight = SingleFlight("pdf_analisis")
     
-    def analizar_bases_completo(self, pdf_path: str) -> Dict:
+    def extraer(self, documento: Union[str, FuentePDF, Dict]) -> Dict:
+        """
+        Extracción compartida por los análisis
+        
+        Args:
+            documento: Ruta al PDF, FuentePDF o resultado de
+                PDFProcessor.extraer_documento (se reutiliza sin volver a abrir el archivo)
+        
+        Returns:
+            Extracción con el SHA-256 del archivo y, en "cache", si vino de la caché
+        """
+        if isinstance(documento, dict):
+            return documento
+        
+        fuente = FuentePDF.desde_ruta(documento) if isinstance(documento, str) else documento
+        try:
+            sha256 = fuente.sha256()
+        except OSError as e:
+            return {"error": str(e)}
+        extraccion = self.cache.get(sha256, "extraccion", VERSION_EXTRACCION)
+        acierto = extraccion is not None
+        if not acierto:
+            extraccion = self.pdf_processor.extraer_documento(fuente)
+            if "error" in extraccion:
+                return extraccion
+            self.cache.set(sha256, "extraccion", extraccion, VERSION_EXTRACCION)
+        
+        extraccion["archivo"] = fuente.nombre
+        extraccion["sha256"] = sha256
+        extraccion["cache"] = {"extraccion": acierto}
+        return extraccion
+    
+    def analizar_ia(self, extraccion: Dict, tipo_analisis: str) -> Dict:
+        """
+        Análisis con Gemini de una extracción, reutilizando el de un archivo idéntico
+        
+        Solo se guardan en caché las respuestas que se pudieron interpretar como JSON.
+        """
+        sha256 = extraccion.get("sha256")
+        tipo = f"ia_{tipo_analisis}"
+        
+        def analizar():
+            resultado = self._analizar_por_bloques(extraccion["texto_completo"], tipo_analisis)
+            completo = not resultado.get("bloques", {}).get("con_error")
+            if sha256 and completo and "error" not in resultado and "respuesta_texto" not in resultado:
+                self.cache.set(sha256, tipo, resultado, VERSION_PROMPTS)
+            return resultado
+        
+        resultado = self.cache.get(sha256, tipo, VERSION_PROMPTS) if sha256 else None
+        acierto = resultado is not None
+        if not acierto:
+            resultado = self._ia_flight.do((sha256, tipo), analizar) if sha256 else analizar()
+        extraccion.setdefault("cache", {})[f"analisis_{tipo_analisis}"] = acierto
+        return resultado
+    
+    def _analizar_por_bloques(self, texto: str, tipo_analisis: str) -> Dict:
+        """
+        Un documento que no cabe en un prompt se analiza por bloques (map-reduce)
+        
+        Los bloques (secciones relevantes, ver dividir_en_bloques) se envían a
+        Gemini en paralelo, con PDF_MAP_WORKERS llamadas a la vez como máximo,
+        y sus JSON se combinan en el esquema del análisis: la latencia queda
+        cerca de la de una sola llamada.
+        """
+        bloques = dividir_en_bloques(texto, tipo_analisis, Config.PDF_PROMPT_MAX_TOKENS,
+                                     Config.PDF_MAP_MAX_BLOQUES)
+        if len(bloques) == 1:
+            return self.pdf_processor.analizar_documento_gemini_sync(bloques[0], tipo_analisis)
+        
+        metrics.incr("pdf_bloques_ia", len(bloques), tipo=tipo_analisis)
+        with ThreadPoolExecutor(max_workers=max(1, min(Config.PDF_MAP_WORKERS, len(bloques))),
+                                thread_name_prefix="pdf-bloques") as pool:
+            parciales = list(pool.map(
+                lambda bloque: self.pdf_processor.analizar_documento_gemini_sync(bloque, tipo_analisis), bloques))
+        return combinar_analisis(parciales)
+    
+    def responder_pregunta(self, documento: Union[str, FuentePDF, Dict], pregunta: str) -> Dict:
+        """
+        Responde una pregunta sobre el documento (la misma pregunta sobre el mismo archivo sale de la caché)
+        
+        Con Gemini no disponible (circuito abierto o timeout) retorna
+        {"error", "degradado"} sin guardar nada en caché.
+        """
+        extraccion = self.extraer(documento)
+        if "error" in extraccion:
+            return extraccion
+        
+        sha256 = extraccion.get("sha256")
+        tipo = "chat_" + hashlib.sha256(" ".join(pregunta.lower().split()).encode()).hexdigest()[:16]
+        guardada = self.cache.get(sha256, tipo, VERSION_PROMPTS) if sha256 else None
+        extraccion.setdefault("cache", {})["respuesta"] = guardada is not None
+        if guardada is None:
+            extracto = extracto_para_prompt(extraccion["texto_completo"], "chat",
+                                            Config.PDF_PROMPT_MAX_TOKENS, pregunta=pregunta)
+            prompt = f"""Eres INKABOT, experto en contrataciones públicas de Perú (Ley 32069).
+            
+El usuario ha subido un documento y pregunta: {pregunta}
+
+DOCUMENTO:
+{extracto}
+
+Responde de manera clara y profesional, citando los artículos relevantes de la Ley 32069 o su Reglamento."""
+            try:
+                response = get_llm_client().generate(prompt, Config.GEMINI_PDF_MODEL)
+            except (CircuitOpenError, CallTimeoutError) as e:
+                return self.pdf_processor._analisis_degradado(e)
+            guardada = {"respuesta": response.text}
+            if sha256:
+                self.cache.set(sha256, tipo, guardada, VERSION_PROMPTS)
+        
+        return {
+            "archivo": extraccion["archivo"],
+            "paginas": extraccion["paginas"],
+            "respuesta": guardada["respuesta"],
+            "cache": extraccion["cache"]
+        }
+    
+    def analizar_bases_completo(self, documento: Union[str, FuentePDF, Dict],
+                                progreso: Optional[Callable[[str, Dict], None]] = None) -> Dict:
         """
         Análisis completo de bases de un procedimiento
         Ahora incluye análisis híbrido automático para detectar vicios
+        (las bases largas se analizan con Gemini por bloques en paralelo)
+        
+        Gemini se consulta en otro hilo mientras corren las etapas locales
+        (tipo, datos y vicios por reglas); se espera su respuesta recién para
+        fusionar los vicios, así que la latencia es la mayor de ambas.
+        
+        Args:
+            documento: Ruta, PDF subido o extracción ya hecha
+            progreso: Recibe (etapa, resultados parciales) al terminar cada
+                etapa: "extraccion", "reglas" (datos y vicios por expresiones
+                regulares, antes de llamar a Gemini) e "ia"
         
         Returns:
             Dict con datos estructurados, vicios detectados, observaciones sugeridas
         """
+        publicar = progreso or (lambda etapa, parcial: None)
+        
         # Extraer texto
-        extraccion = self.pdf_processor.extraer_texto_pdf(pdf_path)
+        extraccion = self.extraer(documento)
         
         if "error" in extraccion:
             return extraccion
         
         texto = extraccion["texto_completo"]
+        paginas = [p["texto"] for p in extraccion["texto_por_pagina"]]
+        publicar("extraccion", {"archivo": extraccion["archivo"], "paginas": extraccion["paginas"]})
         
-        # Identificar tipo
-        tipo = self.pdf_processor.identificar_tipo_documento(texto)
+        # Análisis inteligente con Gemini, en paralelo con las etapas locales
+        endpoint = metrics.get_endpoint()
         
-        # Extracción estructurada básica
-        datos_basicos = self.pdf_processor.extraer_datos_bases(texto)
+        def _analizar_ia():
+            metrics.set_endpoint(endpoint)
+            return self.analizar_ia(extraccion, "bases")
         
-        # Análisis inteligente con Gemini
-        analisis_ia = self.pdf_processor.analizar_documento_gemini_sync(texto, "bases")
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-ia") as pool:
+            futuro_ia = pool.submit(_analizar_ia)
+            
+            # Identificar tipo
+            tipo = self.pdf_processor.identificar_tipo_documento(texto)
+            
+            # Extracción estructurada básica
+            datos_basicos = self.pdf_processor.extraer_datos_bases(texto)
+            
+            # Vicios por reglas (no dependen de Gemini)
+            from engine.observaciones import ObservacionesGenerator
+            obs_gen = ObservacionesGenerator()
+            vicios_reglas = obs_gen.analizar_texto_bases(texto, paginas)
+            publicar("reglas", {"tipo_documento": tipo, "datos_extraidos": datos_basicos,
+                                "vicios_reglas": vicios_reglas})
+            
+            analisis_ia = futuro_ia.result()
+        publicar("ia", {"analisis_ia": analisis_ia})
         
         # NUEVO: Análisis híbrido para detectar vicios
-        from engine.observaciones import ObservacionesGenerator
-        obs_gen = ObservacionesGenerator()
-        
         valor_referencial = datos_basicos.get("valor_referencial")
         analisis_hibrido = obs_gen.analizar_vicios_hibrido(
-            texto, analisis_ia, valor_referencial
+            texto, analisis_ia, valor_referencial,
+            paginas=paginas, vicios_reglas=vicios_reglas
         )
         
         return {
@@ -509,35 +715,35 @@ class DocumentAnalyzer:
             "analisis_hibrido": analisis_hibrido,  # Nuevo campo
             "observaciones_sugeridas": analisis_hibrido.get("observaciones_sugeridas", []),
             "procede_observar": analisis_hibrido.get("procede_formular_observaciones", False),
-            "texto_muestra": texto[:2000]  # Primeros 2000 chars para referencia
+            "texto_muestra": texto[:2000],  # Primeros 2000 chars para referencia
+            "cache": extraccion.get("cache", {})
         }
     
-    def detectar_vicios_bases(self, pdf_path: str) -> Dict:
+    def detectar_vicios_bases(self, documento: Union[str, FuentePDF, Dict]) -> Dict:
         """
         Detecta vicios observables en las bases
         """
-        extraccion = self.pdf_processor.extraer_texto_pdf(pdf_path)
+        extraccion = self.extraer(documento)
         
         if "error" in extraccion:
             return extraccion
         
-        texto = extraccion["texto_completo"]
-        
         # Análisis de vicios con Gemini
-        vicios = self.pdf_processor.analizar_documento_gemini_sync(texto, "vicios")
+        vicios = self.analizar_ia(extraccion, "vicios")
         
         return {
             "archivo": extraccion["archivo"],
             "vicios_detectados": vicios.get("vicios", []),
             "resumen": vicios.get("resumen", ""),
-            "recomendacion": vicios.get("recomendacion", "")
+            "recomendacion": vicios.get("recomendacion", ""),
+            "cache": extraccion.get("cache", {})
         }
     
-    def analizar_evaluacion(self, pdf_path: str) -> Dict:
+    def analizar_evaluacion(self, documento: Union[str, FuentePDF, Dict]) -> Dict:
         """
         Analiza un cuadro de evaluación para verificar cálculos
         """
-        extraccion = self.pdf_processor.extraer_texto_pdf(pdf_path)
+        extraccion = self.extraer(documento)
         
         if "error" in extraccion:
             return extraccion
@@ -572,9 +778,10 @@ class DocumentAnalyzer:
         # Agregar datos extraídos
         datos = resultado.get('datos_extraidos', {})
         if datos:
+            valor = datos.get('valor_referencial')
             respuesta += f"""📋 **DATOS EXTRAÍDOS:**
-• Proceso: {datos.get('numero_proceso', 'No identificado')}
-• Valor Referencial: S/ {datos.get('valor_referencial', 'N/A'):,.2f}
+• Proceso: {datos.get('numero_proceso') or 'No identificado'}
+• Valor Referencial: {f'S/ {valor:,.2f}' if valor else 'No identificado'}
 
 """
         
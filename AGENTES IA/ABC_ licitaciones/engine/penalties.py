@@ -6,6 +6,11 @@ import re
 from typing import Dict, Optional
 from datetime import datetime
 
+from engine.texto import patron_palabras
+
+_CLAVES_PENALIDADES = patron_palabras(['penalidad', 'penalidades', 'mora', 'atraso', 'retraso',
+                                       'días de atraso', 'dias de atraso', 'demora'])
+
 
 class PenaltiesCalculator:
     """
@@ -171,18 +176,21 @@ Según el Art. 164 del Reglamento, la Entidad puede **resolver el contrato** por
         
         return respuesta
     
-    def detect_and_calculate(self, message: str) -> Optional[str]:
+    def detect_and_calculate(self, message: str, solo_calculo: bool = False) -> Optional[str]:
         """
         Detecta si el mensaje es una consulta de penalidades y la procesa
         
+        Args:
+            solo_calculo: Retornar None en lugar de la ficha informativa cuando
+                no hay datos para calcular (así la consulta pasa al RAG/Gemini)
+        
         Returns:
             Respuesta formateada o None si no es consulta de penalidades
         """
         message_lower = message.lower()
         
         # Detectar si es consulta de penalidades
-        keywords = ['penalidad', 'mora', 'atraso', 'retraso', 'días de atraso', 'demora']
-        if not any(kw in message_lower for kw in keywords):
+        if not _CLAVES_PENALIDADES.search(message):
             return None
         
         # Buscar monto
@@ -219,6 +227,8 @@ Según el Art. 164 del Reglamento, la Entidad puede **resolver el contrato** por
             return self.formatear_resultado(resultado)
         
         # Si falta información, dar guía
+        if solo_calculo:
+            return None
         return """⚖️ **CALCULADORA DE PENALIDADES**
 
 Para calcular la penalidad necesito los siguientes datos:
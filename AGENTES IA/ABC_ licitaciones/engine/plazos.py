@@ -7,6 +7,11 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import re
 
+from engine.texto import patron_palabras
+
+_CLAVES_PLAZOS = patron_palabras(['plazo', 'plazos', 'días hábiles', 'dias habiles', 'fecha límite',
+                                  'fecha limite', 'cuándo vence', 'cuando vence'])
+
 
 class PlazosCalculator:
     """
@@ -298,15 +303,18 @@ class PlazosCalculator:
 
 📚 *Base legal: {resultado.get('base_legal', 'D.S. N° 009-2025-EF')}*"""
     
-    def detect_and_calculate(self, message: str) -> Optional[str]:
+    def detect_and_calculate(self, message: str, solo_calculo: bool = False) -> Optional[str]:
         """
         Detecta si el mensaje es consulta de plazos y la procesa
+        
+        Args:
+            solo_calculo: Retornar None en lugar de la ficha informativa cuando
+                no hay datos para calcular (así la consulta pasa al RAG/Gemini)
         """
         message_lower = message.lower()
         
         # Detectar si es consulta de plazos
-        keywords = ['plazo', 'días hábiles', 'dias habiles', 'fecha límite', 'fecha limite', 'cuándo vence', 'cuando vence']
-        if not any(kw in message_lower for kw in keywords):
+        if not _CLAVES_PLAZOS.search(message):
             return None
         
         # Buscar fecha en el mensaje
@@ -342,7 +350,7 @@ class PlazosCalculator:
             return self.formatear_resultado(resultado)
         
         # Información general
-        return get_plazos_info()
+        return None if solo_calculo else get_plazos_info()
 
 
 def get_plazos_info() -> str:
@@ -1,3 +1,4 @@
+import logging
 import os
 import re
 from typing import List
@@ -9,6 +10,10 @@ except ImportError:
 from langchain_community.vectorstores import Chroma
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from config import Config
+from engine.metrics import metrics
+from engine.singleflight import SingleFlight, normalizar_prompt
+
+logger = logging.getLogger(__name__)
 
 class RagEngine:
     """Motor RAG para búsqueda semántica en documentos"""
@@ -30,14 +35,23 @@ class RagEngine:
             collection_name="contrataciones_publicas"
         )
         
+        # Versión del contexto indexado: cambia con cada ingestión
+        self.context_version = 0
+        
+        # Búsquedas idénticas concurrentes comparten un solo embedding + búsqueda
+        self._search_flight = SingleFlight("rag_search")
+        
+        # Embeddings de consulta por lote (se crean en el primer search_many)
+        self._query_embeddings = None
+        
     def ingest_documents(self):
         """Carga, procesa e indexa documentos desde el directorio knowledge"""
         if not os.path.exists(Config.KNOWLEDGE_DIR):
             os.makedirs(Config.KNOWLEDGE_DIR)
-            print(f"📁 Directorio creado: {Config.KNOWLEDGE_DIR}")
+            logger.info("📁 Directorio creado: %s", Config.KNOWLEDGE_DIR)
             return "Directorio de conocimiento estaba vacío"
 
-        print(f"📥 Cargando documentos desde {Config.KNOWLEDGE_DIR}...")
+        logger.info("📥 Cargando documentos desde %s...", Config.KNOWLEDGE_DIR)
         
         # Cargar PDFs
         loader = DirectoryLoader(
@@ -48,10 +62,10 @@ class RagEngine:
         documents = loader.load()
         
         if not documents:
-            print("⚠️ No se encontraron documentos PDF")
+            logger.warning("⚠️ No se encontraron documentos PDF")
             return "No se encontraron documentos"
             
-        print(f"📄 Se cargaron {len(documents)} páginas")
+        logger.info("📄 Se cargaron %d páginas", len(documents))
         
         # Dividir en chunks
         text_splitter = RecursiveCharacterTextSplitter(
@@ -60,17 +74,60 @@ class RagEngine:
             separators=["\n\n", "\n", " ", ""]
         )
         chunks = text_splitter.split_documents(documents)
-        print(f"🧩 Documentos divididos en {len(chunks)} fragmentos")
+        logger.info("🧩 Documentos divididos en %d fragmentos", len(chunks))
         
         # Guardar en ChromaDB
         self.vector_store.add_documents(chunks)
         self.vector_store.persist()
-        print("💾 Base de datos vectorial actualizada y guardada")
+        self.context_version += 1
+        logger.info("💾 Base de datos vectorial actualizada y guardada")
         
         return f"Ingestión completada: {len(chunks)} fragmentos indexados"
 
     def search(self, query: str, k: int = 3) -> List[str]:
         """Busca fragmentos relevantes para la consulta"""
+        clave = (normalizar_prompt(query), k, self.context_version)
+        return self._search_flight.do(clave, lambda: self._search(query, k))
+
+    def search_many(self, queries: List[str], k: int = 3) -> List[List[str]]:
+        """
+        Busca fragmentos para varias consultas con un solo lote de embeddings
+        
+        Returns:
+            Lista de resultados en el mismo orden que `queries`
+        """
+        if not queries:
+            return []
+        try:
+            with metrics.timer("embedding"):
+                vectores = self._get_query_embeddings().embed_documents(queries)
+        except Exception as e:
+            logger.error("❌ Error en embeddings por lote: %s", e)
+            return [self.search(query, k) for query in queries]
+        return [self._buscar_por_vector(query, vector, k) for query, vector in zip(queries, vectores)]
+    
+    def _get_query_embeddings(self):
+        """Embeddings de consulta para lotes (embed_documents con task_type de consulta)"""
+        if self._query_embeddings is None:
+            self._query_embeddings = GoogleGenerativeAIEmbeddings(
+                model="models/embedding-001",
+                google_api_key=Config.GEMINI_API_KEY,
+                task_type="retrieval_query"
+            )
+        return self._query_embeddings
+
+    def _search(self, query: str, k: int) -> List[str]:
+        """Embedding + búsqueda vectorial + re-ranking (sin coalescencia)"""
+        try:
+            with metrics.timer("embedding"):
+                query_vector = self.embeddings.embed_query(query)
+        except Exception as e:
+            logger.error("❌ Error en búsqueda RAG: %s", e)
+            return []
+        return self._buscar_por_vector(query, query_vector, k)
+
+    def _buscar_por_vector(self, query: str, query_vector: List[float], k: int) -> List[str]:
+        """Búsqueda vectorial + re-ranking a partir del embedding ya calculado"""
         try:
             # 🚀 STRATEGY: ARTIFICIAL BOOSTING FOR SPECIFIC ARTICLES
             # Detected intent: "Artículo X" -> Boost search to find header
@@ -83,10 +140,10 @@ class RagEngine:
             if article_match:
                 target_article = article_match.group(1)
                 search_k = 500  # Massive retrieval to guarantee finding the specific article chunk
-                print(f"🚀 Detected search for Article {target_article}. Boosting candidates to {search_k}...")
+                logger.debug("🚀 Detected search for Article %s. Boosting candidates to %d...", target_article, search_k)
             
-            # Perform raw vector search
-            results = self.vector_store.similarity_search(query, k=search_k)
+            with metrics.timer("vector_search"):
+                results = self.vector_store.similarity_search_by_vector(query_vector, k=search_k)
             
             if not target_article:
                 # Normal behavior
@@ -94,31 +151,31 @@ class RagEngine:
             
             # 🔍 RE-RANKING LOGIC
             # Prioritize chunks that act as the HEADER of the article (e.g., "Artículo 100")
-            
-            priority_chunks = []
-            secondary_chunks = []
-            other_chunks = []
-            
-            for doc in results:
-                content = doc.page_content
-                # Check for "Artículo 100." or "Art. 100" appearing as a header pattern
-                # We look for the number followed by dot or space, to avoid "100" matching "1000"
-                if re.search(rf'(?:art\.?|art[ií]culo)\s*{target_article}(?:[\.\s]|$)', content.lower()):
-                    priority_chunks.append(content)
-                elif target_article in content:
-                    secondary_chunks.append(content)
-                else:
-                    other_chunks.append(content)
-            
-            # Reassemble prioritized list
-            final_results = priority_chunks + secondary_chunks + other_chunks
+            with metrics.timer("rerank"):
+                priority_chunks = []
+                secondary_chunks = []
+                other_chunks = []
+                
+                for doc in results:
+                    content = doc.page_content
+                    # Check for "Artículo 100." or "Art. 100" appearing as a header pattern
+                    # We look for the number followed by dot or space, to avoid "100" matching "1000"
+                    if re.search(rf'(?:art\.?|art[ií]culo)\s*{target_article}(?:[\.\s]|$)', content.lower()):
+                        priority_chunks.append(content)
+                    elif target_article in content:
+                        secondary_chunks.append(content)
+                    else:
+                        other_chunks.append(content)
+                
+                # Reassemble prioritized list
+                final_results = priority_chunks + secondary_chunks + other_chunks
             
             # Limit back to original K (or slightly more to ensure context)
             final_k = max(k, 5) 
-            print(f"✅ Re-ranked: {len(priority_chunks)} priority matches found.")
+            logger.debug("✅ Re-ranked: %d priority matches found.", len(priority_chunks))
             
             return final_results[:final_k]
             
         except Exception as e:
-            print(f"❌ Error en búsqueda RAG: {e}")
+            logger.error("❌ Error en búsqueda RAG: %s", e)
             return []
@@ -0,0 +1,125 @@
+"""
+Registro de Motores con Carga Perezosa
+Construye cada motor en su primer uso y permite pre-calentarlos en segundo plano
+Agente de Contrataciones Públicas - Perú
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class EngineRegistry:
+    """
+    Registro de fábricas de motores
+
+    Ningún motor se construye al importar la aplicación: `get` llama a la
+    fábrica la primera vez (una sola vez aunque lleguen peticiones
+    concurrentes) y guarda la instancia. Si la fábrica falla, el error se
+    conserva y se vuelve a lanzar sin reintentar la construcción.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._errors: Dict[str, Exception] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._load_times_ms: Dict[str, float] = {}
+        self._prewarm_thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        """Registra la fábrica de un motor"""
+        self._factories[name] = factory
+        self._locks[name] = threading.Lock()
+
+    def get(self, name: str) -> Any:
+        """Obtiene el motor, construyéndolo en su primer uso"""
+        if name in self._instances:
+            return self._instances[name]
+
+        with self._locks[name]:
+            if name in self._instances:
+                return self._instances[name]
+            if name in self._errors:
+                raise self._errors[name]
+
+            inicio = time.perf_counter()
+            try:
+                instancia = self._factories[name]()
+            except Exception as e:
+                self._errors[name] = e
+                logger.warning("⚠️ Error inicializando motor %s: %s", name, e)
+                raise
+
+            self._load_times_ms[name] = (time.perf_counter() - inicio) * 1000
+            self._instances[name] = instancia
+            logger.debug("✅ Motor %s inicializado en %.0fms", name, self._load_times_ms[name])
+            return instancia
+
+    def get_or_none(self, name: str) -> Optional[Any]:
+        """Como `get`, pero retorna None si el motor no pudo construirse"""
+        try:
+            return self.get(name)
+        except Exception:
+            return None
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def lazy(self, name: str) -> "LazyEngine":
+        """Proxy que resuelve el motor al acceder al primer atributo"""
+        return LazyEngine(self, name)
+
+    def prewarm(self, names: Optional[Iterable[str]] = None, background: bool = True) -> Optional[threading.Thread]:
+        """
+        Construye los motores por adelantado
+
+        Args:
+            names: Motores a construir (por defecto, todos los registrados)
+            background: Si es True, se construyen en un hilo daemon
+        """
+        nombres = list(names) if names is not None else list(self._factories)
+
+        def _run():
+            for nombre in nombres:
+                self.get_or_none(nombre)
+
+        if not background:
+            _run()
+            return None
+
+        if self._prewarm_thread and self._prewarm_thread.is_alive():
+            return self._prewarm_thread
+
+        self._prewarm_thread = threading.Thread(target=_run, name="engine-prewarm", daemon=True)
+        self._prewarm_thread.start()
+        return self._prewarm_thread
+
+    def status(self) -> Dict[str, Dict]:
+        """Estado de cada motor: pendiente, cargado o error"""
+        estado = {}
+        for nombre in self._factories:
+            if nombre in self._instances:
+                estado[nombre] = {"estado": "cargado", "tiempo_carga_ms": round(self._load_times_ms[nombre], 1)}
+            elif nombre in self._errors:
+                estado[nombre] = {"estado": "error", "error": str(self._errors[nombre])}
+            else:
+                estado[nombre] = {"estado": "pendiente"}
+        return estado
+
+
+class LazyEngine:
+    """Proxy de un motor registrado; lo construye al primer acceso"""
+
+    def __init__(self, registry: EngineRegistry, name: str):
+        self._registry = registry
+        self._name = name
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._registry.get(self._name), attr)
+
+    def __repr__(self) -> str:
+        return f"<LazyEngine {self._name}>"
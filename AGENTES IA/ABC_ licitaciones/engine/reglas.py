@@ -0,0 +1,102 @@
+"""
+Motor de Reglas sobre el Texto de las Bases
+Todas las reglas se evalúan en una sola pasada, con la página y la línea de cada hallazgo
+Agente de Contrataciones Públicas - Perú
+"""
+import re
+from bisect import bisect_right
+from typing import Callable, Dict, List, Match, NamedTuple, Optional, Pattern, Sequence
+
+# Caracteres del texto citado en la ubicación de un hallazgo
+LARGO_CITA = 160
+
+
+class Regla(NamedTuple):
+    """
+    Regla declarada como datos
+
+    `disparador` es una expresión corta (sin grupos) que marca dónde puede
+    haber un hallazgo; `patron` se evalúa desde ese punto (con `match`, así
+    que nunca recorre el documento) y `evaluar` convierte su coincidencia en
+    un vicio o None. Con `unica` se reporta solo el primer hallazgo; con
+    `salvo`, la regla no reporta nada si esa bandera aparece en el documento.
+    """
+    tipo: str
+    disparador: str
+    patron: Pattern
+    evaluar: Callable[[Match], Optional[Dict]]
+    unica: bool = False
+    salvo: Optional[str] = None
+
+
+class MotorReglas:
+    """
+    Evalúa un conjunto de reglas con un único recorrido del texto
+
+    Los disparadores de todas las reglas (y las banderas: palabras cuya sola
+    presencia cambia el resultado, como "equivalente") se unen en una
+    expresión con un grupo por regla. Agregar una regla agrega una
+    alternativa, no un recorrido más.
+    """
+
+    def __init__(self, reglas: Sequence[Regla], banderas: Optional[Dict[str, str]] = None):
+        self.reglas = list(reglas)
+        self.banderas = dict(banderas or {})
+        alternativas = [f"(?P<r{i}>{regla.disparador})" for i, regla in enumerate(self.reglas)]
+        alternativas += [f"(?P<b{i}>{disparador})" for i, disparador in enumerate(self.banderas.values())]
+        self._disparadores = re.compile("|".join(alternativas), re.IGNORECASE)
+        self._nombres_banderas = list(self.banderas)
+
+    def evaluar(self, texto: str, paginas: Optional[Sequence[str]] = None) -> List[Dict]:
+        """
+        Vicios encontrados, en el orden de las reglas y luego del documento
+
+        Args:
+            texto: Texto completo (si viene de PDFProcessor, las páginas unidas con "\\n\\n")
+            paginas: Texto de cada página, para ubicar los hallazgos por página
+        """
+        inicios_pagina = []
+        if paginas:
+            posicion = 0
+            for pagina in paginas:
+                inicios_pagina.append(posicion)
+                posicion += len(pagina) + 2
+
+        hallazgos = [[] for _ in self.reglas]
+        fin_anterior = [-1] * len(self.reglas)
+        presentes = set()
+        for disparo in self._disparadores.finditer(texto):
+            grupo = disparo.lastgroup
+            indice = int(grupo[1:])
+            if grupo[0] == "b":
+                presentes.add(self._nombres_banderas[indice])
+                continue
+            regla = self.reglas[indice]
+            # Como findall: un disparador dentro del hallazgo anterior no cuenta de nuevo
+            if disparo.start() < fin_anterior[indice] or (regla.unica and hallazgos[indice]):
+                continue
+            match = regla.patron.match(texto, disparo.start())
+            if not match:
+                continue
+            fin_anterior[indice] = match.end()
+            vicio = regla.evaluar(match)
+            if vicio is not None:
+                vicio["ubicacion"] = self._ubicar(texto, match, inicios_pagina)
+                hallazgos[indice].append(vicio)
+
+        return [vicio for regla, encontrados in zip(self.reglas, hallazgos)
+                if not (regla.salvo and regla.salvo in presentes) for vicio in encontrados]
+
+    @staticmethod
+    def _ubicar(texto: str, match: Match, inicios_pagina: List[int]) -> Dict:
+        posicion = match.start()
+        if inicios_pagina:
+            numero = bisect_right(inicios_pagina, posicion)
+            inicio = inicios_pagina[numero - 1]
+        else:
+            numero, inicio = None, 0
+        return {
+            "pagina": numero,
+            "linea": texto.count("\n", inicio, posicion) + 1,
+            "texto": " ".join(texto[posicion:min(match.end(), posicion + LARGO_CITA)].split())
+        }
@@ -0,0 +1,284 @@
+"""
+Índice de Búsqueda para Opiniones y Resoluciones
+Índice invertido con puntaje BM25 por campos, compartido por OpinionesOECE y TribunalContrataciones
+Agente de Contrataciones Públicas - Perú
+"""
+import bisect
+import heapq
+import math
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from engine.texto import palabras
+
+
+# Peso de cada campo: una palabra en el número o el tema pesa más que en el resumen
+PESOS_CAMPOS = {
+    "numero": 3.0,
+    "tema": 2.0,
+    "materia": 2.0,
+    "palabras_clave": 2.0,
+    "tipo": 1.0,
+    "resumen": 1.0,
+}
+
+
+def raiz(palabra: str) -> str:
+    """
+    Reducción ligera de plurales y género ("falsos", "falsa" → "fals";
+    "sanciones" → "sancion") para que la consulta no tenga que repetir la
+    forma exacta del documento. Números y palabras cortas quedan intactos.
+    """
+    if len(palabra) <= 4 or palabra[-1].isdigit():
+        return palabra
+    if palabra.endswith("es") and palabra[-3] not in "aeiou":
+        palabra = palabra[:-2]
+    elif palabra.endswith("s"):
+        palabra = palabra[:-1]
+    if palabra[-1] in "aeo" and len(palabra) > 4:
+        palabra = palabra[:-1]
+    return palabra
+
+
+def terminos(texto: str) -> List[str]:
+    """Palabras significativas de un texto, reducidas a su raíz"""
+    return [raiz(p) for p in palabras(texto)]
+
+
+_NUMERO = re.compile(r"D?0*(\d{1,6})\s*-\s*(\d{4})")
+_PREFIJO = re.compile(r"D?0*(\d*)(?:-(\d{0,4}))?$")
+
+
+def clave_numero(numero: str) -> Optional[str]:
+    """
+    Clave canónica de un número de opinión o resolución: correlativo sin
+    ceros y año ("D000008-2026-OECE-DTN", "D008-2026", "008-2026-OECE-DTN"
+    y "Opinión N° 8-2026" → "8-2026"; "1900-2025-TCE-SP" → "1900-2025")
+    """
+    m = _NUMERO.search(numero.upper())
+    return f"{int(m.group(1))}-{m.group(2)}" if m else None
+
+
+def prefijo_clave(prefijo: str) -> Optional[str]:
+    """Prefijo de clave canónica para autocompletar ("D0008-20" → "8-20"); None si no aplica"""
+    m = _PREFIJO.match(prefijo.upper().replace(" ", ""))
+    if not m or not m.group(1).lstrip("0"):
+        return None
+    correlativo = str(int(m.group(1)))
+    return correlativo if m.group(2) is None else f"{correlativo}-{m.group(2)}"
+
+
+class IndiceNumeros:
+    """
+    Búsqueda por número en O(1) y autocompletado por prefijo
+
+    Cada documento se registra por su número en mayúsculas, por su clave
+    canónica y por su correlativo (el del año más reciente). El
+    autocompletado usa búsqueda binaria sobre listas ordenadas de números y
+    claves, que se reordenan solo cuando se agregaron documentos.
+    """
+
+    def __init__(self):
+        self._exactos: Dict[str, Dict] = {}
+        self._correlativos: Dict[str, Dict] = {}
+        self._numeros: List[Tuple[str, int]] = []
+        self._claves: List[Tuple[str, int]] = []
+        self._documentos: List[Dict] = []
+        self._ordenado = True
+
+    def add(self, documento: Dict):
+        numero = str(documento.get("numero", "")).upper()
+        if not numero:
+            return
+        posicion = len(self._documentos)
+        self._documentos.append(documento)
+        self._exactos.setdefault(numero, documento)
+        self._numeros.append((numero, posicion))
+        clave = clave_numero(numero)
+        if clave:
+            self._exactos.setdefault(clave, documento)
+            self._claves.append((clave, posicion))
+            correlativo = clave.split("-")[0]
+            anterior = self._correlativos.get(correlativo)
+            if anterior is None or str(documento.get("fecha", "")) > str(anterior.get("fecha", "")):
+                self._correlativos[correlativo] = documento
+        self._ordenado = False
+
+    def obtener(self, numero: str) -> Optional[Dict]:
+        """Documento por número exacto, clave canónica o solo correlativo (el más reciente)"""
+        numero = numero.strip().upper()
+        documento = self._exactos.get(numero)
+        if documento is None:
+            clave = clave_numero(numero)
+            documento = self._exactos.get(clave) if clave else None
+        if documento is None:
+            clave = prefijo_clave(numero)
+            if clave and "-" not in clave:
+                documento = self._correlativos.get(clave)
+        return documento
+
+    def autocompletar(self, prefijo: str, limite: int = 10) -> List[Dict]:
+        """Documentos cuyo número o clave canónica empieza con `prefijo`"""
+        prefijo = prefijo.strip().upper().replace(" ", "")
+        if not prefijo:
+            return []
+        if not self._ordenado:
+            self._numeros.sort()
+            self._claves.sort()
+            self._ordenado = True
+
+        # Primero la coincidencia exacta ("D008-2026"), luego los prefijos
+        exacto = self.obtener(prefijo)
+        resultados = [exacto] if exacto is not None else []
+        vistos = {id(exacto)}
+        for lista, inicio in ((self._numeros, prefijo), (self._claves, prefijo_clave(prefijo))):
+            if not inicio:
+                continue
+            i = bisect.bisect_left(lista, (inicio,))
+            while i < len(lista) and len(resultados) < limite and lista[i][0].startswith(inicio):
+                documento = self._documentos[lista[i][1]]
+                if id(documento) not in vistos:
+                    vistos.add(id(documento))
+                    resultados.append(documento)
+                i += 1
+        return resultados[:limite]
+
+
+class Resultado(NamedTuple):
+    """Documento encontrado y su puntaje BM25"""
+    documento: Dict
+    puntaje: float
+
+
+class SearchIndex:
+    """
+    Índice invertido en memoria
+
+    Cada documento se normaliza y tokeniza una sola vez al agregarlo. Una
+    consulta solo recorre las listas de las palabras que contiene, así el
+    costo depende de cuántos documentos comparten esas palabras y no del
+    tamaño del catálogo. Los campos de texto y listas (palabras_clave) se
+    ponderan según `pesos`; los campos que faltan se ignoran.
+    """
+
+    def __init__(self, pesos: Optional[Dict[str, float]] = None, k1: float = 1.2, b: float = 0.75):
+        self.pesos = pesos or PESOS_CAMPOS
+        self.k1 = k1
+        self.b = b
+        self.documentos: List[Dict] = []
+        self._longitudes: List[float] = []
+        self._longitud_total = 0.0
+        # palabra -> {posición del documento: frecuencia ponderada por campo}
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self.numeros = IndiceNumeros()
+
+    def __len__(self) -> int:
+        return len(self.documentos)
+
+    def add(self, documento: Dict):
+        """Agrega un documento al índice"""
+        posicion = len(self.documentos)
+        frecuencias: Dict[str, float] = defaultdict(float)
+        for campo, peso in self.pesos.items():
+            valor = documento.get(campo)
+            if not valor:
+                continue
+            texto = " ".join(valor) if isinstance(valor, (list, tuple)) else str(valor)
+            for palabra in terminos(texto):
+                frecuencias[palabra] += peso
+
+        for palabra, frecuencia in frecuencias.items():
+            self._postings[palabra][posicion] = frecuencia
+        self.documentos.append(documento)
+        self._longitudes.append(sum(frecuencias.values()))
+        self._longitud_total += self._longitudes[-1]
+        self.numeros.add(documento)
+
+    def extend(self, documentos: Iterable[Dict]):
+        for documento in documentos:
+            self.add(documento)
+
+    def search(self, consulta: str, limite: int = 5, desde: int = 0,
+               coincidencia_minima: float = 0.5) -> Tuple[List[Resultado], int]:
+        """
+        Busca los documentos más relevantes
+
+        Args:
+            consulta: Texto libre
+            limite: Resultados por página
+            desde: Resultados a saltar (paginación)
+            coincidencia_minima: Fracción de palabras de la consulta que debe
+                contener un documento para considerarse relevante
+
+        Returns:
+            (resultados de la página ordenados por puntaje, total de documentos relevantes)
+        """
+        unicos = list(dict.fromkeys(terminos(consulta)))
+        presentes = [t for t in unicos if t in self._postings]
+        if not presentes:
+            return [], 0
+
+        n = len(self.documentos)
+        promedio = self._longitud_total / n or 1.0
+        puntajes: Dict[int, float] = defaultdict(float)
+        coincidencias: Dict[int, int] = defaultdict(int)
+
+        for termino in presentes:
+            postings = self._postings[termino]
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for posicion, frecuencia in postings.items():
+                norma = self.k1 * (1 - self.b + self.b * self._longitudes[posicion] / promedio)
+                puntajes[posicion] += idf * frecuencia * (self.k1 + 1) / (frecuencia + norma)
+                coincidencias[posicion] += 1
+
+        minimo = max(1, math.ceil(coincidencia_minima * len(unicos)))
+        relevantes = [(p, s) for p, s in puntajes.items() if coincidencias[p] >= minimo]
+        # Desempate estable por orden de carga (los catálogos vienen del más reciente al más antiguo)
+        mejores = heapq.nsmallest(desde + limite, relevantes, key=lambda item: (-item[1], item[0]))
+        pagina = [Resultado(self.documentos[p], round(s, 4)) for p, s in mejores[desde:]]
+        return pagina, len(relevantes)
+
+    def obtener(self, numero: str) -> Optional[Dict]:
+        return self.numeros.obtener(numero)
+
+    def autocompletar(self, prefijo: str, limite: int = 10) -> List[Dict]:
+        return self.numeros.autocompletar(prefijo, limite)
+
+
+def paginar(indice: SearchIndex, consulta: str, pagina: int = 1, por_pagina: int = 5) -> Dict:
+    """Respuesta paginada para las APIs de búsqueda de opiniones y resoluciones"""
+    pagina = max(1, pagina)
+    por_pagina = max(1, min(por_pagina, 50))
+    resultados, total = indice.search(consulta, limite=por_pagina, desde=(pagina - 1) * por_pagina)
+    return {
+        "resultados": [dict(r.documento, puntaje=r.puntaje) for r in resultados],
+        "total": total,
+        "pagina": pagina,
+        "por_pagina": por_pagina,
+    }
+
+
+# Fracción de las palabras del tema que debe contener un documento para que
+# el chat lo liste (con 2 palabras, ambas; con 3, dos; con 4, tres)
+COINCIDENCIA_CHAT = 0.6
+
+
+def buscar_relevantes(indice: SearchIndex, consulta: str, genericas: Iterable[str] = (),
+                      limite: int = 5) -> List[Dict]:
+    """
+    Búsqueda estricta para el enrutamiento del chat
+
+    Las palabras que nombran la colección ("tribunal", "opinión", "dtn"...)
+    no cuentan: todas las opiniones llevan "DTN" en el número, así que con
+    la coincidencia mínima por defecto "opinión DTN sobre el plazo de la
+    fiesta" listaba cualquier opinión que hablara de plazos. Del resto se
+    exige COINCIDENCIA_CHAT; sin coincidencias retorna una lista vacía y la
+    pregunta sigue al motor conversacional.
+    """
+    genericas = {raiz(p) for p in genericas}
+    contenido = [p for p in palabras(consulta) if raiz(p) not in genericas]
+    if not contenido:
+        return []
+    resultados, _ = indice.search(" ".join(contenido), limite=limite, coincidencia_minima=COINCIDENCIA_CHAT)
+    return [r.documento for r in resultados]
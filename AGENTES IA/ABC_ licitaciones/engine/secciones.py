@@ -0,0 +1,252 @@
+"""
+Localizador de Secciones de Bases
+Elige los capítulos relevantes de un documento largo para enviarlos a Gemini dentro de un presupuesto de tokens
+Agente de Contrataciones Públicas - Perú
+"""
+import logging
+import re
+from bisect import bisect_right
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from engine.texto import estimar_tokens, normalizar_texto, palabras
+
+
+logger = logging.getLogger(__name__)
+
+# Tema de una sección según las palabras de su título (ya normalizado); el
+# orden importa: gana el primer tema que coincide
+TEMAS = (
+    ("requisitos", ("requisitos de calificacion", "requisito", "calificacion", "experiencia del postor",
+                    "capacidad legal", "capacidad tecnica", "personal clave")),
+    ("factores", ("factores de evaluacion", "factor", "puntaje", "metodologia", "evaluacion")),
+    ("penalidades", ("penalidad",)),
+    ("garantias", ("garantia",)),
+    ("valor", ("valor referencial", "valor estimado", "presupuesto", "sistema de contratacion")),
+    ("plazo", ("plazo de ejecucion", "plazo de entrega", "plazo de prestacion", "plazo")),
+    ("tdr", ("terminos de referencia", "especificaciones tecnicas", "requerimiento")),
+    ("objeto", ("objeto de la convocatoria", "objeto", "entidad convocante", "generalidades")),
+    ("propuestas", ("cuadro comparativo", "evaluacion de ofertas", "buena pro", "orden de prelacion")),
+)
+
+# Temas que necesita cada análisis, por prioridad
+TEMAS_POR_ANALISIS = {
+    "bases": ("valor", "objeto", "requisitos", "factores", "plazo", "penalidades", "garantias"),
+    "vicios": ("requisitos", "factores", "tdr", "plazo", "penalidades", "garantias", "valor"),
+    "evaluacion": ("propuestas", "factores"),
+}
+
+# Encabezados que abren un bloque mayor (no heredan el tema del anterior)
+_CAPITULO = re.compile(r"(?:cap[ií]tulo|secci[oó]n|anexo)\b[\s\w°º.-]{0,12}$|"
+                       r"(?:cap[ií]tulo|secci[oó]n|anexo)\s+(?:n[°º.]\s*)?[ivxlc\d]+\b", re.I)
+# Numeración decimal de subtítulos: "3.2", "1.10.4."
+_NUMERADO = re.compile(r"\d{1,2}(?:\.\d{1,2}){1,3}\.?\s+\S")
+
+# Caracteres siempre incluidos del inicio (número de proceso, entidad, objeto)
+CABECERA = 2000
+# Menor tramo de una sección que vale la pena enviar
+MINIMO_SECCION = 800
+_SEPARADOR = "\n[...]\n"
+
+
+class Seccion(NamedTuple):
+    titulo: str
+    tema: Optional[str]
+    inicio: int
+    fin: int
+
+
+def _tema(titulo: str) -> Optional[str]:
+    titulo = normalizar_texto(titulo)
+    for tema, claves in TEMAS:
+        if any(clave in titulo for clave in claves):
+            return tema
+    return None
+
+
+def _es_encabezado(linea: str) -> bool:
+    if not 3 <= len(linea) <= 120:
+        return False
+    if _CAPITULO.match(linea):
+        return True
+    if _NUMERADO.match(linea) and len(linea) <= 90 and not linea.endswith("."):
+        return True
+    return linea.isupper() and sum(c.isalpha() for c in linea) >= 4
+
+
+def localizar_secciones(texto: str) -> List[Seccion]:
+    """
+    Divide el texto en secciones por sus encabezados
+
+    Son encabezados las líneas cortas de capítulo/sección/anexo, los
+    subtítulos numerados ("3.2 Requisitos de calificación") y las líneas en
+    mayúsculas. Un "CAPÍTULO III" sin más texto toma el título de la línea
+    siguiente. Una sección sin tema propio hereda el de la anterior, salvo
+    que abra un capítulo nuevo.
+    """
+    lineas = texto.split("\n")
+    encabezados = []
+    posicion = 0
+    for i, linea in enumerate(lineas):
+        limpia = linea.strip()
+        if _es_encabezado(limpia):
+            titulo = limpia
+            capitulo = bool(_CAPITULO.match(limpia))
+            if capitulo and len(limpia) < 20 and i + 1 < len(lineas):
+                titulo = f"{limpia} {lineas[i + 1].strip()}"
+            encabezados.append((posicion, titulo, capitulo))
+        posicion += len(linea) + 1
+
+    secciones = []
+    tema_anterior = None
+    for n, (inicio, titulo, capitulo) in enumerate(encabezados):
+        fin = encabezados[n + 1][0] if n + 1 < len(encabezados) else len(texto)
+        tema = _tema(titulo) or (None if capitulo else tema_anterior)
+        secciones.append(Seccion(titulo, tema, inicio, fin))
+        tema_anterior = tema
+    return secciones
+
+
+def _recortar(texto: str, inicio: int, fin: int, max_chars: int, holgura: float = 0.5) -> int:
+    """
+    Fin del tramo [inicio, fin) recortado a max_chars, en un salto de línea
+    si hay uno en la última fracción `holgura` del tramo
+    """
+    if fin - inicio <= max_chars:
+        return fin
+    corte = texto.rfind("\n", inicio, inicio + max_chars)
+    return corte if corte > inicio + max_chars * (1 - holgura) else inicio + max_chars
+
+
+def _candidatas(texto: str, secciones: List[Seccion], tipo_analisis: str,
+                pregunta: Optional[str]) -> List[Seccion]:
+    if pregunta:
+        return _por_pregunta(texto, secciones, pregunta)
+    return _por_temas(secciones, TEMAS_POR_ANALISIS.get(tipo_analisis, TEMAS_POR_ANALISIS["bases"]))
+
+
+def _tramos(texto: str, candidatas: List[Seccion], max_chars: int) -> List[Tuple[int, int]]:
+    """
+    Tramos [inicio, fin) de la cabecera y las candidatas dentro de `max_chars`
+
+    La cabecera siempre va; cada sección recibe a lo sumo una parte igual
+    de lo que queda (lo que no usa una sección corta pasa a las siguientes).
+    Se devuelven en el orden del documento, uniendo los contiguos; solo la
+    cabecera si ninguna sección entra.
+    """
+    cabecera = _recortar(texto, 0, len(texto), min(CABECERA, max_chars))
+    tramos = [(0, cabecera)]
+    disponible = max_chars - cabecera
+    for restantes in range(len(candidatas), 0, -1):
+        seccion = candidatas[len(candidatas) - restantes]
+        disponible -= len(_SEPARADOR)
+        if disponible < MINIMO_SECCION:
+            break
+        inicio = max(seccion.inicio, cabecera)
+        if inicio >= seccion.fin:
+            continue
+        cuota = max(MINIMO_SECCION, disponible // restantes)
+        fin = _recortar(texto, inicio, seccion.fin, min(cuota, disponible))
+        tramos.append((inicio, fin))
+        disponible -= fin - inicio
+
+    unidos = []
+    for inicio, fin in sorted(tramos):
+        if unidos and unidos[-1][1] >= inicio:
+            unidos[-1] = (unidos[-1][0], max(fin, unidos[-1][1]))
+        else:
+            unidos.append((inicio, fin))
+    return unidos
+
+
+def extracto_para_prompt(texto: str, tipo_analisis: str, max_tokens: int,
+                         pregunta: Optional[str] = None) -> str:
+    """
+    Texto a enviar a Gemini dentro de `max_tokens`
+
+    Un documento que cabe en el presupuesto se envía completo. Si no, se
+    envía la cabecera más las secciones de los temas del análisis (o, para
+    una pregunta, las que tratan sus temas y sus palabras), en el orden del
+    documento y separadas por "[...]". Sin secciones reconocibles se usa el
+    inicio del documento, como antes.
+    """
+    if estimar_tokens(texto) <= max_tokens:
+        return texto
+    max_chars = max_tokens * 4
+
+    candidatas = _candidatas(texto, localizar_secciones(texto), tipo_analisis, pregunta)
+    tramos = _tramos(texto, candidatas, max_chars)
+    if len(tramos) == 1 and not candidatas:
+        return texto[:_recortar(texto, 0, len(texto), max_chars)]
+
+    logger.debug("📑 Secciones enviadas a Gemini (%s): %s", tipo_analisis,
+                 ", ".join(s.titulo for s in candidatas if any(i <= s.inicio < f for i, f in tramos)))
+    return _SEPARADOR.join(texto[inicio:fin] for inicio, fin in tramos)
+
+
+def dividir_en_bloques(texto: str, tipo_analisis: str, max_tokens: int, max_bloques: int) -> List[str]:
+    """
+    Bloques de hasta `max_tokens` para analizar un documento largo en paralelo
+
+    Se reparten entre `max_bloques` llamadas las mismas secciones que usa
+    extracto_para_prompt, en el orden del documento (la cabecera va en el
+    primer bloque); una sección más larga que un bloque se corta en saltos
+    de línea. Sin secciones reconocibles se divide el inicio del documento.
+    """
+    if estimar_tokens(texto) <= max_tokens:
+        return [texto]
+    max_chars = max_tokens * 4
+    # Los bloques se llenan hasta el 90%: los cortes buscan un salto de línea
+    total_chars = max(1, max_bloques) * (max_chars * 9 // 10)
+
+    candidatas = _candidatas(texto, localizar_secciones(texto), tipo_analisis, None)
+    if candidatas:
+        tramos = _tramos(texto, candidatas, total_chars)
+    else:
+        tramos = [(0, _recortar(texto, 0, len(texto), total_chars))]
+
+    bloques = []
+    actual = []
+    largo = 0
+    for inicio, fin in tramos:
+        while inicio < fin:
+            espacio = max_chars - largo - (len(_SEPARADOR) if actual else 0)
+            if espacio < MINIMO_SECCION // 4:
+                bloques.append(_SEPARADOR.join(actual))
+                actual, largo = [], 0
+                continue
+            corte = _recortar(texto, inicio, fin, espacio, holgura=0.1)
+            largo += corte - inicio + (len(_SEPARADOR) if actual else 0)
+            actual.append(texto[inicio:corte])
+            inicio = corte
+    if actual:
+        bloques.append(_SEPARADOR.join(actual))
+    return bloques[:max(1, max_bloques)]
+
+
+def _por_temas(secciones: List[Seccion], temas: Sequence[str]) -> List[Seccion]:
+    prioridad = {tema: i for i, tema in enumerate(temas)}
+    elegidas = [s for s in secciones if s.tema in prioridad]
+    return sorted(elegidas, key=lambda s: (prioridad[s.tema], s.inicio))
+
+
+# Letras sin tilde → clase que acepta sus variantes, para buscar palabras
+# normalizadas en el texto original sin normalizar todo el documento
+_VARIANTES = {"a": "[aá]", "e": "[eé]", "i": "[ií]", "o": "[oó]", "u": "[uúü]", "n": "[nñ]"}
+
+
+def _por_pregunta(texto: str, secciones: List[Seccion], pregunta: str) -> List[Seccion]:
+    """Secciones del tema de la pregunta primero; luego por cantidad de palabras de la pregunta"""
+    temas = {_tema(pregunta)} - {None}
+    coincidencias = [0] * len(secciones)
+    terminos = sorted(set(palabras(pregunta)), key=len, reverse=True)
+    if terminos and secciones:
+        patron = re.compile(r"\b(?:" + "|".join("".join(_VARIANTES.get(c, re.escape(c)) for c in termino)
+                                                 for termino in terminos) + r")\b", re.I)
+        inicios = [seccion.inicio for seccion in secciones]
+        for match in patron.finditer(texto):
+            n = bisect_right(inicios, match.start()) - 1
+            if n >= 0:
+                coincidencias[n] += 1
+    puntajes = [(seccion.tema not in temas, -coincidencias[n], seccion.inicio, seccion)
+                for n, seccion in enumerate(secciones) if seccion.tema in temas or coincidencias[n]]
+    return [seccion for *_, seccion in sorted(puntajes)]
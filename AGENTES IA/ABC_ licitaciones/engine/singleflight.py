@@ -0,0 +1,72 @@
+"""
+Coalescencia de Peticiones Idénticas (single-flight)
+Peticiones concurrentes con la misma clave esperan una sola llamada en curso
+Agente de Contrataciones Públicas - Perú
+"""
+import re
+import threading
+import unicodedata
+from typing import Any, Callable, Dict, Hashable
+
+from engine.metrics import metrics
+
+
+def normalizar_prompt(texto: str) -> str:
+    """Normaliza un prompt para comparar peticiones: Unicode NFC, minúsculas y espacios"""
+    texto = unicodedata.normalize("NFC", texto).casefold()
+    return re.sub(r"\s+", " ", texto).strip()
+
+
+class _Llamada:
+    """Llamada en curso compartida por el líder y sus seguidores"""
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """
+    Deduplicación de llamadas concurrentes
+
+    La primera petición con una clave (líder) ejecuta la función; las que
+    llegan mientras está en curso esperan y reciben el mismo resultado (o la
+    misma excepción). Al terminar, la clave se libera: no es un caché.
+
+    Contadores en /api/metrics:
+        inkabot_upstream_calls_total{flight="..."}   llamadas reales
+        inkabot_coalesced_calls_total{flight="..."}  peticiones que se ahorraron
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._en_curso: Dict[Hashable, _Llamada] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            llamada = self._en_curso.get(key)
+            lider = llamada is None
+            if lider:
+                llamada = _Llamada()
+                self._en_curso[key] = llamada
+
+        if not lider:
+            metrics.incr("coalesced_calls", flight=self.name)
+            llamada.evento.wait()
+            if llamada.error is not None:
+                raise llamada.error
+            return llamada.resultado
+
+        metrics.incr("upstream_calls", flight=self.name)
+        try:
+            llamada.resultado = fn()
+            return llamada.resultado
+        except BaseException as e:
+            llamada.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._en_curso[key]
+            llamada.evento.set()
@@ -0,0 +1,54 @@
+"""
+Normalización de Texto para Búsquedas
+Funciones compartidas por las respuestas rápidas, los índices de opiniones y
+resoluciones y los presupuestos de tokens de los prompts
+"""
+import re
+import unicodedata
+from typing import Iterable, List, Pattern
+
+_SIGNOS = str.maketrans("", "", "¿?¡!")
+_PALABRA = re.compile(r"\w+")
+
+
+def normalizar_texto(texto: str) -> str:
+    """Minúsculas, sin tildes ni signos de interrogación/exclamación, espacios simples"""
+    texto = unicodedata.normalize("NFKD", texto.lower().translate(_SIGNOS))
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(texto.split())
+
+
+# Palabras funcionales: no distinguen una pregunta de otra y, en un índice
+# invertido, apuntarían a casi todos los documentos
+STOPWORDS = frozenset("""
+a al ante con contra de del desde durante e el en entre hacia hasta la las le les lo los
+mas me mi mis muy ni no o os para pero por que se segun si sin sobre su sus te tu u un una
+unos unas y ya es son esta estan este esto estos ser hay como cual cuales cuando cuanto
+cuanta cuantos cuantas donde quien quienes puedo puede pueden debo debe deben
+""".split())
+
+
+def palabras(texto: str) -> List[str]:
+    """
+    Palabras significativas de un texto sin normalizar, en orden y con repeticiones
+
+    A diferencia de respuestas_rapidas.tokenizar, separa también por guiones y
+    puntuación ("D000001-2026-OECE-DTN" → d000001, 2026, oece, dtn).
+    """
+    return [p for p in _PALABRA.findall(normalizar_texto(texto)) if p not in STOPWORDS]
+
+
+def patron_palabras(claves: Iterable[str]) -> Pattern:
+    """
+    Expresión que encuentra cualquiera de las claves como palabras completas
+
+    Para los detectores por palabras clave: "que" no coincide dentro de
+    "requisitos" ni "bases" dentro de "basesdatos". Sin distinguir mayúsculas.
+    """
+    alternativas = "|".join(re.escape(c) for c in sorted(claves, key=len, reverse=True))
+    return re.compile(r"\b(?:" + alternativas + r")\b", re.IGNORECASE)
+
+
+def estimar_tokens(texto: str) -> int:
+    """Estimación rápida de tokens (~4 caracteres por token en español)"""
+    return max(1, len(texto) // 4) if texto else 0
@@ -0,0 +1,201 @@
+"""
+Trabajos de Análisis de PDFs en Segundo Plano
+La subida responde con un identificador; las etapas corren en un pool y publican su progreso
+Agente de Contrataciones Públicas - Perú
+"""
+import ipaddress
+import logging
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+from config import Config
+from engine.metrics import metrics
+from engine.uploads import FuentePDF
+
+
+logger = logging.getLogger(__name__)
+
+# Avance (%) al terminar cada etapa de DocumentAnalyzer.analizar_bases_completo
+PROGRESO_ETAPAS = {"en_cola": 0, "extraccion": 25, "reglas": 45, "ia": 85, "completado": 100}
+TERMINALES = ("completado", "error")
+
+# analizar(fuente, progreso) -> resultado final o {"error": ...}
+Analizar = Callable[[FuentePDF, Callable[[str, Dict], None]], Dict]
+
+
+def validar_callback_url(url: str, hosts_permitidos: Iterable[str] = ()):
+    """
+    Rechaza URLs de callback que apunten a la red interna (SSRF)
+
+    Con `hosts_permitidos` (PDF_CALLBACK_HOSTS) solo se aceptan esos hosts.
+    Sin lista, el host se resuelve y se rechaza si alguna de sus direcciones
+    es privada, de loopback, link-local, multicast o reservada (por ejemplo
+    127.0.0.1, 10.0.0.0/8 o el 169.254.169.254 de metadatos de la nube).
+
+    Raises:
+        ValueError: con el motivo del rechazo
+    """
+    partes = urlsplit(url)
+    host = (partes.hostname or "").lower()
+    if partes.scheme not in ("http", "https") or not host:
+        raise ValueError("callback_url debe ser una URL http(s)")
+    permitidos = {h.lower() for h in hosts_permitidos}
+    if permitidos:
+        if host not in permitidos:
+            raise ValueError(f"callback_url: el host {host} no está permitido")
+        return
+    try:
+        puerto = partes.port or (443 if partes.scheme == "https" else 80)
+        direcciones = {info[4][0] for info in socket.getaddrinfo(host, puerto, proto=socket.IPPROTO_TCP)}
+    except (OSError, ValueError) as e:
+        raise ValueError(f"callback_url: no se pudo resolver {host} ({e})")
+    for direccion in direcciones:
+        ip = ipaddress.ip_address(direccion.split("%")[0])
+        if not ip.is_global or ip.is_multicast:
+            raise ValueError(f"callback_url: {host} apunta a una dirección interna ({ip})")
+
+
+def notificar_webhook(url: str, trabajo: Dict, timeout: float = 10.0):
+    """
+    POST del estado final del trabajo (JSON) a la URL de callback del cliente
+
+    La URL se vuelve a validar al enviar (el DNS pudo cambiar desde la
+    subida) y no se siguen redirecciones: una respuesta 3xx cuenta como fallo.
+    """
+    import requests
+    validar_callback_url(url, Config.PDF_CALLBACK_HOSTS)
+    respuesta = requests.post(url, json=trabajo, timeout=timeout, allow_redirects=False)
+    if respuesta.is_redirect:
+        raise ValueError(f"el callback respondió con una redirección ({respuesta.status_code})")
+    respuesta.raise_for_status()
+
+
+class GestorTrabajos:
+    """
+    Cola de análisis de PDFs con `max_workers` trabajos a la vez
+
+    Cada trabajo pasa por en_cola → extraccion → reglas → ia → completado
+    (o error). Lo que publica cada etapa se acumula en "parcial": los datos
+    y vicios por expresiones regulares se pueden consultar antes de que
+    responda Gemini. Al terminar se avisa a la URL de callback, si la hay.
+
+    Los trabajos terminados se conservan `ttl` segundos; con `max_trabajos`
+    guardados, un trabajo nuevo desplaza al terminado más antiguo o se
+    rechaza (RuntimeError) si todos siguen en curso.
+    """
+
+    def __init__(self, analizar: Analizar, max_workers: int = 2, ttl: float = 3600,
+                 max_trabajos: int = 200, notificar: Callable[[str, Dict], None] = notificar_webhook):
+        self.analizar = analizar
+        self.ttl = ttl
+        self.max_trabajos = max(1, max_trabajos)
+        self.notificar = notificar
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="pdf-trabajo")
+        self._lock = threading.Lock()
+        self._trabajos: Dict[str, Dict] = {}
+
+    def crear(self, fuente: FuentePDF, callback_url: Optional[str] = None) -> Dict:
+        """
+        Encola el análisis de `fuente` y retorna el estado inicial
+
+        El trabajo toma la fuente: la cierra (y borra su temporal) al terminar.
+        """
+        ahora = time.time()
+        trabajo = {
+            "id": uuid.uuid4().hex,
+            "archivo": fuente.nombre,
+            "estado": "en_cola",
+            "etapa": "en_cola",
+            "progreso": 0,
+            "parcial": {},
+            "resultado": None,
+            "error": None,
+            "creado": ahora,
+            "actualizado": ahora,
+        }
+        try:
+            with self._lock:
+                self._depurar(ahora, hacer_lugar=True)
+                self._trabajos[trabajo["id"]] = trabajo
+                estado = self._copia(trabajo)
+            self._pool.submit(self._ejecutar, trabajo["id"], fuente, callback_url)
+        except RuntimeError:
+            with self._lock:
+                self._trabajos.pop(trabajo["id"], None)
+            fuente.cerrar()
+            raise
+        metrics.incr("pdf_trabajos", estado="en_cola")
+        return estado
+
+    def obtener(self, trabajo_id: str) -> Optional[Dict]:
+        """Estado actual del trabajo (copia), o None si no existe o ya expiró"""
+        with self._lock:
+            self._depurar(time.time())
+            trabajo = self._trabajos.get(trabajo_id)
+            return self._copia(trabajo) if trabajo else None
+
+    def cerrar(self, esperar: bool = True):
+        self._pool.shutdown(wait=esperar)
+
+    def _ejecutar(self, trabajo_id: str, fuente: FuentePDF, callback_url: Optional[str]):
+        inicio = time.perf_counter()
+
+        def progreso(etapa: str, parcial: Dict):
+            with self._lock:
+                trabajo = self._trabajos[trabajo_id]
+                trabajo["parcial"].update(parcial)
+                trabajo["etapa"] = etapa
+                trabajo["progreso"] = PROGRESO_ETAPAS.get(etapa, trabajo["progreso"])
+                trabajo["actualizado"] = time.time()
+
+        self._actualizar(trabajo_id, estado="procesando")
+        try:
+            with fuente:
+                resultado = self.analizar(fuente, progreso)
+        except Exception as e:
+            logger.exception("❌ Error en el trabajo %s", trabajo_id)
+            resultado = {"error": str(e)}
+
+        duracion = round(time.perf_counter() - inicio, 3)
+        if "error" in resultado:
+            final = self._actualizar(trabajo_id, estado="error", error=resultado["error"], duracion_s=duracion)
+        else:
+            final = self._actualizar(trabajo_id, estado="completado", etapa="completado",
+                                     progreso=100, resultado=resultado, duracion_s=duracion)
+        metrics.incr("pdf_trabajos", estado=final["estado"])
+        logger.info("📄 Trabajo %s %s en %.1fs", trabajo_id, final["estado"], final["duracion_s"])
+
+        if callback_url:
+            try:
+                self.notificar(callback_url, final)
+                metrics.incr("pdf_trabajos_callback", estado="ok")
+            except Exception as e:
+                metrics.incr("pdf_trabajos_callback", estado="error")
+                logger.warning("⚠️ No se pudo notificar el trabajo %s a %s: %s", trabajo_id, callback_url, e)
+
+    def _actualizar(self, trabajo_id: str, **campos) -> Dict:
+        with self._lock:
+            trabajo = self._trabajos[trabajo_id]
+            trabajo.update(campos, actualizado=time.time())
+            return self._copia(trabajo)
+
+    def _depurar(self, ahora: float, hacer_lugar: bool = False):
+        """Elimina los terminados vencidos y, para hacer lugar, el terminado más antiguo (con el lock tomado)"""
+        for trabajo_id in [t["id"] for t in self._trabajos.values()
+                           if t["estado"] in TERMINALES and ahora - t["actualizado"] > self.ttl]:
+            del self._trabajos[trabajo_id]
+        if not hacer_lugar or len(self._trabajos) < self.max_trabajos:
+            return
+        terminados = [t for t in self._trabajos.values() if t["estado"] in TERMINALES]
+        if not terminados:
+            raise RuntimeError("Demasiados análisis de PDF en curso, intente más tarde")
+        del self._trabajos[min(terminados, key=lambda t: t["actualizado"])["id"]]
+
+    @staticmethod
+    def _copia(trabajo: Dict) -> Dict:
+        return dict(trabajo, parcial=dict(trabajo["parcial"]))
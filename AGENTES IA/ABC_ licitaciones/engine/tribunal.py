@@ -2,8 +2,13 @@
 Módulo de Resoluciones del Tribunal de Contrataciones del Estado
 Gestión y consulta de resoluciones, sanciones e inhabilitaciones
 """
+import threading
 from datetime import datetime, timedelta
 
+from config import Config
+from engine.catalogo import RESOLUCIONES, CatalogoStore, abrir_catalogo
+from engine.search_index import buscar_relevantes, paginar
+
 class TribunalContrataciones:
     """
     Gestiona información sobre el Tribunal de Contrataciones del Estado (TCE)
@@ -282,24 +287,47 @@ class TribunalContrataciones:
         }
     ]
     
-    def __init__(self):
-        """Inicializa el gestor del Tribunal"""
-        pass
+    # Nombran la colección, no el tema: no cuentan al buscar desde el chat
+    PALABRAS_COLECCION = ("tribunal", "tce", "resolución", "resoluciones", "sala")
     
-    def buscar_resoluciones(self, consulta: str) -> list:
-        """Busca resoluciones por materia o palabras clave"""
-        consulta_lower = consulta.lower()
-        resultados = []
+    def __init__(self, catalogo_path: str = None):
+        """
+        Inicializa el gestor del Tribunal
         
-        for res in self.RESOLUCIONES_RELEVANTES:
-            if consulta_lower in res['materia'].lower():
-                resultados.append(res)
-            elif consulta_lower in res['resumen'].lower():
-                resultados.append(res)
-            elif consulta_lower in res.get('tipo', '').lower():
-                resultados.append(res)
+        El catálogo de resoluciones (en disco o en memoria) se abre en la primera consulta.
+        """
+        self.catalogo_path = catalogo_path or Config.CATALOGO_DB
+        self._indice = None
+        self._lock = threading.Lock()
+    
+    @property
+    def indice(self):
+        """Catálogo completo en disco o índice en memoria de las resoluciones incorporadas"""
+        if self._indice is None:
+            with self._lock:
+                if self._indice is None:
+                    self._indice = abrir_catalogo(self.catalogo_path, RESOLUCIONES, self.RESOLUCIONES_RELEVANTES)
+        return self._indice
+    
+    def buscar_resoluciones(self, consulta: str) -> list:
+        """
+        Busca resoluciones por número, materia, tipo o palabras del resumen
         
-        return resultados[:5]
+        Solo las que contienen al menos el 60 % (COINCIDENCIA_CHAT) de las
+        palabras de la consulta, sin contar las que nombran al Tribunal (ver
+        buscar_relevantes)
+        """
+        return buscar_relevantes(self.indice, consulta, self.PALABRAS_COLECCION)
+    
+    def buscar(self, consulta: str, pagina: int = 1, por_pagina: int = 5) -> dict:
+        """Búsqueda paginada con puntaje de relevancia"""
+        return paginar(self.indice, consulta, pagina, por_pagina)
+    
+    def listar_resoluciones(self, cantidad: int = 50) -> list:
+        """Resoluciones más recientes del catálogo"""
+        if isinstance(self.indice, CatalogoStore):
+            return self.indice.recientes(cantidad)
+        return self.RESOLUCIONES_RELEVANTES[:cantidad]
     
     def obtener_tipos_sanciones(self) -> dict:
         """Retorna los tipos de sanciones disponibles"""
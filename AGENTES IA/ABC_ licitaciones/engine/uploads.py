@@ -0,0 +1,103 @@
+"""
+Recepción de PDFs Subidos
+Documento en memoria o, si es grande, en un archivo temporal, con su SHA-256 calculado al leerlo
+Agente de Contrataciones Públicas - Perú
+"""
+import hashlib
+import os
+import tempfile
+from typing import BinaryIO, Optional
+
+
+class FuentePDF:
+    """
+    PDF a analizar, venga de una subida o de una ruta local
+
+    Una subida se lee una sola vez: hasta `max_memoria` bytes queda en
+    memoria y PyMuPDF la abre con `stream=`; si es más grande se vuelca a un
+    archivo temporal que se elimina al cerrar la fuente. El SHA-256 (clave
+    de la caché de análisis) se calcula durante esa misma lectura.
+    """
+
+    def __init__(self, nombre: str, datos: Optional[bytes] = None, path: Optional[str] = None,
+                 temporal: bool = False, sha256: Optional[str] = None):
+        self.nombre = nombre
+        self.datos = datos
+        self.path = path
+        self.temporal = temporal
+        self._sha256 = sha256
+
+    @classmethod
+    def desde_ruta(cls, path: str) -> "FuentePDF":
+        return cls(os.path.basename(path), path=path)
+
+    @classmethod
+    def desde_stream(cls, stream: BinaryIO, nombre: str, max_memoria: int,
+                     bloque: int = 1 << 20) -> "FuentePDF":
+        """Lee una subida por bloques; pasa a disco solo si supera `max_memoria`"""
+        digest = hashlib.sha256()
+        partes = []
+        leido = 0
+        archivo = None
+        try:
+            for parte in iter(lambda: stream.read(bloque), b""):
+                digest.update(parte)
+                leido += len(parte)
+                if archivo is None and leido > max_memoria:
+                    archivo = tempfile.NamedTemporaryFile(prefix="inkabot_", suffix=".pdf", delete=False)
+                    archivo.writelines(partes)
+                    partes = []
+                if archivo is not None:
+                    archivo.write(parte)
+                else:
+                    partes.append(parte)
+        except BaseException:
+            if archivo is not None:
+                archivo.close()
+                os.remove(archivo.name)
+            raise
+
+        if archivo is None:
+            return cls(nombre, datos=b"".join(partes), sha256=digest.hexdigest())
+        archivo.close()
+        return cls(nombre, path=archivo.name, temporal=True, sha256=digest.hexdigest())
+
+    @property
+    def en_memoria(self) -> bool:
+        return self.datos is not None
+
+    @property
+    def origen(self):
+        """Bytes o ruta del PDF, para abrirlo de nuevo en otro proceso"""
+        return self.datos if self.en_memoria else self.path
+
+    def sha256(self) -> str:
+        if self._sha256 is None:
+            digest = hashlib.sha256()
+            if self.en_memoria:
+                digest.update(self.datos)
+            else:
+                with open(self.path, "rb") as f:
+                    for parte in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(parte)
+            self._sha256 = digest.hexdigest()
+        return self._sha256
+
+    def abrir(self):
+        """Documento PyMuPDF (usar con `with`)"""
+        import fitz  # PyMuPDF
+
+        if self.en_memoria:
+            return fitz.open(stream=self.datos, filetype="pdf")
+        return fitz.open(self.path)
+
+    def cerrar(self):
+        if self.temporal and self.path and os.path.exists(self.path):
+            os.remove(self.path)
+        self.datos = None
+
+    def __enter__(self) -> "FuentePDF":
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
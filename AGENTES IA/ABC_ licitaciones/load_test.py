@@ -0,0 +1,454 @@
+"""
+Prueba de Carga de la API (con Gemini y embeddings simulados)
+
+Levanta la app en un solo proceso (servidor werkzeug con hilos) y lanza una
+carga mixta de chat, /api/calculate, /api/plazos/calcular y subida de PDF con
+concurrencia configurable. Gemini y los embeddings se reemplazan por dobles
+locales con latencia ajustable, así la prueba es reproducible, no consume
+cuota y mide la capacidad de un worker, no la de Gemini.
+
+Reporta por endpoint: peticiones, tasa de error, throughput y latencias
+p50/p95/p99. La subida de PDF responde 202 con un trabajo en segundo plano:
+su latencia es la del análisis completo (se consulta el trabajo hasta que
+termina) y aparte se reporta cuánto tardó en aceptarse la subida.
+
+Uso:
+    python load_test.py [--concurrency 8] [--requests 200] [--mix chat=6,calculate=2,plazos=1,pdf=1]
+                        [--llm-latency-ms 800] [--llm-jitter-ms 200] [--llm-error-rate 0]
+                        [--embedding-latency-ms 80] [--vector-latency-ms 20] [--pdf-poll-ms 100] [--json]
+    python load_test.py --url http://localhost:5000 ...   (servidor ya levantado, sin dobles)
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PREGUNTAS_PATH = os.path.join(BASE_DIR, "PREGUNTAS_ENTRENAMIENTO.md")
+
+# Preguntas de respaldo si no existe el banco de entrenamiento
+PREGUNTAS_RESPALDO = [
+    "¿Cuándo entró en vigencia la Ley N° 32069?",
+    "¿Cuáles son los procedimientos de selección vigentes en 2026?",
+    "Calcula la penalidad por 10 días de retraso en un contrato de S/ 500,000 a 60 días",
+    "¿Qué pasa si el contratista incumple el cronograma de obra?",
+    "¿Puedo ser proveedor si soy cuñado del alcalde?"
+]
+
+PASAJES_SIMULADOS = [
+    "Artículo 34. Las entidades pueden ordenar la ejecución de prestaciones adicionales hasta por el 25% del monto del contrato original.",
+    "Artículo 120. En caso de retraso injustificado se aplica una penalidad por cada día de atraso, hasta un monto máximo del 10% del monto vigente.",
+    "Artículo 2. Principios: Libertad de concurrencia, Igualdad de trato, Transparencia, Publicidad, Competencia, Eficacia y Eficiencia."
+]
+
+
+def cargar_preguntas(path: str = PREGUNTAS_PATH) -> List[str]:
+    """Preguntas numeradas del banco de entrenamiento (líneas '1. ¿...?')"""
+    if not os.path.exists(path):
+        return list(PREGUNTAS_RESPALDO)
+    with open(path, encoding="utf-8") as f:
+        preguntas = [m.group(1).strip() for m in re.finditer(r"^\s*\d+\.\s+(.+)$", f.read(), re.MULTILINE)]
+    return preguntas or list(PREGUNTAS_RESPALDO)
+
+
+# =============================================================================
+# DOBLES LOCALES DE GEMINI Y EMBEDDINGS
+# =============================================================================
+
+class LatenciaSimulada:
+    """Latencia base ± jitter (ms) y tasa de error configurables"""
+
+    def __init__(self, base_ms: float, jitter_ms: float = 0.0, error_rate: float = 0.0, seed: Optional[int] = None):
+        self.base_ms = base_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def esperar(self):
+        with self._lock:
+            ms = max(0.0, self.base_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms))
+            falla = self._random.random() < self.error_rate
+        time.sleep(ms / 1000)
+        if falla:
+            raise RuntimeError("429 Resource has been exhausted (e.g. check quota).")
+
+
+class _UsoSimulado:
+    def __init__(self, prompt_tokens: int, respuesta_tokens: int):
+        self.prompt_token_count = prompt_tokens
+        self.candidates_token_count = respuesta_tokens
+
+
+class _RespuestaSimulada:
+    def __init__(self, text: str, prompt_tokens: int):
+        self.text = text
+        self.usage_metadata = _UsoSimulado(prompt_tokens, len(text) // 4)
+
+
+class GeminiSimulado:
+    """Sustituto de google.generativeai para LLMClientManager"""
+
+    latencia = LatenciaSimulada(0)
+
+    class GenerativeModel:
+        def __init__(self, model_name: str, system_instruction: Optional[str] = None):
+            self.model_name = model_name
+            self.system_instruction = system_instruction or ""
+
+        def generate_content(self, contents):
+            GeminiSimulado.latencia.esperar()
+            prompt = contents if isinstance(contents, str) else " ".join(p["parts"][0] for p in contents)
+            tokens = (len(self.system_instruction) + len(prompt)) // 4
+            if isinstance(contents, str) and "JSON" in contents:
+                # Análisis de PDF: el procesador espera un objeto JSON
+                texto = json.dumps({
+                    "numero_proceso": "LP-SM-1-2026",
+                    "requisitos_calificacion": [],
+                    "factores_evaluacion": [{"nombre": "Precio", "puntaje_maximo": 100}],
+                    "posibles_vicios": []
+                })
+            else:
+                texto = "Respuesta simulada. " + PASAJES_SIMULADOS[len(prompt) % len(PASAJES_SIMULADOS)]
+            return _RespuestaSimulada(texto, tokens)
+
+        def start_chat(self, history=None):
+            raise NotImplementedError("El motor conversacional no usa sesiones de chat de Gemini")
+
+
+def crear_rag_simulado(latencia_embedding: LatenciaSimulada, latencia_busqueda: LatenciaSimulada):
+    """RagEngine con embedding y búsqueda vectorial simulados (conserva single-flight y lotes reales)"""
+    from engine.metrics import metrics
+    from engine.rag_engine import RagEngine
+    from engine.singleflight import SingleFlight
+
+    class EmbeddingsSimulados:
+        """Una espera por llamada, sea de una consulta o de un lote"""
+
+        def embed_query(self, text: str) -> List[float]:
+            latencia_embedding.esperar()
+            return [0.0]
+
+        def embed_documents(self, texts: List[str]) -> List[List[float]]:
+            latencia_embedding.esperar()
+            return [[0.0] for _ in texts]
+
+    class RagSimulado(RagEngine):
+        def __init__(self):
+            self.embeddings = EmbeddingsSimulados()
+            self.context_version = 0
+            self._search_flight = SingleFlight("rag_search")
+            self._query_embeddings = self.embeddings
+
+        def _buscar_por_vector(self, query: str, query_vector: List[float], k: int) -> List[str]:
+            with metrics.timer("vector_search"):
+                latencia_busqueda.esperar()
+            return PASAJES_SIMULADOS[:k]
+
+    return RagSimulado()
+
+
+def instalar_dobles(args):
+    """Reemplaza Gemini y el RAG de la app por los dobles locales"""
+    from engine.llm_client import LLMClientManager, set_llm_client
+    from engine.conversation import ConversationEngine
+    import app
+
+    GeminiSimulado.latencia = LatenciaSimulada(args.llm_latency_ms, args.llm_jitter_ms, args.llm_error_rate, args.seed)
+    manager = LLMClientManager(api_key="simulado")
+    manager._genai = GeminiSimulado
+    set_llm_client(manager)
+
+    embedding = LatenciaSimulada(args.embedding_latency_ms, args.embedding_latency_ms / 4, seed=args.seed)
+    busqueda = LatenciaSimulada(args.vector_latency_ms, args.vector_latency_ms / 4, seed=args.seed)
+    app.engines.register(
+        'conversation',
+        lambda: ConversationEngine(llm=manager, rag_engine=crear_rag_simulado(embedding, busqueda))
+    )
+    return app.app
+
+
+def levantar_servidor(flask_app):
+    """Servidor werkzeug con hilos en un puerto libre (un solo worker)"""
+    from werkzeug.serving import make_server
+
+    # El log por petición de werkzeug distorsiona la medición
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    servidor = make_server("127.0.0.1", 0, flask_app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, name="load-test-server", daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_port}"
+
+
+# =============================================================================
+# CARGA DE TRABAJO
+# =============================================================================
+
+def generar_pdf_bases() -> bytes:
+    """PDF pequeño con estructura de bases (requisitos, factores, valor referencial)"""
+    import fitz
+
+    doc = fitz.open()
+    secciones = [
+        "BASES INTEGRADAS\nLICITACIÓN PÚBLICA N° 001-2026-MUNI\nValor referencial: S/ 1,250,000.00",
+        "CAPÍTULO III\nREQUISITOS DE CALIFICACIÓN\nExperiencia del postor: monto facturado acumulado "
+        "equivalente a S/ 2,500,000.00 en los últimos 8 años.",
+        "FACTORES DE EVALUACIÓN\nPrecio: 100 puntos\nPenalidad por mora: 10% del monto vigente."
+    ]
+    for texto in secciones:
+        pagina = doc.new_page()
+        pagina.insert_text((72, 72), texto, fontsize=11)
+    contenido = doc.tobytes()
+    doc.close()
+    return contenido
+
+
+class Carga:
+    """Genera la petición de cada tipo de la mezcla"""
+
+    def __init__(self, preguntas: List[str], pdf: bytes, seed: Optional[int] = None):
+        self.preguntas = preguntas
+        self.pdf = pdf
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _elegir(self, opciones):
+        with self._lock:
+            return self._random.choice(opciones)
+
+    def peticion(self, tipo: str, usuario: int) -> Dict:
+        if tipo == "chat":
+            return {"method": "POST", "path": "/api/chat",
+                    "json": {"message": self._elegir(self.preguntas), "session_id": f"carga-{usuario}"}}
+        if tipo == "calculate":
+            return {"method": "POST", "path": "/api/calculate",
+                    "json": {"monto": self._elegir([50000, 350000, 2500000, 9000000]),
+                             "tipo": self._elegir(["bienes", "servicios", "obras"])}}
+        if tipo == "plazos":
+            return {"method": "POST", "path": "/api/plazos/calcular",
+                    "json": {"fecha_inicio": "2026-03-02", "dias": self._elegir([5, 8, 15, 30]),
+                             "tipo_dias": self._elegir(["habiles", "calendario"])}}
+        if tipo == "pdf":
+            return {"method": "POST", "path": "/api/pdf/upload",
+                    "files": {"file": ("bases_carga.pdf", self.pdf, "application/pdf")}}
+        raise ValueError(f"Tipo de petición desconocido: {tipo}")
+
+
+def parsear_mezcla(texto: str) -> Dict[str, float]:
+    """'chat=6,calculate=2' -> {'chat': 6.0, 'calculate': 2.0}"""
+    mezcla = {}
+    for parte in texto.split(","):
+        nombre, _, peso = parte.partition("=")
+        mezcla[nombre.strip()] = float(peso or 1)
+    return mezcla
+
+
+def percentil(valores: List[float], q: float) -> float:
+    """Percentil nearest-rank (mismo criterio que engine.metrics)"""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[max(0, math.ceil(q * len(ordenados)) - 1)]
+
+
+def esperar_trabajo(http, url: str, limite: float, intervalo: float = 0.1) -> Dict:
+    """
+    Consulta un trabajo de /api/pdf/upload hasta que termina
+
+    Returns:
+        Estado final del trabajo (completado o error), o {"error": ...} si
+        el servidor ya no lo encuentra
+    """
+    while True:
+        respuesta = http.get(url, timeout=max(1.0, limite - time.perf_counter()))
+        trabajo = respuesta.json() or {}
+        if respuesta.status_code >= 400 or trabajo.get("estado") in ("completado", "error"):
+            return trabajo
+        if time.perf_counter() >= limite:
+            raise TimeoutError(f"el trabajo {trabajo.get('id')} sigue en la etapa {trabajo.get('etapa')}")
+        time.sleep(intervalo)
+
+
+def ejecutar_carga(base_url: str, mezcla: Dict[str, float], concurrencia: int, total: int,
+                   carga: Carga, timeout: float = 120.0, seed: Optional[int] = None,
+                   intervalo_trabajos: float = 0.1) -> Dict:
+    """
+    Lanza `total` peticiones repartidas según `mezcla` con `concurrencia` usuarios
+
+    Una respuesta 202 con un trabajo en segundo plano (subida de PDF) se
+    consulta cada `intervalo_trabajos` segundos hasta que termina: la
+    latencia es la del análisis completo y en "aceptacion" queda la de la
+    respuesta 202.
+
+    Returns:
+        Dict con duración total y, por tipo, latencias (s) y errores
+    """
+    import requests
+
+    azar = random.Random(seed)
+    tipos = azar.choices(list(mezcla), weights=list(mezcla.values()), k=total)
+    resultados = {tipo: {"latencias": [], "aceptacion": [], "errores": 0, "codigos": {}} for tipo in mezcla}
+    lock = threading.Lock()
+    sesiones = threading.local()
+
+    def enviar(indice: int):
+        tipo = tipos[indice]
+        if not hasattr(sesiones, "http"):
+            sesiones.http = requests.Session()
+        peticion = carga.peticion(tipo, indice % concurrencia)
+        inicio = time.perf_counter()
+        aceptacion = None
+        try:
+            respuesta = sesiones.http.request(peticion["method"], base_url + peticion["path"],
+                                              json=peticion.get("json"), files=peticion.get("files"),
+                                              timeout=timeout)
+            codigo = respuesta.status_code
+            cuerpo = respuesta.json() or {}
+            if codigo == 202 and "url" in cuerpo:
+                aceptacion = time.perf_counter() - inicio
+                cuerpo = esperar_trabajo(sesiones.http, base_url + cuerpo["url"], inicio + timeout,
+                                         intervalo_trabajos)
+            # Los trabajos siempre traen "error" (None si terminaron bien)
+            error = codigo >= 400 or bool(cuerpo.get("error"))
+        except Exception as e:
+            codigo = type(e).__name__
+            error = True
+        duracion = time.perf_counter() - inicio
+        with lock:
+            datos = resultados[tipo]
+            datos["latencias"].append(duracion)
+            if aceptacion is not None:
+                datos["aceptacion"].append(aceptacion)
+            datos["errores"] += int(error)
+            datos["codigos"][str(codigo)] = datos["codigos"].get(str(codigo), 0) + 1
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia, thread_name_prefix="carga") as pool:
+        list(pool.map(enviar, range(total)))
+    return {"duracion_s": time.perf_counter() - inicio, "por_tipo": resultados}
+
+
+def obtener_contadores(base_url: str) -> Dict:
+    """Contadores del servidor (respuestas degradadas, llamadas coalescidas, tokens)"""
+    import requests
+
+    try:
+        return requests.get(base_url + "/api/metrics", params={"format": "json"}, timeout=10).json()["contadores"]
+    except Exception:
+        return {}
+
+
+def resumir(resultado: Dict) -> Dict:
+    """Throughput, tasa de error y percentiles (ms) por tipo y global"""
+    duracion = resultado["duracion_s"]
+    resumen = {"duracion_s": round(duracion, 2), "endpoints": {}}
+    todas = []
+    errores = 0
+    for tipo, datos in resultado["por_tipo"].items():
+        latencias = datos["latencias"]
+        if not latencias:
+            continue
+        todas.extend(latencias)
+        errores += datos["errores"]
+        resumen["endpoints"][tipo] = {
+            "peticiones": len(latencias),
+            "errores": datos["errores"],
+            "tasa_error": round(datos["errores"] / len(latencias), 4),
+            "rps": round(len(latencias) / duracion, 2),
+            "p50_ms": round(percentil(latencias, 0.5) * 1000, 1),
+            "p95_ms": round(percentil(latencias, 0.95) * 1000, 1),
+            "p99_ms": round(percentil(latencias, 0.99) * 1000, 1),
+            "max_ms": round(max(latencias) * 1000, 1),
+            "codigos": datos["codigos"]
+        }
+        if datos["aceptacion"]:
+            resumen["endpoints"][tipo]["aceptacion_p50_ms"] = round(percentil(datos["aceptacion"], 0.5) * 1000, 1)
+            resumen["endpoints"][tipo]["aceptacion_p95_ms"] = round(percentil(datos["aceptacion"], 0.95) * 1000, 1)
+    resumen["total"] = {
+        "peticiones": len(todas),
+        "errores": errores,
+        "tasa_error": round(errores / len(todas), 4) if todas else 0.0,
+        "rps": round(len(todas) / duracion, 2) if duracion else 0.0,
+        "p50_ms": round(percentil(todas, 0.5) * 1000, 1),
+        "p95_ms": round(percentil(todas, 0.95) * 1000, 1),
+        "p99_ms": round(percentil(todas, 0.99) * 1000, 1),
+        "max_ms": round(max(todas) * 1000, 1) if todas else 0.0
+    }
+    return resumen
+
+
+def imprimir_resumen(resumen: Dict, args):
+    print(f"\n📈 PRUEBA DE CARGA — {resumen['total']['peticiones']} peticiones, "
+          f"concurrencia {args.concurrency}, {resumen['duracion_s']}s")
+    if not args.url:
+        print(f"   Gemini simulado: {args.llm_latency_ms:g}±{args.llm_jitter_ms:g}ms "
+              f"(error {args.llm_error_rate:.0%}) | embedding {args.embedding_latency_ms:g}ms | "
+              f"búsqueda {args.vector_latency_ms:g}ms")
+    print("=" * 86)
+    print(f"{'endpoint':<12}{'peticiones':>11}{'error %':>9}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    print("-" * 86)
+    for tipo, fila in list(resumen["endpoints"].items()) + [("TOTAL", resumen["total"])]:
+        print(f"{tipo:<12}{fila['peticiones']:>11}{fila['tasa_error'] * 100:>8.1f}%{fila['rps']:>9.2f}"
+              f"{fila['p50_ms']:>10.1f}{fila['p95_ms']:>10.1f}{fila['p99_ms']:>10.1f}{fila['max_ms']:>10.1f}")
+    for tipo, fila in resumen["endpoints"].items():
+        if "aceptacion_p50_ms" in fila:
+            print(f"   {tipo}: latencia hasta terminar el trabajo; la subida (202) tardó "
+                  f"p50 {fila['aceptacion_p50_ms']:.1f} ms, p95 {fila['aceptacion_p95_ms']:.1f} ms")
+    if resumen.get("contadores_servidor"):
+        print("\n🔢 Contadores del servidor:")
+        for nombre, valores in resumen["contadores_servidor"].items():
+            print(f"   {nombre}: " + ", ".join(f"{k}={v:g}" for k, v in valores.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API con Gemini simulado")
+    parser.add_argument("--concurrency", type=int, default=8, help="Usuarios concurrentes")
+    parser.add_argument("--requests", type=int, default=200, help="Peticiones totales")
+    parser.add_argument("--mix", default="chat=6,calculate=2,plazos=1,pdf=1", help="Pesos por tipo de petición")
+    parser.add_argument("--llm-latency-ms", type=float, default=800)
+    parser.add_argument("--llm-jitter-ms", type=float, default=200)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--embedding-latency-ms", type=float, default=80)
+    parser.add_argument("--vector-latency-ms", type=float, default=20)
+    parser.add_argument("--pdf-poll-ms", type=float, default=100,
+                        help="Intervalo de consulta de los trabajos de PDF hasta que terminan")
+    parser.add_argument("--seed", type=int, default=None, help="Semilla para reproducir la secuencia")
+    parser.add_argument("--url", default=None, help="Servidor ya levantado (no usa los dobles)")
+    parser.add_argument("--json", action="store_true", help="Imprime el resumen en JSON")
+    args = parser.parse_args()
+
+    servidor = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+    else:
+        os.environ["PREWARM_ENGINES"] = "false"
+        sys.path.insert(0, BASE_DIR)
+        servidor, base_url = levantar_servidor(instalar_dobles(args))
+
+    try:
+        carga = Carga(cargar_preguntas(), generar_pdf_bases(), args.seed)
+        resultado = ejecutar_carga(base_url, parsear_mezcla(args.mix), args.concurrency,
+                                   args.requests, carga, seed=args.seed,
+                                   intervalo_trabajos=args.pdf_poll_ms / 1000)
+        contadores = obtener_contadores(base_url)
+    finally:
+        if servidor is not None:
+            servidor.shutdown()
+
+    resumen = resumir(resultado)
+    resumen["contadores_servidor"] = contadores
+    if args.json:
+        print(json.dumps(resumen, ensure_ascii=False, indent=2))
+    else:
+        imprimir_resumen(resumen, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -375,7 +375,12 @@ async function uploadAndAnalyze() {
             body: formData
         });
 
-        const data = await response.json();
+        let data = await response.json();
+
+        // /api/pdf/upload encola el análisis: consultar el trabajo hasta que termine
+        if (response.status === 202 && data.trabajo_id) {
+            data = await waitForPdfJob(data.url, resultDiv, analyzeBtn);
+        }
 
         if (data.error) {
             resultDiv.innerHTML = `<p style="color: #ef4444;">❌ ${data.error}</p>`;
@@ -425,6 +430,39 @@ async function uploadAndAnalyze() {
     }
 }
 
+/**
+ * Consulta un trabajo de análisis de PDF hasta que termine
+ * Mientras Gemini responde, muestra los datos y vicios detectados por reglas
+ */
+async function waitForPdfJob(url, resultDiv, analyzeBtn) {
+    while (true) {
+        const response = await fetch(`${API_URL}${url}`);
+        const trabajo = await response.json();
+
+        if (!response.ok || trabajo.estado === 'error') {
+            return { error: trabajo.error || 'El análisis no pudo completarse' };
+        }
+        if (trabajo.estado === 'completado') {
+            return trabajo.resultado;
+        }
+
+        analyzeBtn.textContent = `⏳ Analizando... ${trabajo.progreso}%`;
+        const vicios = trabajo.parcial.vicios_reglas;
+        if (vicios) {
+            let html = `<p>⏳ Análisis con IA en curso (${trabajo.progreso}%)...</p>`;
+            html += `<h4>⚠️ Detectado por reglas (${vicios.length}):</h4>`;
+            vicios.forEach(v => {
+                const pagina = v.ubicacion && v.ubicacion.pagina ? ` (pág. ${v.ubicacion.pagina})` : '';
+                html += `<p>• <strong>[${v.severidad}]</strong> ${v.detalle}${pagina}</p>`;
+            });
+            resultDiv.innerHTML = html;
+            resultDiv.classList.add('active');
+        }
+
+        await new Promise(resolve => setTimeout(resolve, 1500));
+    }
+}
+
 // Cerrar modal de PDF al hacer clic fuera
 document.getElementById('pdfUploadModal')?.addEventListener('click', function (e) {
     if (e.target === this) {
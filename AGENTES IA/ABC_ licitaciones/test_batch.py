@@ -0,0 +1,67 @@
+import threading
+
+from engine.batch import BatchProcessor
+
+class FakeRag:
+    def __init__(self):
+        self.lotes = []
+
+    def search_many(self, queries, k=3):
+        self.lotes.append(list(queries))
+        return [[f"fragmento de {q}"] for q in queries]
+
+class FakeEngine:
+    def __init__(self):
+        self.rag_engine = FakeRag()
+        self.sesiones = set()
+        self._local = threading.local()
+
+    def process(self, message, session_id, rag_results=None):
+        assert rag_results == [f"fragmento de {message}"]
+        self.sesiones.add(session_id)
+        self._local.capa = "gemini_rag"
+        return f"respuesta a {message}"
+
+    def get_last_layer(self):
+        return self._local.capa
+
+    def get_last_usage(self):
+        return None
+
+    def clear_session(self, session_id):
+        self.sesiones.discard(session_id)
+
+def router(pregunta):
+    if pregunta.startswith("calcula"):
+        return "calculation", "resultado del cálculo"
+    return None
+
+def test_batch_routes_and_shares_embeddings():
+    engine = FakeEngine()
+    procesador = BatchProcessor(router, lambda: engine, max_workers=3, embedding_batch_size=4)
+    preguntas = ["calcula el monto", ""] + [f"consulta abierta {i}" for i in range(6)]
+
+    resultados = sorted(procesador.run(preguntas), key=lambda r: r["indice"])
+
+    assert [r["indice"] for r in resultados] == list(range(len(preguntas)))
+    assert resultados[0]["capa"] == "calculation"
+    assert resultados[1]["capa"] == "error"
+    assert all(r["capa"] == "gemini_rag" for r in resultados[2:])
+    assert all("latencia_ms" in r for r in resultados)
+    # 6 preguntas abiertas -> 2 lotes de embeddings (4 + 2), sesiones descartadas
+    assert [len(lote) for lote in engine.rag_engine.lotes] == [4, 2]
+    assert engine.sesiones == set()
+
+def test_batch_without_engine():
+    procesador = BatchProcessor(router, lambda: None)
+    resultados = list(procesador.run(["consulta abierta"]))
+    assert resultados[0]["capa"] == "error"
+
+    # Modo limitado: las fichas locales responden lo que pueden
+    procesador = BatchProcessor(router, lambda: None, sin_motor=lambda p: ("ficha", f"info: {p}"))
+    resultados = list(procesador.run(["consulta abierta"]))
+    assert (resultados[0]["capa"], resultados[0]["respuesta"]) == ("ficha", "info: consulta abierta")
+
+if __name__ == "__main__":
+    test_batch_routes_and_shares_embeddings()
+    test_batch_without_engine()
@@ -0,0 +1,83 @@
+import csv
+import json
+import os
+import tempfile
+
+from engine.catalogo import OPINIONES, RESOLUCIONES, CatalogoStore, cargar_carpeta, sembrar
+from engine.opiniones import OpinionesOECE
+from engine.search_index import SearchIndex
+from engine.tribunal import TribunalContrataciones
+
+def _escribir_opiniones(path, cantidad):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(cantidad):
+            f.write(json.dumps({"numero": f"D{i:06d}-2024-OECE-DTN", "fecha": f"2024-01-{i % 28 + 1:02d}",
+                                "tema": f"Consulta {i} sobre penalidad por mora", "resumen": "Cálculo de penalidades",
+                                "palabras_clave": ["penalidad"]}, ensure_ascii=False) + "\n")
+
+def test_incremental_load_and_lazy_queries():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "catalogos.sqlite3")
+        carpeta = os.path.join(tmp, "opiniones")
+        os.mkdir(carpeta)
+        _escribir_opiniones(os.path.join(carpeta, "2024.jsonl"), 500)
+        with open(os.path.join(carpeta, "extra.csv"), "w", encoding="utf-8", newline="") as f:
+            escritor = csv.DictWriter(f, ["numero", "fecha", "tema", "resumen", "palabras_clave"])
+            escritor.writeheader()
+            escritor.writerow({"numero": "D000900-2024-OECE-DTN", "fecha": "2024-06-01",
+                               "tema": "Subcontratación en obras", "resumen": "Límites de subcontratación",
+                               "palabras_clave": "subcontratación; obras"})
+
+        sembrar(db, OpinionesOECE.OPINIONES_2026, OPINIONES)
+        assert cargar_carpeta(db, carpeta, OPINIONES)["nuevos"] == 2
+        assert cargar_carpeta(db, carpeta, OPINIONES)["sin_cambios"] == 2
+
+        _escribir_opiniones(os.path.join(carpeta, "2024.jsonl"), 300)
+        assert cargar_carpeta(db, carpeta, OPINIONES)["actualizados"] == 1
+        assert CatalogoStore(db, OPINIONES).contar() == 300 + 1 + len(OpinionesOECE.OPINIONES_2026)
+
+        opiniones = OpinionesOECE(catalogo_path=db)
+        assert isinstance(opiniones.indice, CatalogoStore)
+        assert opiniones.buscar("penalidad por mora", pagina=2, por_pagina=10)["total"] == 300
+        assert opiniones.buscar_opinion("subcontratación en obras")[0]["palabras_clave"] == ["subcontratación", "obras"]
+        assert opiniones.obtener_opinion_por_numero("D000001-2026")["fecha"] == "2026-01-03"
+        assert opiniones.obtener_opinion_por_numero("12-2024-OECE-DTN")["numero"] == "D000012-2024-OECE-DTN"
+        assert [d["numero"] for d in opiniones.autocompletar_numero("D00029", limite=2)] == [
+            "D000029-2024-OECE-DTN", "D000290-2024-OECE-DTN"]
+
+        os.remove(os.path.join(carpeta, "extra.csv"))
+        assert cargar_carpeta(db, carpeta, OPINIONES)["eliminados"] == 1
+        assert opiniones.buscar_opinion("subcontratación en obras") == []
+        opiniones.indice.cerrar()
+
+        # Sin resoluciones cargadas, el Tribunal sigue con su lista incorporada
+        tribunal = TribunalContrataciones(catalogo_path=db)
+        assert isinstance(tribunal.indice, SearchIndex)
+        assert not CatalogoStore(db, RESOLUCIONES).disponible()
+
+def test_loading_a_second_folder_keeps_the_first():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "catalogos.sqlite3")
+        primera, segunda = os.path.join(tmp, "2024"), os.path.join(tmp, "2025")
+        os.mkdir(primera)
+        os.mkdir(segunda)
+        _escribir_opiniones(os.path.join(primera, "opiniones.jsonl"), 20)
+        with open(os.path.join(segunda, "opiniones.jsonl"), "w", encoding="utf-8") as f:
+            f.write(json.dumps({"numero": "D000001-2025-OECE-DTN", "fecha": "2025-02-01",
+                                "tema": "Subcontratación en obras", "resumen": "Límites"}) + "\n")
+
+        assert cargar_carpeta(db, primera, OPINIONES)["nuevos"] == 1
+        assert cargar_carpeta(db, segunda, OPINIONES)["eliminados"] == 0
+        assert cargar_carpeta(db, primera, OPINIONES)["sin_cambios"] == 1
+
+        catalogo = CatalogoStore(db, OPINIONES)
+        assert catalogo.contar() == 21
+        catalogo.cerrar()
+
+def test_autocomplete_endpoint_validates_limit():
+    import app
+
+    cliente = app.app.test_client()
+    assert cliente.get("/api/opiniones/autocompletar?q=D&limite=abc").status_code == 400
+    assert len(cliente.get("/api/opiniones/autocompletar?q=D&limite=-5").get_json()["sugerencias"]) == 1
+    assert len(cliente.get("/api/opiniones/autocompletar?q=D&limite=500").get_json()["sugerencias"]) <= 50
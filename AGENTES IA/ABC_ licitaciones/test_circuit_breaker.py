@@ -0,0 +1,109 @@
+import time
+
+from engine.circuit_breaker import (CircuitBreaker, CircuitOpenError, CallTimeoutError, CallQueueTimeoutError,
+                                    CERRADO, ABIERTO, SEMIABIERTO)
+
+class FakeClock:
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+def fallar():
+    raise RuntimeError("429 quota exceeded")
+
+def test_opens_after_failures_and_probes():
+    reloj = FakeClock()
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=10, call_timeout=None, clock=reloj)
+
+    for _ in range(2):
+        try:
+            breaker.call(fallar)
+        except RuntimeError:
+            pass
+    assert breaker.estado == ABIERTO
+
+    # Abierto: rechaza al instante sin llamar al servicio
+    llamadas = []
+    try:
+        breaker.call(lambda: llamadas.append(1))
+        assert False, "debió rechazar"
+    except CircuitOpenError:
+        pass
+    assert llamadas == []
+
+    # Vencido el tiempo, la prueba fallida reabre el circuito
+    reloj.ahora = 11
+    assert breaker.estado == SEMIABIERTO
+    try:
+        breaker.call(fallar)
+    except RuntimeError:
+        pass
+    assert breaker.estado == ABIERTO
+
+    # Y una prueba exitosa lo cierra
+    reloj.ahora = 22
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.estado == CERRADO
+    print(f"Status: {breaker.status()}")
+
+def test_timeout_counts_as_failure():
+    breaker = CircuitBreaker("test_timeout", failure_threshold=1, reset_timeout=60, call_timeout=0.05)
+
+    inicio = time.perf_counter()
+    try:
+        breaker.call(lambda: time.sleep(1))
+        assert False, "debió vencer el timeout"
+    except CallTimeoutError:
+        pass
+    assert time.perf_counter() - inicio < 0.5
+    assert breaker.estado == ABIERTO
+    assert breaker.status()["timeouts"] == 1
+
+def test_queued_calls_are_cancelled_and_timeout_starts_when_running():
+    import threading
+
+    breaker = CircuitBreaker("test_cola", failure_threshold=10, reset_timeout=60, call_timeout=0.2, max_workers=2)
+    ejecutadas = []
+    errores = []
+
+    def lenta(i):
+        ejecutadas.append(i)
+        time.sleep(0.5)
+
+    def llamar(i):
+        try:
+            breaker.call(lambda: lenta(i))
+        except CallTimeoutError as e:
+            errores.append(type(e))
+
+    hilos = [threading.Thread(target=llamar, args=(i,)) for i in range(5)]
+    for hilo in hilos:
+        hilo.start()
+        time.sleep(0.01)
+    for hilo in hilos:
+        hilo.join()
+    time.sleep(0.6)
+
+    # Dos llamadas vencen ejecutándose; las tres en cola se cancelan sin llegar al servicio
+    assert sorted(ejecutadas) == [0, 1]
+    assert errores.count(CallTimeoutError) == 2 and errores.count(CallQueueTimeoutError) == 3
+    status = breaker.status()
+    assert status["timeouts"] == 2 and status["canceladas_en_cola"] == 3 and status["fallos"] == 2
+
+    # Una llamada sana que esperó en la cola no vence por ese tiempo de espera
+    breaker = CircuitBreaker("test_cola_sana", failure_threshold=1, reset_timeout=60, call_timeout=0.3, max_workers=1)
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(breaker.call(lambda: time.sleep(0.2) or "ok")))
+             for _ in range(2)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert resultados == ["ok", "ok"] and breaker.estado == CERRADO
+
+if __name__ == "__main__":
+    test_opens_after_failures_and_probes()
+    test_timeout_counts_as_failure()
+    test_queued_calls_are_cancelled_and_timeout_starts_when_running()
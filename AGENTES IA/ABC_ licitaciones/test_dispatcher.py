@@ -0,0 +1,135 @@
+from engine.dispatcher import DeterministicDispatcher
+from engine.calculator import ProcurementCalculator
+from engine.penalties import PenaltiesCalculator
+from engine.impedimentos import ImpedimentosVerifier
+from engine.plazos import PlazosCalculator
+from engine.jprd_arbitraje import JPRDArbitraje
+
+def build_dispatcher():
+    return DeterministicDispatcher([
+        ('calculation', ProcurementCalculator().detect_and_calculate),
+        ('penalidades', PenaltiesCalculator().detect_and_calculate),
+        ('impedimentos', ImpedimentosVerifier().detect_and_verify),
+        ('jprd_arbitraje', JPRDArbitraje().detect_and_process),
+        ('plazos', PlazosCalculator().detect_and_calculate),
+    ])
+
+def test_dispatch_priority():
+    dispatcher = build_dispatcher()
+
+    test_cases = [
+        ("Calculame el procedimiento para 50000 soles", "calculation"),
+        ("Contrato de S/ 500,000 con plazo de 90 días y 15 días de atraso", "penalidades"),
+        ("Soy cuñado del alcalde, ¿puedo contratar?", "impedimentos"),
+        ("¿Cuándo es obligatoria la JPRD?", "jprd_arbitraje"),
+        ("Plazo para apelar si me notificaron el 15/01/2026", "plazos"),
+        ("¿Qué es el principio de valor por dinero?", None),
+    ]
+
+    print("Running Dispatcher Priority Tests...")
+    print("-" * 60)
+    failed = False
+
+    for message, expected in test_cases:
+        result = dispatcher.dispatch(message)
+        handler = result[0] if result else None
+
+        status = "PASS" if handler == expected else "FAIL"
+        if status == "FAIL":
+            failed = True
+
+        print(f"[{status}] '{message}'")
+        print(f"   Expected: {expected}, Got: {handler}")
+        print("-" * 60)
+
+    stats = dispatcher.get_stats()
+    print(f"Stats: {stats}")
+
+    # Cada consulta pasa por calculation; solo una acierta
+    if stats['calculation']['llamadas'] != len(test_cases) or stats['calculation']['aciertos'] != 1:
+        failed = True
+        print("[FAIL] Contadores de calculation incorrectos")
+
+    assert not failed, "Some dispatcher tests FAILED"
+
+def test_dispatch_handler_error():
+    def roto(message):
+        raise ValueError("boom")
+
+    dispatcher = DeterministicDispatcher([
+        ('roto', roto),
+        ('eco', lambda m: f"eco: {m}"),
+    ])
+
+    result = dispatcher.dispatch("hola")
+    stats = dispatcher.get_stats()
+
+    assert result == ('eco', 'eco: hola')
+    assert stats['roto']['errores'] == 1
+    assert stats['eco']['aciertos'] == 1
+
+# Preguntas conceptuales del banco de entrenamiento: las responden las
+# respuestas rápidas, el RAG o Gemini, no una ficha ni una calculadora
+CONCEPTUALES = [
+    "¿Qué requisitos deben tener las bases estándar?",
+    "¿Qué documentos conforman las bases de un procedimiento?",
+    "¿Qué son los factores de evaluación?",
+    "¿Cuáles son los 15 principios de las contrataciones públicas?",
+    "¿Desde cuándo están vigentes las modificaciones del D.S. 001-2026-EF?",
+    "¿Cuál es el valor de la UIT para 2026?",
+    "¿Cuáles son las penalidades en la ejecución contractual?",
+    "¿Cuántos días tengo para apelar?",
+    "¿Quiénes están impedidos de contratar con el Estado?",
+    "¿Qué son las prestaciones adicionales?",
+    "¿Qué son las ampliaciones de plazo?",
+    "¿Cuándo es obligatorio el arbitraje?",
+    "¿Qué consecuencias tiene que un laudo arbitral sea declarado nulo?",
+]
+
+def test_chat_dispatcher_only_answers_computations():
+    import app
+
+    dispatcher = app._crear_local_dispatcher()
+    for message in CONCEPTUALES:
+        assert dispatcher.dispatch(message) is None, message
+
+    casos = [
+        ("¿Qué procedimiento uso para contratar una obra de S/ 3,000,000?", "calculation"),
+        ("Tengo un contrato de S/ 500,000 con plazo de 90 días y 15 días de atraso", "penalidades"),
+        ("Adicional de obra de 18% sobre un contrato de S/ 2,000,000", "adicionales"),
+        ("Soy cuñado del alcalde, ¿puedo participar?", "impedimentos"),
+        ("Plazo para apelar si me notificaron el 15/01/2026", "plazos"),
+    ]
+    for message, esperado in casos:
+        assert dispatcher.dispatch(message)[0] == esperado, message
+
+def test_info_cards_match_whole_words_and_cover_every_module():
+    import app
+
+    fichas = app._crear_fichas_dispatcher()
+    casos = [
+        ("Calculame el procedimiento para 50000 soles", "calculation"),
+        ("¿Cómo se calcula la penalidad por mora?", "penalidades"),
+        ("¿Qué son las prestaciones adicionales?", "adicionales"),
+        ("¿Quiénes están impedidos de contratar?", "impedimentos"),
+        ("¿Cuándo hay nulidad por documento falso?", "nulidad"),
+        ("¿Cuándo es obligatoria la JPRD?", "jprd_arbitraje"),
+        ("¿Cómo se solicita una ampliación de plazo?", "ampliaciones"),
+        ("¿Cuáles son los plazos del procedimiento?", "plazos"),
+        ("Me descalificaron, ¿puedo apelar?", "apelaciones"),
+        ("¿Está bien calculado mi puntaje?", "evaluador"),
+        ("¿Cómo formulo una observación por vicios?", "observaciones"),
+        # Antes: "bases" + "que" dentro de "requisitos" → ficha de observaciones
+        ("¿Qué requisitos deben tener las bases estándar?", None),
+        ("Necesito el precio unitario del recursero", None),
+    ]
+    for message, esperado in casos:
+        resultado = fichas.dispatch(message)
+        assert (resultado[0] if resultado else None) == esperado, message
+    assert set(fichas.get_stats()) == {esperado for _, esperado in casos if esperado}
+
+if __name__ == "__main__":
+    test_dispatch_priority()
+    test_dispatch_handler_error()
+    test_chat_dispatcher_only_answers_computations()
+    test_info_cards_match_whole_words_and_cover_every_module()
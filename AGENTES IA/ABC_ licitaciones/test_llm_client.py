@@ -0,0 +1,49 @@
+from engine.llm_client import LLMClientManager
+
+class FakeModel:
+    def __init__(self, model_name, system_instruction=None):
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+
+    def start_chat(self, history):
+        return {"model": self, "history": history}
+
+class FakeGenai:
+    GenerativeModel = FakeModel
+
+def build_manager(max_models=16):
+    manager = LLMClientManager(api_key="test", max_models=max_models)
+    # Evita configurar el cliente real: el gestor usa este módulo ya "configurado"
+    manager._genai = FakeGenai
+    return manager
+
+def test_models_are_reused():
+    manager = build_manager()
+
+    a = manager.get_model("gemini-2.0-flash")
+    b = manager.get_model("gemini-2.0-flash")
+    c = manager.get_model("gemini-2.0-flash", system_instruction="Eres INKABOT")
+    chat = manager.start_chat("gemini-2.0-flash", system_instruction="Eres INKABOT")
+
+    stats = manager.get_stats()
+    print(f"Stats: {stats}")
+
+    assert a is b
+    assert c is not a
+    assert chat["model"] is c
+    assert stats["modelos_creados"] == 2
+    assert stats["modelos_reutilizados"] == 2
+
+def test_model_cache_is_bounded():
+    manager = build_manager(max_models=2)
+
+    primero = manager.get_model("m1")
+    manager.get_model("m2")
+    manager.get_model("m3")
+
+    assert manager.get_stats()["modelos_en_cache"] == 2
+    assert manager.get_model("m1") is not primero
+
+if __name__ == "__main__":
+    test_models_are_reused()
+    test_model_cache_is_bounded()
@@ -0,0 +1,36 @@
+from engine.metrics import MetricsRegistry
+
+def test_latency_quantiles():
+    registry = MetricsRegistry()
+    registry.set_endpoint("chat")
+
+    # 100 observaciones de 1ms a 100ms
+    for i in range(1, 101):
+        registry.observe("gemini", i / 1000)
+
+    snapshot = registry.snapshot()
+    gemini = snapshot["chat"]["gemini"]
+    print(f"Snapshot gemini: {gemini}")
+
+    assert gemini["count"] == 100
+    assert gemini["p50_ms"] == 50.0
+    assert gemini["p95_ms"] == 95.0
+    assert gemini["p99_ms"] == 99.0
+
+def test_prometheus_format():
+    registry = MetricsRegistry()
+
+    with registry.timer("quick_answer", endpoint="chat"):
+        pass
+    registry.observe("total", 0.25, endpoint="calculate")
+
+    texto = registry.render_prometheus()
+    print(texto)
+
+    assert "# TYPE inkabot_stage_latency_seconds summary" in texto
+    assert 'inkabot_stage_latency_seconds{endpoint="calculate",stage="total",quantile="0.99"} 0.250000' in texto
+    assert 'inkabot_stage_latency_seconds_count{endpoint="chat",stage="quick_answer"} 1' in texto
+
+if __name__ == "__main__":
+    test_latency_quantiles()
+    test_prometheus_format()
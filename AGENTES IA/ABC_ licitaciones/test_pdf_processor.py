@@ -0,0 +1,354 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import time
+
+import fitz
+
+from config import Config
+
+from engine.analysis_cache import AnalysisCache
+from engine.pdf_paginas import cerrar_pool, extraer_paginas
+from engine.pdf_processor import VERSION_PROMPTS, DocumentAnalyzer, PDFProcessor, combinar_analisis
+from engine.singleflight import SingleFlight
+from engine.texto import estimar_tokens
+from engine.uploads import FuentePDF
+
+def _crear_pdf(path, paginas):
+    doc = fitz.open()
+    for lineas in paginas:
+        pagina = doc.new_page()
+        pagina.insert_text((72, 72), "\n".join(lineas), fontsize=11)
+    doc.save(path)
+    doc.close()
+
+def _procesador():
+    # Sin gestor Gemini: solo se prueba la extracción
+    procesador = PDFProcessor.__new__(PDFProcessor)
+    procesador.llm = None
+    return procesador
+
+def test_single_pass_extraction():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bases.pdf")
+        _crear_pdf(path, [["BASES INTEGRADAS", "LICITACIÓN PÚBLICA N° 001-2026", "Valor referencial: S/ 100,000.00"],
+                          ["CUADRO COMPARATIVO", "POSTOR: ALFA SAC PRECIO: S/ 95,000.00"]])
+        extraccion = _procesador().extraer_documento(path)
+
+    assert extraccion["paginas"] == 2
+    assert extraccion["texto_completo"].startswith("BASES INTEGRADAS")
+    assert [p["pagina"] for p in extraccion["texto_por_pagina"]] == [1, 2]
+    assert extraccion["tablas"][0] == {"pagina": 1, "contenido": ["BASES INTEGRADAS", "LICITACIÓN PÚBLICA N° 001-2026",
+                                                                   "Valor referencial: S/ 100,000.00"]}
+    assert {b["pagina"] for b in extraccion["bloques"]} == {1, 2}
+
+def _analyzer(cache_dir, max_bytes=10_000_000):
+    analyzer = DocumentAnalyzer.__new__(DocumentAnalyzer)
+    analyzer.pdf_processor = _procesador()
+    analyzer.cache = AnalysisCache(cache_dir, max_bytes)
+    analyzer._ia_flight = SingleFlight("pdf_analisis")
+    return analyzer
+
+def test_analyzers_reuse_extraction():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cuadro.pdf")
+        _crear_pdf(path, [["CUADRO COMPARATIVO", "POSTOR: ALFA SAC PRECIO: S/ 95,000.00"]])
+        analyzer = _analyzer(os.path.join(tmp, "cache"), max_bytes=0)
+        extraccion = analyzer.extraer(path)
+
+    # El archivo ya no existe: el análisis usa la extracción compartida
+    resultado = analyzer.analizar_evaluacion(extraccion)
+    assert resultado["archivo"] == "cuadro.pdf"
+    assert resultado["precio_menor"] == 95000.0
+    assert "error" in analyzer.analizar_evaluacion(path)
+
+def test_reupload_hits_content_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        _crear_pdf(os.path.join(tmp, "bases.pdf"), [["BASES INTEGRADAS", "Valor referencial: S/ 100,000.00"]])
+        with open(os.path.join(tmp, "bases.pdf"), "rb") as f, open(os.path.join(tmp, "copia.pdf"), "wb") as g:
+            g.write(f.read())
+        analyzer = _analyzer(os.path.join(tmp, "cache"))
+        llamadas = []
+        analyzer.pdf_processor.analizar_documento_gemini_sync = (
+            lambda texto, tipo: llamadas.append(tipo) or {"numero_proceso": "LP 1-2026"})
+
+        primera = analyzer.extraer(os.path.join(tmp, "bases.pdf"))
+        analyzer.analizar_ia(primera, "bases")
+        # Mismo contenido con otro nombre: extracción y análisis salen de la caché
+        segunda = analyzer.extraer(os.path.join(tmp, "copia.pdf"))
+        assert analyzer.analizar_ia(segunda, "bases") == {"numero_proceso": "LP 1-2026"}
+        assert llamadas == ["bases"]
+        assert primera["cache"] == {"extraccion": False, "analisis_bases": False}
+        assert segunda["cache"] == {"extraccion": True, "analisis_bases": True}
+        assert segunda["archivo"] == "copia.pdf"
+
+def test_cache_evicts_least_recently_used():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = AnalysisCache(tmp, max_bytes=2500)
+        for i in range(5):
+            cache.set(f"{i:064d}", "extraccion", {"texto": "x" * 1000})
+        assert cache.status()["bytes"] <= 2500
+        assert cache.get(f"{4:064d}", "extraccion") is not None
+        assert cache.get(f"{0:064d}", "extraccion") is None
+
+def test_failed_cache_write_leaves_no_temporary_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = AnalysisCache(tmp, max_bytes=10_000)
+        cache.set("a" * 64, "extraccion", {"texto": object()})
+        assert cache.get("a" * 64, "extraccion") is None
+        assert [a for _, _, archivos in os.walk(tmp) for a in archivos] == []
+
+def test_upload_stays_in_memory_or_spills_to_disk():
+    with tempfile.TemporaryDirectory() as tmp:
+        _crear_pdf(os.path.join(tmp, "bases.pdf"), [["BASES INTEGRADAS", "Valor referencial: S/ 100,000.00"]])
+        with open(os.path.join(tmp, "bases.pdf"), "rb") as f:
+            datos = f.read()
+    sha = hashlib.sha256(datos).hexdigest()
+
+    with FuentePDF.desde_stream(io.BytesIO(datos), "bases.pdf", max_memoria=len(datos)) as fuente:
+        assert fuente.en_memoria and fuente.path is None
+        assert fuente.sha256() == sha
+        extraccion = _procesador().extraer_documento(fuente)
+        assert extraccion["archivo"] == "bases.pdf"
+        assert extraccion["texto_completo"].startswith("BASES INTEGRADAS")
+
+    with FuentePDF.desde_stream(io.BytesIO(datos), "grande.pdf", max_memoria=100, bloque=64) as fuente:
+        assert not fuente.en_memoria and os.path.exists(fuente.path)
+        assert fuente.sha256() == sha
+        assert _procesador().extraer_documento(fuente)["paginas"] == 1
+    # El archivo temporal se elimina al cerrar la fuente
+    assert not os.path.exists(fuente.path)
+
+def test_page_parallel_extraction_matches_serial():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "expediente.pdf")
+        _crear_pdf(path, [[f"SECCIÓN {i}", "POSTOR: ALFA SAC", f"PRECIO: S/ {i},000.00"] for i in range(1, 8)])
+        with open(path, "rb") as f:
+            datos = f.read()
+        try:
+            with fitz.open(path) as doc:
+                serial, modo_serial = extraer_paginas(doc, path, workers=1)
+                pequeno, modo_pequeno = extraer_paginas(doc, path, workers=2, min_paginas=50)
+                paralelo, modo_paralelo = extraer_paginas(doc, datos, workers=2, min_paginas=5)
+        finally:
+            cerrar_pool()
+
+    assert (modo_serial, modo_pequeno, modo_paralelo) == ("serial", "serial", "paralelo")
+    assert [p["pagina"] for p in paralelo] == list(range(1, 8))
+    assert paralelo == serial == pequeno
+
+def test_parallel_extraction_falls_back_to_serial_on_timeout(monkeypatch):
+    import engine.pdf_paginas as pdf_paginas
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "expediente.pdf")
+        _crear_pdf(path, [[f"SECCIÓN {i}"] for i in range(1, 6)])
+        with open(path, "rb") as f:
+            datos = f.read()
+        temporales = os.path.join(tmp, "temporales")
+        os.mkdir(temporales)
+        monkeypatch.setattr(tempfile, "tempdir", temporales)
+        monkeypatch.setattr(pdf_paginas, "SEGUNDOS_BASE", 0.0)
+        monkeypatch.setattr(pdf_paginas, "SEGUNDOS_POR_PAGINA", 0.0)
+        try:
+            with fitz.open(path) as doc:
+                paginas, modo = extraer_paginas(doc, datos, workers=2, min_paginas=5)
+        finally:
+            cerrar_pool()
+        # Los bytes van a un único archivo temporal, que se elimina aunque se agote el tiempo
+        assert os.listdir(temporales) == []
+
+    assert modo == "serial"
+    assert [p["pagina"] for p in paginas] == list(range(1, 6))
+
+def test_long_bases_are_analyzed_in_concurrent_blocks(monkeypatch):
+    from test_secciones import BASES
+
+    monkeypatch.setattr(Config, "PDF_PROMPT_MAX_TOKENS", 3500)
+    monkeypatch.setattr(Config, "PDF_MAP_MAX_BLOQUES", 4)
+    monkeypatch.setattr(Config, "PDF_MAP_WORKERS", 4)
+    en_curso = []
+    maximo = []
+    lock = threading.Lock()
+
+    def gemini(texto, tipo):
+        with lock:
+            en_curso.append(1)
+            maximo.append(len(en_curso))
+        time.sleep(0.2)
+        with lock:
+            en_curso.pop()
+        parcial = {"requisitos_calificacion": [], "factores_evaluacion": [], "posibles_vicios": []}
+        if "001-2026-MPL" in texto:
+            parcial["numero_proceso"] = "LP 001-2026-MPL"
+        if "S/ 15,000,000.00" in texto:
+            parcial["requisitos_calificacion"].append({"tipo": "experiencia_postor", "valor": "S/ 15,000,000.00"})
+            parcial["posibles_vicios"].append({"tipo": "experiencia_excesiva", "severidad": "ALTA"})
+        if "Precio 100" in texto:
+            parcial["factores_evaluacion"].append({"nombre": "Precio", "puntaje_maximo": 100})
+        return parcial
+
+    with tempfile.TemporaryDirectory() as tmp:
+        analyzer = _analyzer(os.path.join(tmp, "cache"))
+        analyzer.pdf_processor.analizar_documento_gemini_sync = gemini
+        inicio = time.perf_counter()
+        resultado = analyzer.analizar_ia({"texto_completo": BASES, "sha256": "0" * 64}, "bases")
+        duracion = time.perf_counter() - inicio
+
+    assert resultado["bloques"]["total"] > 1 and max(maximo) > 1
+    assert duracion < 0.2 * resultado["bloques"]["total"]
+    assert resultado["numero_proceso"] == "LP 001-2026-MPL"
+    assert resultado["requisitos_calificacion"] == [{"tipo": "experiencia_postor", "valor": "S/ 15,000,000.00"}]
+    assert resultado["factores_evaluacion"] == [{"nombre": "Precio", "puntaje_maximo": 100}]
+    assert resultado["posibles_vicios"][0]["tipo"] == "experiencia_excesiva"
+
+def test_typical_bases_pdf_is_analyzed_in_one_call():
+    # 60 páginas de bases estándar (~55k tokens) con los datos repartidos en todo el documento
+    lineas = ["Disposiciones generales aplicables a todos los procedimientos de selección del Estado."] * 44
+    paginas = [[f"Página {i + 1}"] + lineas for i in range(60)]
+    paginas[0][1:3] = ["BASES INTEGRADAS", "LICITACIÓN PÚBLICA N° 001-2026-MPL"]
+    paginas[30][1:3] = ["3.2 REQUISITOS DE CALIFICACIÓN", "Experiencia del postor: S/ 15,000,000.00"]
+    paginas[59][1:3] = ["CLÁUSULA DÉCIMA: PENALIDADES", "Penalidad diaria 0.10"]
+    prompts = []
+
+    def gemini(texto, tipo):
+        prompts.append(texto)
+        return {"numero_proceso": "LP 001-2026-MPL"}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bases.pdf")
+        _crear_pdf(path, paginas)
+        analyzer = _analyzer(os.path.join(tmp, "cache"))
+        analyzer.pdf_processor.analizar_documento_gemini_sync = gemini
+        extraccion = analyzer.extraer(path)
+        resultado = analyzer.analizar_ia(extraccion, "bases")
+
+    assert extraccion["paginas"] == 60 and estimar_tokens(extraccion["texto_completo"]) > 50000
+    assert resultado == {"numero_proceso": "LP 001-2026-MPL"}
+    assert prompts == [extraccion["texto_completo"]]
+
+def test_block_calls_go_through_the_gemini_circuit_breaker(monkeypatch):
+    from test_secciones import BASES
+    from engine.circuit_breaker import CircuitBreaker
+    from engine.llm_client import LLMClientManager
+
+    llamadas = []
+
+    class GeminiCaido:
+        def __init__(self, model_name, system_instruction=None):
+            pass
+
+        def generate_content(self, contents):
+            llamadas.append(contents)
+            raise RuntimeError("503 service unavailable")
+
+    class FakeGenai:
+        GenerativeModel = GeminiCaido
+
+    llm = LLMClientManager(api_key="test")
+    llm._genai = FakeGenai
+    llm.breaker = CircuitBreaker("gemini", failure_threshold=1, reset_timeout=60, call_timeout=None)
+    monkeypatch.setattr(Config, "PDF_PROMPT_MAX_TOKENS", 3500)
+    monkeypatch.setattr(Config, "PDF_MAP_MAX_BLOQUES", 4)
+    monkeypatch.setattr(Config, "PDF_MAP_WORKERS", 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        analyzer = _analyzer(os.path.join(tmp, "cache"))
+        analyzer.pdf_processor.llm = llm
+        resultado = analyzer.analizar_ia({"texto_completo": BASES, "sha256": "0" * 64}, "bases")
+        guardado = analyzer.cache.get("0" * 64, "ia_bases", VERSION_PROMPTS)
+
+    # El primer bloque abre el circuito; los demás fallan al instante sin llamar a Gemini
+    assert len(llamadas) == 1
+    assert resultado["error"] == "503 service unavailable"
+    assert analyzer.pdf_processor.analizar_documento_gemini_sync("texto", "vicios")["degradado"] == "circuito"
+    assert len(llamadas) == 1 and guardado is None
+
+def test_document_question_degrades_when_gemini_circuit_is_open(monkeypatch):
+    from engine import llm_client
+    from engine.circuit_breaker import CircuitBreaker
+
+    llm = llm_client.LLMClientManager(api_key="test")
+    llm.breaker = CircuitBreaker("gemini", failure_threshold=1, reset_timeout=60, call_timeout=None)
+    try:
+        llm.breaker.call(lambda: 1 / 0)
+    except ZeroDivisionError:
+        pass
+    monkeypatch.setattr(llm_client, "_manager", llm)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bases.pdf")
+        _crear_pdf(path, [["BASES INTEGRADAS", "Penalidad diaria 0.10"]])
+        analyzer = _analyzer(os.path.join(tmp, "cache"))
+        resultado = analyzer.responder_pregunta(path, "¿Qué penalidad se aplica?")
+        guardadas = [n for _, _, archivos in os.walk(os.path.join(tmp, "cache")) for n in archivos]
+
+    assert resultado["degradado"] == "circuito" and "abierto" in resultado["error"]
+    assert any(".extraccion." in nombre for nombre in guardadas)
+    assert not any(".chat_" in nombre for nombre in guardadas)
+
+def test_full_bases_analysis_runs_gemini_alongside_local_stages(monkeypatch):
+    from engine.observaciones import ObservacionesGenerator
+
+    etapas = []
+    reglas_original = ObservacionesGenerator.analizar_texto_bases
+
+    def gemini(self, extraccion, tipo):
+        time.sleep(0.4)
+        etapas.append("gemini")
+        return {"posibles_vicios": [{"tipo": "experiencia_excesiva", "severidad": "ALTA"}]}
+
+    def reglas(self, texto, paginas=None):
+        time.sleep(0.2)
+        return reglas_original(self, texto, paginas)
+
+    monkeypatch.setattr(DocumentAnalyzer, "analizar_ia", gemini)
+    monkeypatch.setattr(ObservacionesGenerator, "analizar_texto_bases", reglas)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bases.pdf")
+        _crear_pdf(path, [["BASES INTEGRADAS", "Plazo de entrega: 5 días calendario"]])
+        analyzer = _analyzer(os.path.join(tmp, "cache"), max_bytes=0)
+        inicio = time.perf_counter()
+        resultado = analyzer.analizar_bases_completo(path, lambda etapa, parcial: etapas.append(etapa))
+        duracion = time.perf_counter() - inicio
+
+    assert duracion < 0.55  # en serie: 0.6s
+    # Los vicios por reglas se publican antes de que responda Gemini
+    assert etapas == ["extraccion", "reglas", "gemini", "ia"]
+    tipos = {v["tipo"] for v in resultado["analisis_hibrido"]["vicios_detectados"]}
+    assert {"experiencia_excesiva", "plazo_muy_corto"} <= tipos
+
+def test_combined_analysis_keeps_first_values_and_flags_failed_blocks():
+    resultado = combinar_analisis([
+        {"numero_proceso": "", "valor_referencial": 0, "vicios": [{"tipo": "marca"}], "resumen": "Bloque 1."},
+        {"error": "timeout"},
+        {"numero_proceso": "AS 5-2026", "valor_referencial": 120000, "vicios": [{"tipo": "marca"}],
+         "procede_observacion": True, "resumen": "Bloque 3."},
+    ])
+    assert resultado["numero_proceso"] == "AS 5-2026" and resultado["valor_referencial"] == 120000
+    assert resultado["vicios"] == [{"tipo": "marca"}]
+    assert resultado["procede_observacion"] is True
+    assert resultado["resumen"] == "Bloque 1. Bloque 3."
+    assert resultado["bloques"] == {"total": 3, "con_error": 1}
+
+def test_regex_bank_extracts_bases_and_stays_linear_on_unmatched_labels():
+    texto = ("LP N° 001-2026-MPL\nVALOR REFERENCIAL: S/ 5,000,000.00\nPLAZO DE EJECUCIÓN: 180 DÍAS\n"
+             "REQUISITOS DE CALIFICACIÓN\nEXPERIENCIA DEL POSTOR: S/ 15,000,000.00 en obras similares\n"
+             "PERSONAL CLAVE: residente con 10 años\nFACTORES DE EVALUACIÓN\nFACTOR PRECIO: HASTA 100 PUNTOS\n")
+    datos = _procesador().extraer_datos_bases(texto)
+    assert datos["numero_proceso"] == "001-2026" and datos["valor_referencial"] == 5000000.0
+    assert datos["plazo_ejecucion"] == "180"
+    assert datos["requisitos_calificacion"] == [
+        {"tipo": "experiencia_postor", "monto": "15000000", "cantidad": None},
+        {"tipo": "experiencia_personal", "tiempo": "10"}]
+    assert datos["factores_evaluacion"] == [{"nombre": "Precio", "puntaje_maximo": 100}]
+
+    # Etiquetas sin valor en todo el documento: antes cada una recorría el resto del texto
+    relleno = ("EXPERIENCIA DEL POSTOR acreditada con contratos\nPOSTOR: EMPRESA DEL SUR SAC\n"
+               "FACTOR DE EVALUACION DE LA EXPERIENCIA EN LA ESPECIALIDAD\n" + "texto " * 100 + "\n") * 3000
+    inicio = time.perf_counter()
+    _procesador().extraer_datos_bases("REQUISITOS DE CALIFICACIÓN\n" + relleno)
+    _procesador().extraer_cuadro_evaluacion(relleno)
+    assert time.perf_counter() - inicio < 2
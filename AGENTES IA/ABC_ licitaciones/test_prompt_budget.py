@@ -0,0 +1,119 @@
+import threading
+import time
+
+from config import Config
+from engine.conversation import ConversationEngine, estimar_tokens
+from engine.singleflight import SingleFlight
+from engine.circuit_breaker import CircuitOpenError
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+class FakeLLM:
+    def __init__(self):
+        self.llamadas = []
+
+    def generate(self, contents, model_name=None, system_instruction=None):
+        self.llamadas.append((contents, system_instruction))
+        return FakeResponse(f"respuesta {len(self.llamadas)}")
+
+class FakeRag:
+    context_version = 0
+
+    def search(self, query, k=3):
+        return ["Artículo 1. " + "contexto " * 200]
+
+def build_engine():
+    # Motor sin Gemini ni Chroma reales: solo se prueba el armado del prompt
+    engine = ConversationEngine.__new__(ConversationEngine)
+    engine.llm = FakeLLM()
+    engine.rag_engine = FakeRag()
+    engine.tokens_sistema = estimar_tokens(engine.SYSTEM_PROMPT)
+    engine.historiales = {}
+    engine._gemini_flight = SingleFlight("test_gemini")
+    engine._local = threading.local()
+    engine.stats = {"respuestas_rapidas": 0, "respuestas_rag": 0, "respuestas_gemini": 0,
+                    "respuestas_degradadas": 0, "tokens_prompt": 0, "tokens_respuesta": 0}
+    return engine
+
+def test_context_only_in_current_turn():
+    engine = build_engine()
+    engine.process("¿Qué pasa si el contratista incumple el cronograma de obra?", "s1")
+    engine.process("¿Y cuál es el tope de la multa en ese caso?", "s1")
+
+    contents, system_instruction = engine.llm.llamadas[-1]
+    assert system_instruction == engine.SYSTEM_PROMPT
+    assert "{rag_context}" not in engine.SYSTEM_PROMPT
+    # El turno anterior viaja sin su contexto RAG; solo el actual lo lleva
+    assert contents[0]["parts"] == ["¿Qué pasa si el contratista incumple el cronograma de obra?"]
+    assert "INFORMACIÓN DE REFERENCIA" in contents[-1]["parts"][0]
+    assert sum("INFORMACIÓN DE REFERENCIA" in c["parts"][0] for c in contents) == 1
+
+    uso = engine.get_last_usage()
+    print(f"Uso: {uso}")
+    assert uso["historial"] > 0 and uso["contexto"] > 0
+    assert uso["prompt"] == uso["sistema"] + uso["historial"] + uso["contexto"] + uso["pregunta"]
+
+def test_history_is_pruned():
+    engine = build_engine()
+    for i in range(Config.MAX_HISTORY_TURNS + 5):
+        engine.process(f"Consulta {i} sobre el expediente de mi obra", "s2")
+
+    assert len(engine.historiales["s2"]) == 2 * Config.MAX_HISTORY_TURNS
+    engine.clear_session("s2")
+    assert "s2" not in engine.historiales
+
+def test_open_circuit_falls_back_to_rag_passages():
+    engine = build_engine()
+
+    def circuito_abierto(*args, **kwargs):
+        raise CircuitOpenError("Circuito gemini abierto")
+    engine.llm.generate = circuito_abierto
+
+    respuesta = engine.process("Necesito orientación sobre mi caso particular", "s3")
+    assert "Fragmentos relevantes" in respuesta
+    assert "Artículo 1." in respuesta
+    assert engine.stats["respuestas_degradadas"] == 1
+
+def test_coalesced_calls_count_tokens_once():
+    engine = build_engine()
+    en_gemini = threading.Event()
+    liberar = threading.Event()
+    generate = engine.llm.generate
+
+    def lenta(*args, **kwargs):
+        en_gemini.set()
+        liberar.wait(5)
+        return generate(*args, **kwargs)
+    engine.llm.generate = lenta
+
+    usos = []
+
+    def preguntar():
+        engine.process("Necesito orientación sobre mi caso particular", f"s{threading.get_ident()}")
+        usos.append(engine.get_last_usage())
+
+    lider = threading.Thread(target=preguntar)
+    lider.start()
+    en_gemini.wait(5)
+    seguidor = threading.Thread(target=preguntar)
+    seguidor.start()
+    # Dar tiempo a que el seguidor se una a la llamada en curso
+    time.sleep(0.2)
+    liberar.set()
+    lider.join()
+    seguidor.join()
+
+    assert len(engine.llm.llamadas) == 1
+    assert sorted(u["coalescida"] for u in usos) == [False, True]
+    assert usos[0]["prompt"] == usos[1]["prompt"]
+    assert engine.stats["tokens_prompt"] == usos[0]["prompt"]
+    assert engine.stats["tokens_respuesta"] == usos[0]["respuesta"]
+    assert engine.stats["respuestas_gemini"] == 2
+
+if __name__ == "__main__":
+    test_context_only_in_current_turn()
+    test_history_is_pruned()
+    test_open_circuit_falls_back_to_rag_passages()
+    test_coalesced_calls_count_tokens_once()
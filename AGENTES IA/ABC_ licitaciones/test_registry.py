@@ -0,0 +1,59 @@
+import threading
+
+from engine.registry import EngineRegistry
+
+def test_lazy_construction_once():
+    registry = EngineRegistry()
+    construcciones = []
+
+    def fabrica():
+        construcciones.append(1)
+        return {"nombre": "motor"}
+
+    registry.register("motor", fabrica)
+    proxy = registry.lazy("motor")
+
+    # Registrar y crear el proxy no construye nada
+    assert construcciones == []
+    assert registry.status()["motor"]["estado"] == "pendiente"
+
+    # Accesos concurrentes construyen una sola vez
+    hilos = [threading.Thread(target=registry.get, args=("motor",)) for _ in range(8)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    assert proxy.get("nombre") == "motor"
+    assert len(construcciones) == 1
+    assert registry.status()["motor"]["estado"] == "cargado"
+
+def test_failed_factory_is_cached():
+    registry = EngineRegistry()
+    intentos = []
+
+    def fabrica_rota():
+        intentos.append(1)
+        raise ValueError("sin API key")
+
+    registry.register("roto", fabrica_rota)
+
+    assert registry.get_or_none("roto") is None
+    assert registry.get_or_none("roto") is None
+    assert len(intentos) == 1
+    assert registry.status()["roto"] == {"estado": "error", "error": "sin API key"}
+
+def test_prewarm_background():
+    registry = EngineRegistry()
+    registry.register("a", lambda: "A")
+    registry.register("b", lambda: "B")
+
+    hilo = registry.prewarm(background=True)
+    hilo.join(timeout=5)
+
+    assert registry.is_loaded("a") and registry.is_loaded("b")
+
+if __name__ == "__main__":
+    test_lazy_construction_once()
+    test_failed_factory_is_cached()
+    test_prewarm_background()
@@ -0,0 +1,43 @@
+import re
+
+from engine.observaciones import ObservacionesGenerator
+from engine.reglas import MotorReglas, Regla
+
+
+PAGINAS = [
+    "BASES INTEGRADAS\nMarca: Toyota, modelo: Hilux\nPLAZO DE ENTREGA: 5 DÍAS calendario",
+    "CAPÍTULO III\nExperiencia mínima: S/ 1,500,000.00\nPenalidad diaria de 0.5 % del monto\n"
+    "Plazo de consultas: 3 días",
+]
+TEXTO = "".join(pagina + "\n\n" for pagina in PAGINAS)
+
+
+def test_rules_keep_previous_vices_and_locate_them_by_page_and_line():
+    vicios = ObservacionesGenerator().analizar_texto_bases(TEXTO, PAGINAS)
+    assert [(v["tipo"], v["ubicacion"]["pagina"], v["ubicacion"]["linea"]) for v in vicios] == [
+        ("marca_especifica", 1, 2),
+        ("experiencia_posible_excesiva", 2, 2),
+        ("plazo_muy_corto", 1, 3),
+        ("plazo_muy_corto", 2, 4),
+        ("penalidad_alta", 2, 3),
+    ]
+    assert vicios[1]["monto"] == 1500000.0 and vicios[2]["dias"] == 5 and vicios[4]["porcentaje"] == 0.5
+    assert vicios[0]["ubicacion"]["texto"] == "Marca: Toyota"
+
+    # "o equivalente" en cualquier parte anula la regla de marca
+    vicios = ObservacionesGenerator().analizar_texto_bases(TEXTO + "o equivalente")
+    assert "marca_especifica" not in {v["tipo"] for v in vicios}
+    assert all(v["ubicacion"]["pagina"] is None for v in vicios)
+
+
+def test_engine_scans_once_and_skips_triggers_inside_previous_match():
+    llamadas = []
+
+    def evaluar(match):
+        llamadas.append(match.group(1))
+        return {"tipo": "codigo", "valor": match.group(1)}
+
+    motor = MotorReglas([Regla("codigo", r"c[oó]digo", re.compile(r"c[oó]digo.{0,20}?(\d+)", re.I), evaluar)])
+    vicios = motor.evaluar("código código 12\nCODIGO 7\ncódigo sin número")
+    assert [v["valor"] for v in vicios] == ["12", "7"]
+    assert llamadas == ["12", "7"]
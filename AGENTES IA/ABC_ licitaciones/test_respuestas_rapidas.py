@@ -0,0 +1,71 @@
+import json
+import os
+import tempfile
+
+from config import Config
+from engine import respuestas_rapidas
+from engine.respuestas_rapidas import (RESPUESTAS_RAPIDAS, buscar_respuesta_rapida, buscar_coincidencia,
+                                       normalizar_texto, recargar_respuestas, _indice)
+
+def test_normalization_is_accent_insensitive():
+    assert normalizar_texto("¿Cuándo entró en VIGENCIA la Ley 32069?") == "cuando entro en vigencia la ley 32069"
+
+def test_exact_match_ignores_accents_and_signs():
+    esperada = RESPUESTAS_RAPIDAS["vigencia_ley"]["respuesta"]
+    assert buscar_respuesta_rapida("¿Cuándo entró en vigencia la Ley 32069?") == esperada
+    assert buscar_respuesta_rapida("cuando entro en vigencia la ley 32069") == esperada
+
+def test_index_only_scores_candidates():
+    # Las palabras funcionales no se indexan: no apuntan a todas las plantillas
+    assert "que" not in _indice.invertido
+    assert "el" not in _indice.invertido
+    assert buscar_respuesta_rapida("xyz abc") is None
+
+def test_best_match_with_score():
+    coincidencia = buscar_coincidencia("¿Cómo se calcula la penalidad por mora?")
+    assert coincidencia.clave == "penalidad_mora"
+    assert coincidencia.puntaje == 1.0
+
+    coincidencia = buscar_coincidencia("diferencia entre el OSCE y el OECE")
+    assert coincidencia.clave == "diferencia_osce_oece"
+    assert 0 < coincidencia.puntaje <= 1
+
+def test_audit_false_positives():
+    # audit_ambiguities.py: comparten una palabra con una plantilla pero preguntan otra cosa
+    assert buscar_coincidencia("Cual es la vigencia del poder del representante legal") is None
+    assert buscar_coincidencia("No quiero hacer una licitación pública") is None
+    assert buscar_coincidencia("¿Qué es el Tribunal de Contrataciones del Estado?") is None
+    assert buscar_coincidencia("La ley 32069 se aplica en el 2026").clave == "vigencia_ley"
+
+def test_hot_reload_swaps_index():
+    directorio = tempfile.mkdtemp()
+    path = os.path.join(directorio, "respuestas.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"horario": {"preguntas": ["horario de atención de la mesa de partes"],
+                               "respuesta": ["🕘 **Horario**", "De 8:30 a 16:30"]}}, f)
+    try:
+        estado = recargar_respuestas(path)
+        assert estado["respuestas"] == 1
+        assert buscar_respuesta_rapida("¿Horario de atención de la mesa de partes?") == "🕘 **Horario**\nDe 8:30 a 16:30"
+        assert os.path.exists(os.path.join(directorio, "respuestas.index.json"))
+
+        # Un archivo inválido no reemplaza el índice vigente
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("{no es json")
+        try:
+            recargar_respuestas(path)
+            assert False, "debió fallar"
+        except ValueError:
+            pass
+        assert buscar_coincidencia("horario de atención de la mesa de partes") is not None
+    finally:
+        recargar_respuestas(Config.RESPUESTAS_RAPIDAS_PATH)
+    assert respuestas_rapidas.get_estado_respuestas()["respuestas"] == len(RESPUESTAS_RAPIDAS)
+
+if __name__ == "__main__":
+    test_normalization_is_accent_insensitive()
+    test_exact_match_ignores_accents_and_signs()
+    test_index_only_scores_candidates()
+    test_best_match_with_score()
+    test_audit_false_positives()
+    test_hot_reload_swaps_index()
@@ -0,0 +1,68 @@
+from engine.opiniones import OpinionesOECE
+from engine.search_index import SearchIndex
+from engine.tribunal import TribunalContrataciones
+
+def test_tribunal_matches_words_not_whole_query():
+    tribunal = TribunalContrataciones()
+    # Antes solo coincidía si la consulta completa aparecía dentro de un campo
+    resultados = tribunal.buscar_resoluciones("sanción por documentación falsa")
+    assert resultados[0]["materia"] == "Documentos falsos"
+
+def test_opinions_ranked_by_relevance():
+    opiniones = OpinionesOECE()
+    resultados = opiniones.buscar_opinion("opinión sobre transitoriedad de la Ley 30225")
+    assert resultados[0]["numero"] == "D000001-2026-OECE-DTN"
+    assert opiniones.buscar_opinion("xyz abc") == []
+
+def test_chat_search_ignores_collection_words_and_weak_matches():
+    tribunal = TribunalContrataciones()
+    opiniones = OpinionesOECE()
+    # "tribunal" o "dtn" (en el número de todas las opiniones) no bastan para una coincidencia
+    assert tribunal.buscar_resoluciones("resoluciones del tribunal sobre la fiesta de fin de año") == []
+    assert opiniones.buscar_opinion("opinión DTN sobre el plazo de la fiesta") == []
+    assert opiniones.indice.search("opinión DTN sobre el plazo de la fiesta")[1] > 0
+    assert [r["numero"] for r in opiniones.buscar_opinion("opinión D000008-2026")] == ["D000008-2026-OECE-DTN"]
+    assert tribunal.buscar_resoluciones("resolución tce 2150-2025")[0]["numero"] == "2150-2025-TCE-S2"
+
+def test_chat_routes_open_questions_to_the_engine():
+    import app
+
+    # Antes: "competencia" en el resumen de la Res. 2150-2025 → lista de resoluciones
+    assert app.route_message("¿Cuáles son las competencias del Tribunal?") is None
+    assert app.route_message("El contratista incumplió el plazo, ¿cómo lo sanciono?") is None
+    assert app.route_message("resoluciones del tribunal sobre documentos falsos")[0] == "tribunal"
+    assert app.route_message("opiniones sobre garantías")[0] == "opiniones"
+
+def test_pagination_over_large_catalog():
+    indice = SearchIndex()
+    indice.extend({"numero": f"D{i:06d}-2026-OECE-DTN", "tema": f"Tema {i} sobre garantías",
+                   "resumen": "Consulta sobre garantías" + (" de fiel cumplimiento" if i % 2 else "")}
+                  for i in range(3000))
+
+    pagina_1, total = indice.search("garantía de fiel cumplimiento", limite=10)
+    pagina_2, _ = indice.search("garantía de fiel cumplimiento", limite=10, desde=10)
+    # Coincidencia mínima: al menos 2 de las 3 palabras (solo los impares dicen "fiel cumplimiento")
+    assert total == 1500
+    assert len(pagina_1) == len(pagina_2) == 10
+    assert all("fiel" in r.documento["resumen"] for r in pagina_1 + pagina_2)
+    assert not {r.documento["numero"] for r in pagina_1} & {r.documento["numero"] for r in pagina_2}
+
+def test_paginated_api_shape():
+    respuesta = TribunalContrataciones().buscar("inhabilitación", pagina=1, por_pagina=2)
+    assert set(respuesta) == {"resultados", "total", "pagina", "por_pagina"}
+    assert respuesta["resultados"][0]["puntaje"] > 0
+
+def test_lookup_by_number_variants():
+    opiniones = OpinionesOECE()
+    for variante in ("D000008-2026-OECE-DTN", "D008-2026", "008-2026-OECE-DTN", "d8-2026", "8"):
+        assert opiniones.obtener_opinion_por_numero(variante)["numero"] == "D000008-2026-OECE-DTN"
+    assert opiniones.obtener_opinion_por_numero("D999-2026") is None
+
+def test_autocomplete_by_prefix():
+    indice = SearchIndex()
+    indice.extend({"numero": f"D{i:06d}-2025-OECE-DTN", "tema": "Tema"} for i in range(1, 5001))
+    sugerencias = [d["numero"] for d in indice.autocompletar("D00420", limite=3)]
+    # Primero la opinión con ese correlativo, luego las que empiezan igual
+    assert sugerencias == ["D000420-2025-OECE-DTN", "D004200-2025-OECE-DTN", "D004201-2025-OECE-DTN"]
+    # Sin ceros ni prefijo "D": la coincidencia exacta va primero
+    assert indice.autocompletar("42-2025")[0]["numero"] == "D000042-2025-OECE-DTN"
@@ -0,0 +1,35 @@
+from engine.secciones import extracto_para_prompt, localizar_secciones
+from engine.texto import estimar_tokens
+
+RELLENO = ("Disposiciones generales aplicables a todos los procedimientos de selección. " * 10 + "\n") * 40
+
+BASES = ("BASES INTEGRADAS\nLICITACIÓN PÚBLICA N° 001-2026-MPL\n"
+         "SECCIÓN GENERAL\nDISPOSICIONES COMUNES\n" + RELLENO +
+         "SECCIÓN ESPECÍFICA\nCAPÍTULO I\nGENERALIDADES\n1.3 Valor referencial\nS/ 5,000,000.00\n" + RELLENO +
+         "CAPÍTULO III\nREQUERIMIENTO\n3.1 Términos de referencia\n" + RELLENO +
+         "3.2 REQUISITOS DE CALIFICACIÓN\nA. CAPACIDAD LEGAL\nExperiencia del postor: S/ 15,000,000.00\n"
+         "B. EXPERIENCIA DEL PERSONAL CLAVE\nResidente con 10 años\n" + RELLENO +
+         "CAPÍTULO IV\nFACTORES DE EVALUACIÓN\nPrecio 100 puntos\n" + RELLENO +
+         "CAPÍTULO V\nPROFORMA DEL CONTRATO\nCLÁUSULA DÉCIMA: PENALIDADES\nPenalidad diaria 0.10\n" + RELLENO)
+
+def test_sections_get_topics_from_headings():
+    temas = {s.titulo: s.tema for s in localizar_secciones(BASES)}
+    assert temas["CAPÍTULO III REQUERIMIENTO"] == "tdr"
+    assert temas["A. CAPACIDAD LEGAL"] == "requisitos"
+    assert temas["B. EXPERIENCIA DEL PERSONAL CLAVE"] == "requisitos"
+    assert temas["CAPÍTULO V PROFORMA DEL CONTRATO"] is None
+    assert temas["CLÁUSULA DÉCIMA: PENALIDADES"] == "penalidades"
+
+def test_prompt_extract_reaches_sections_past_the_old_cut():
+    extracto = extracto_para_prompt(BASES, "bases", 3500)
+    assert estimar_tokens(extracto) <= 3500
+    assert extracto.startswith("BASES INTEGRADAS\nLICITACIÓN PÚBLICA N° 001-2026-MPL")
+    for dato in ("S/ 5,000,000.00", "S/ 15,000,000.00", "Residente", "Precio 100", "Penalidad diaria"):
+        assert dato not in BASES[:15000] and dato in extracto
+
+def test_question_sends_only_matching_sections():
+    extracto = extracto_para_prompt(BASES, "chat", 3500, pregunta="¿Qué penalidad diaria se aplica?")
+    assert "Penalidad diaria 0.10" in extracto
+    assert "Precio 100" not in extracto and "Residente" not in extracto
+    # Un documento que cabe en el presupuesto se envía completo
+    assert extracto_para_prompt(BASES[:5000], "bases", 3500) == BASES[:5000]
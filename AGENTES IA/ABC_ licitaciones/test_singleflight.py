@@ -0,0 +1,59 @@
+import threading
+import time
+
+from engine.metrics import metrics
+from engine.singleflight import SingleFlight, normalizar_prompt
+
+def test_normalizar_prompt():
+    assert normalizar_prompt("  ¿Qué es el   D.S. 001-2026?\n") == normalizar_prompt("¿qué es el d.s. 001-2026?")
+    assert normalizar_prompt("opinión") != normalizar_prompt("opinion")
+
+def test_concurrent_calls_are_coalesced():
+    flight = SingleFlight("test_coalesce")
+    llamadas = []
+    inicio = threading.Event()
+
+    def llamada_lenta():
+        llamadas.append(1)
+        inicio.wait(timeout=2)
+        return "respuesta"
+
+    resultados = []
+    hilos = [
+        threading.Thread(target=lambda: resultados.append(flight.do("misma-clave", llamada_lenta)))
+        for _ in range(10)
+    ]
+    for h in hilos:
+        h.start()
+    # Dar tiempo a que todos los seguidores se unan a la llamada en curso
+    time.sleep(0.2)
+    inicio.set()
+    for h in hilos:
+        h.join()
+
+    print(f"Llamadas reales: {len(llamadas)}, resultados: {len(resultados)}")
+    assert len(llamadas) == 1
+    assert resultados == ["respuesta"] * 10
+    assert metrics.get_counter("upstream_calls", flight="test_coalesce") == 1
+    assert metrics.get_counter("coalesced_calls", flight="test_coalesce") == 9
+
+    # Al terminar, la clave se libera: una nueva petición vuelve a llamar
+    flight.do("misma-clave", llamada_lenta)
+    assert len(llamadas) == 2
+
+def test_errors_are_shared():
+    flight = SingleFlight("test_error")
+
+    def falla():
+        raise RuntimeError("quota")
+
+    try:
+        flight.do("k", falla)
+        assert False, "Debió propagar la excepción"
+    except RuntimeError as e:
+        assert str(e) == "quota"
+
+if __name__ == "__main__":
+    test_normalizar_prompt()
+    test_concurrent_calls_are_coalesced()
+    test_errors_are_shared()
@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pytest
+
+from engine import trabajos
+from engine.trabajos import GestorTrabajos, notificar_webhook, validar_callback_url
+from engine.uploads import FuentePDF
+
+
+def _esperar(gestor, trabajo_id, condicion, timeout=5):
+    limite = time.time() + timeout
+    while time.time() < limite:
+        trabajo = gestor.obtener(trabajo_id)
+        if condicion(trabajo):
+            return trabajo
+        time.sleep(0.01)
+    raise AssertionError(f"el trabajo no llegó al estado esperado: {trabajo}")
+
+
+def test_job_publishes_rule_results_before_llm_and_calls_back():
+    gemini_responde = threading.Event()
+    notificados = []
+
+    def analizar(fuente, progreso):
+        progreso("extraccion", {"archivo": fuente.nombre, "paginas": 3})
+        progreso("reglas", {"vicios_reglas": [{"tipo": "plazo_muy_corto"}]})
+        gemini_responde.wait(5)
+        progreso("ia", {"analisis_ia": {"resumen": "ok"}})
+        return {"resultado": {"paginas": 3}, "respuesta_chat": "listo"}
+
+    gestor = GestorTrabajos(analizar, max_workers=1, notificar=lambda url, t: notificados.append((url, t)))
+    fuente = FuentePDF("bases.pdf", datos=b"%PDF-1.4")
+    trabajo = gestor.crear(fuente, "http://cliente/aviso")
+    assert trabajo["estado"] == "en_cola" and trabajo["progreso"] == 0
+
+    parcial = _esperar(gestor, trabajo["id"], lambda t: t["etapa"] == "reglas")
+    assert parcial["estado"] == "procesando" and parcial["progreso"] == 45
+    assert parcial["parcial"] == {"archivo": "bases.pdf", "paginas": 3,
+                                  "vicios_reglas": [{"tipo": "plazo_muy_corto"}]}
+    assert parcial["resultado"] is None
+
+    gemini_responde.set()
+    final = _esperar(gestor, trabajo["id"], lambda t: t["estado"] == "completado")
+    gestor.cerrar()
+    assert final["progreso"] == 100 and final["resultado"]["respuesta_chat"] == "listo"
+    assert "analisis_ia" in final["parcial"] and final["duracion_s"] >= 0
+    assert fuente.datos is None  # el trabajo cerró la fuente
+    assert [(url, t["estado"]) for url, t in notificados] == [("http://cliente/aviso", "completado")]
+
+
+def test_failed_jobs_report_error_and_full_queue_is_rejected():
+    liberar = threading.Event()
+
+    def analizar(fuente, progreso):
+        if fuente.nombre == "roto.pdf":
+            raise ValueError("PDF dañado")
+        liberar.wait(5)
+        return {"error": "sin texto"}
+
+    gestor = GestorTrabajos(analizar, max_workers=2, max_trabajos=2)
+    roto = gestor.crear(FuentePDF("roto.pdf", datos=b""))
+    assert _esperar(gestor, roto["id"], lambda t: t["estado"] == "error")["error"] == "PDF dañado"
+    assert gestor.obtener("no-existe") is None
+
+    # El terminado más antiguo deja lugar a uno nuevo; con todos en curso se rechaza
+    vacio = gestor.crear(FuentePDF("vacio.pdf", datos=b""))
+    assert gestor.obtener(roto["id"]) is not None
+    otro = gestor.crear(FuentePDF("otro.pdf", datos=b""))
+    assert gestor.obtener(roto["id"]) is None
+    rechazada = FuentePDF("rechazado.pdf", datos=b"x")
+    with pytest.raises(RuntimeError):
+        gestor.crear(rechazada)
+    assert rechazada.datos is None
+
+    liberar.set()
+    for trabajo in (vacio, otro):
+        assert _esperar(gestor, trabajo["id"], lambda t: t["estado"] == "error")["error"] == "sin texto"
+    gestor.cerrar()
+
+
+def test_callback_url_cannot_reach_internal_network(monkeypatch):
+    for url in ("http://127.0.0.1:5000/api/admin", "http://localhost/x", "http://169.254.169.254/latest/meta-data",
+                "http://10.0.0.5/aviso", "http://[::1]/x", "http://0.0.0.0/", "ftp://cliente.pe/aviso"):
+        with pytest.raises(ValueError):
+            validar_callback_url(url)
+    validar_callback_url("https://93.184.216.34/aviso")
+
+    # Con lista de hosts solo se aceptan esos (sin resolver el DNS)
+    validar_callback_url("https://hooks.cliente.pe/aviso", ["hooks.cliente.pe"])
+    with pytest.raises(ValueError):
+        validar_callback_url("https://93.184.216.34/aviso", ["hooks.cliente.pe"])
+
+    class Redireccion:
+        is_redirect = True
+        status_code = 302
+
+    enviados = []
+    monkeypatch.setattr("requests.post", lambda url, **kwargs: enviados.append(kwargs) or Redireccion())
+    monkeypatch.setattr(trabajos.Config, "PDF_CALLBACK_HOSTS", ("hooks.cliente.pe",))
+    with pytest.raises(ValueError):
+        notificar_webhook("https://hooks.cliente.pe/aviso", {"estado": "completado"})
+    assert enviados[0]["allow_redirects"] is False
+    with pytest.raises(ValueError):
+        notificar_webhook("http://127.0.0.1/aviso", {"estado": "completado"})
+    assert len(enviados) == 1